@@ -34,10 +34,18 @@ TOOLS = [
         'type': 'function',
         'function': {
             'name': 'check_task_status',
-            'description': 'Check whether a GCRI task is currently running and get its status.',
+            'description': (
+                'Check GCRI task status. With a task_id, returns that task; '
+                'otherwise lists all queued and running tasks.'
+            ),
             'parameters': {
                 'type': 'object',
-                'properties': {},
+                'properties': {
+                    'task_id': {
+                        'type': 'string',
+                        'description': 'ID of a specific task to check.',
+                    },
+                },
             },
         },
     },
@@ -45,10 +53,19 @@ TOOLS = [
         'type': 'function',
         'function': {
             'name': 'abort_task',
-            'description': 'Abort the currently running GCRI task. Use when the user wants to cancel.',
+            'description': (
+                'Abort a queued or running GCRI task. Use when the user wants to cancel. '
+                'Call check_task_status first if you do not know the task_id.'
+            ),
             'parameters': {
                 'type': 'object',
-                'properties': {},
+                'properties': {
+                    'task_id': {
+                        'type': 'string',
+                        'description': 'ID of the task to abort.',
+                    },
+                },
+                'required': ['task_id'],
             },
         },
     },
@@ -59,7 +76,7 @@ TOOLS = [
             'description': (
                 'Search past experiment memory. '
                 'CoMeT: semantic memory from conversations. If a query is provided, performs '
-                'semantic search and returns ranked results. Without query, returns all nodes. '
+                'semantic search and returns ranked results. Without query, lists the most recent nodes. '
                 'GCRI: rules and domain-specific knowledge learned from previous tasks.'
             ),
             'parameters': {
@@ -72,7 +89,16 @@ TOOLS = [
                     },
                     'query': {
                         'type': 'string',
-                        'description': 'Search query for semantic retrieval (CoMeT). Leave empty to list all.',
+                        'description': 'Search query for semantic retrieval (CoMeT). Leave empty to list recent nodes.',
+                    },
+                    'topic_tags': {
+                        'type': 'array',
+                        'items': {'type': 'string'},
+                        'description': 'When listing CoMeT nodes without a query, only return nodes with any of these tags.',
+                    },
+                    'limit': {
+                        'type': 'integer',
+                        'description': 'Maximum number of CoMeT nodes to list (at most 50).',
                     },
                 },
                 'required': ['source'],
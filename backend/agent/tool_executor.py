@@ -1,22 +1,43 @@
+import asyncio
 import json
 
 from loguru import logger
 
+from agent.agent_tools import TOOLS
 from services import gcri_runner
-from services.comet_bridge import get_comet_memory_nodes, search_comet_memory, get_gcri_memory
+from services.comet_async import get_comet_memory_nodes, search_comet_memory, get_gcri_memory
+from services.metrics import tool_seconds
+from services.tracing import tracer
 
+# Tools with side effects run one at a time, in the order the model asked for them.
+SEQUENTIAL_TOOLS = {'propose_gcri_task', 'abort_task'}
+TOOL_TIMEOUT = 30.0
+MEMORY_LIST_LIMIT = 50
+MEMORY_LIST_FIELDS = ['node_id', 'summary', 'topic_tags', 'created_at']
+TOOL_NAMES = frozenset(tool['function']['name'] for tool in TOOLS)
 
-async def execute_tool(tool_name, arguments, config, ws_manager):
-    """Execute a tool call from the LLM and return the result as a string."""
+
+def _list_limit(value):
+    """The model's requested node count, clamped to 1..MEMORY_LIST_LIMIT; the maximum if unparseable."""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return MEMORY_LIST_LIMIT
+    return max(1, min(limit, MEMORY_LIST_LIMIT))
+
+
+async def execute_tool(tool_name, arguments, config, ws_manager, session_id=None):
+    """
+    Execute a tool call from the LLM and return the result as a string.
+    ``session_id`` is the chat session the call came from; it scopes
+    tools that would otherwise reach other users' tasks.
+    """
     logger.info(f'Executing tool: {tool_name}({arguments})')
 
     if tool_name == 'propose_gcri_task':
         task_description = arguments.get('task_description', '')
         commit_mode = arguments.get('commit_mode', 'manual')
 
-        if gcri_runner.is_running():
-            return json.dumps({'error': 'A GCRI task is already running. Abort it first or wait.'})
-
         branches = config.get('branches', [])
         branch_count = config.get('branchCount', 3)
         branch_models = []
@@ -38,29 +59,98 @@ async def execute_tool(tool_name, arguments, config, ws_manager):
         return json.dumps(scheme, ensure_ascii=False)
 
     elif tool_name == 'check_task_status':
-        running = gcri_runner.is_running()
+        task_id = arguments.get('task_id')
+        if task_id:
+            task = gcri_runner.get_task(task_id)
+            if task is None:
+                return json.dumps({'error': f'Unknown task: {task_id}'})
+            return json.dumps(task.to_dict(), ensure_ascii=False)
+        tasks = [task for task in gcri_runner.list_tasks() if task['status'] in ('queued', 'running')]
         return json.dumps({
-            'running': running,
-            'message': 'GCRI task is currently running.' if running else 'No active task.',
-        })
+            'running': any(task['status'] == 'running' for task in tasks),
+            'tasks': tasks,
+            'message': f'{len(tasks)} GCRI task(s) queued or running.' if tasks else 'No active task.',
+        }, ensure_ascii=False)
 
     elif tool_name == 'abort_task':
-        if not gcri_runner.is_running():
-            return json.dumps({'message': 'No task is running to abort.'})
-        gcri_runner.abort_gcri_task()
-        return json.dumps({'message': 'Abort signal sent. The task will stop after the current phase.'})
+        task_id = arguments.get('task_id')
+        if task_id:
+            result = gcri_runner.abort_gcri_task(task_id)
+        elif session_id:
+            # task_id is required, but if the model leaves it out only this session's tasks are touched.
+            result = gcri_runner.abort_session_tasks(session_id)
+        else:
+            return json.dumps({'message': 'Give the task_id to abort; see check_task_status.'})
+        if result['status'] == 'error':
+            return json.dumps({'message': result['message']})
+        if not task_id and not result['task_ids']:
+            return json.dumps({'message': 'No task from this chat is running to abort.'})
+        return json.dumps({
+            **result,
+            'message': 'Abort signal sent. Running tasks stop after the current phase.',
+        })
 
     elif tool_name == 'query_memory':
         source = arguments.get('source', 'gcri')
         query = arguments.get('query', '')
         if source == 'comet':
             if query:
-                data = search_comet_memory(query)
+                data = await search_comet_memory(query)
             else:
-                data = get_comet_memory_nodes()
+                topic_tags = arguments.get('topic_tags') or None
+                if isinstance(topic_tags, str):
+                    topic_tags = [topic_tags]
+                data = await get_comet_memory_nodes(
+                    limit=_list_limit(arguments.get('limit')),
+                    topic_tags=topic_tags,
+                    fields=MEMORY_LIST_FIELDS,
+                )
         else:
-            data = get_gcri_memory()
+            data = await get_gcri_memory()
         return json.dumps(data, ensure_ascii=False, default=str)
 
     else:
         return json.dumps({'error': f'Unknown tool: {tool_name}'})
+
+
+def _tool_label(tool_name):
+    """Tool name for metric labels; names the model made up share one series."""
+    return tool_name if tool_name in TOOL_NAMES else 'unknown'
+
+
+async def _execute_with_timeout(tool_name, arguments, config, ws_manager, timeout, session_id=None):
+    try:
+        with tool_seconds.time(_tool_label(tool_name)), tracer.span('tool.execute', tool=tool_name):
+            return await asyncio.wait_for(execute_tool(tool_name, arguments, config, ws_manager, session_id), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f'Tool {tool_name} timed out after {timeout}s')
+        return json.dumps({'error': f'Tool {tool_name} timed out after {timeout}s'})
+    except Exception as error:
+        logger.error(f'Tool {tool_name} failed: {error}')
+        return json.dumps({'error': f'Tool {tool_name} failed: {error}'})
+
+
+async def execute_tool_calls(calls, config, ws_manager, timeout=TOOL_TIMEOUT, session_id=None):
+    """
+    Execute the (tool_name, arguments) pairs of one assistant turn.
+    Runs of independent tools are gathered concurrently; tools in
+    SEQUENTIAL_TOOLS run alone. Results are returned in call order.
+    """
+    results = []
+    batch = []
+
+    async def flush():
+        if batch:
+            results.extend(await asyncio.gather(*[
+                _execute_with_timeout(name, args, config, ws_manager, timeout, session_id) for name, args in batch
+            ]))
+            batch.clear()
+
+    for tool_name, arguments in calls:
+        if tool_name in SEQUENTIAL_TOOLS:
+            await flush()
+            results.append(await _execute_with_timeout(tool_name, arguments, config, ws_manager, timeout, session_id))
+        else:
+            batch.append((tool_name, arguments))
+    await flush()
+    return results
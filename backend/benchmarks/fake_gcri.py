@@ -0,0 +1,129 @@
+"""
+Stand-in for the ``gcri`` package (and ``ato.adict`` when it is missing) so the
+backend can run GCRI tasks without models or network. The fake GCRI walks
+through iterations and branches firing the same GCRICallbacks hooks as the
+real one, at a fixed rate. Hypothesis texts carry the wall-clock time they
+were emitted at, which the benchmark uses to measure callback-to-client lag.
+"""
+import os
+import sys
+import time
+import types
+
+
+EMIT_MARKER = 'bench-emit:'
+
+
+class ADict(dict):
+    """Attribute-access dict, enough of ato.adict.ADict for _build_config."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for key, value in self.items():
+            if isinstance(value, dict) and not isinstance(value, ADict):
+                self[key] = ADict(value)
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+AGENT_NAMES_IN_BRANCH = ('hypothesis', 'reasoning', 'verification')
+
+
+def _default_config():
+    return ADict(
+        num_branches=int(os.environ.get('RUI_BENCH_GCRI_BRANCHES', '3')),
+        agents={'branches': []},
+        protocols={'max_iterations': int(os.environ.get('RUI_BENCH_GCRI_ITERATIONS', '3'))},
+        dashboard={'enabled': False},
+        use_comet=False,
+    )
+
+
+def scope(func):
+    def wrapper(*args, **kwargs):
+        return func(_default_config(), *args, **kwargs)
+    return wrapper
+
+
+class GCRICallbacks:
+    def on_commit_request(self, context):
+        return True
+
+
+class GCRI:
+    def __init__(self, config, abort_event=None, callbacks=None):
+        self.config = config
+        self.abort_event = abort_event
+        self.callbacks = callbacks or GCRICallbacks()
+        self.interval = 1.0 / float(os.environ.get('RUI_BENCH_GCRI_RATE', '200'))
+
+    def _emit(self, hook, *args):
+        if self.abort_event is not None and self.abort_event.is_set():
+            raise InterruptedError('aborted')
+        getattr(self.callbacks, hook)(*args)
+        time.sleep(self.interval)
+
+    def __call__(self, task):
+        started = time.time()
+        iterations = self.config.protocols.max_iterations
+        branches = self.config.num_branches
+        try:
+            for iteration in range(iterations):
+                self._emit('on_iteration_start', iteration, iterations)
+                self._emit('on_strategies_generated', iteration, [
+                    {'name': f'strategy-{branch}', 'description': task, 'hints': []} for branch in range(branches)
+                ])
+                for branch in range(branches):
+                    self._emit('on_phase_change', 'hypothesis', iteration)
+                    self._emit(
+                        'on_hypothesis_generated', iteration, branch,
+                        f'{EMIT_MARKER}{time.time():.6f}', f'strategy-{branch}',
+                    )
+                    self._emit('on_verification_complete', iteration, branch, 'weak', 'none found')
+                decision = iteration == iterations - 1
+                self._emit('on_decision', iteration, decision, 0, 'ok', [])
+                self._emit('on_iteration_complete', iteration, {
+                    'decision': decision, 'global_feedback': 'ok', 'branch_evaluations': [],
+                })
+        except InterruptedError as error:
+            self.callbacks.on_task_abort(error)
+            return None
+        self.callbacks.on_task_complete({}, time.time() - started)
+        return {'final_output': 'benchmark result', 'best_branch_index': 0, 'count': iterations}
+
+
+def install():
+    """Register the fake modules in sys.modules; call before importing the backend."""
+    gcri = types.ModuleType('gcri')
+    config = types.ModuleType('gcri.config')
+    config.scope = scope
+    config.AGENT_NAMES_IN_BRANCH = AGENT_NAMES_IN_BRANCH
+    graphs = types.ModuleType('gcri.graphs')
+    callbacks = types.ModuleType('gcri.graphs.callbacks')
+    callbacks.GCRICallbacks = GCRICallbacks
+    unit = types.ModuleType('gcri.graphs.gcri_unit')
+    unit.GCRI = GCRI
+    gcri.config, gcri.graphs = config, graphs
+    graphs.callbacks, graphs.gcri_unit = callbacks, unit
+    sys.modules.update({
+        'gcri': gcri,
+        'gcri.config': config,
+        'gcri.graphs': graphs,
+        'gcri.graphs.callbacks': callbacks,
+        'gcri.graphs.gcri_unit': unit,
+    })
+    try:
+        import ato.adict  # noqa: F401
+    except ImportError:
+        ato = types.ModuleType('ato')
+        adict = types.ModuleType('ato.adict')
+        adict.ADict = ADict
+        ato.adict = adict
+        sys.modules.update({'ato': ato, 'ato.adict': adict})
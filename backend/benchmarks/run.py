@@ -0,0 +1,260 @@
+"""
+Offline benchmark of the backend's own overhead. Starts the stub LLM server
+and ``main:app`` (with the fake GCRI) as subprocesses on localhost, then
+measures:
+
+- /api/chat latency p50/p99 with N concurrent users, each turn doing one
+  scripted tool call and a final answer
+- WebSocket fan-out throughput to M clients while a GCRI task runs
+- lag from a GCRI callback firing on the worker thread to a client receiving it
+
+    cd backend && python -m benchmarks.run --users 20 --turns 5 --ws-clients 50
+
+Use --json to write the results for comparison between runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import websockets
+
+from benchmarks.fake_gcri import EMIT_MARKER
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# High enough that the shared rate limiter never throttles the benchmark.
+UNTHROTTLED = 'openai=1000000/1000000000,anthropic=1000000/1000000000,google=1000000/1000000000'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _summary(values):
+    return {
+        'count': len(values),
+        'p50': _percentile(values, 0.50),
+        'p99': _percentile(values, 0.99),
+        'max': max(values) if values else None,
+    }
+
+
+async def _wait_ready(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f'{url} did not come up within {timeout}s')
+
+
+def _start(module, port, env, *args):
+    return subprocess.Popen(
+        [sys.executable, '-m', module, '--port', str(port), *args],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def bench_chat(base_url, users, turns, models, stream=False):
+    latencies = []
+    errors = 0
+    path = '/api/chat/stream' if stream else '/api/chat'
+
+    async def user(index, client):
+        nonlocal errors
+        session_id = f'bench-{uuid.uuid4().hex[:8]}'
+        config = {'chatModel': models[index % len(models)]}
+        for turn in range(turns):
+            payload = {'message': f'turn {turn} from user {index}', 'config': config, 'session_id': session_id}
+            started = time.perf_counter()
+            response = await client.post(base_url + path, json=payload)
+            body = response.text if stream else response.json().get('reply', '')
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200 or 'Error communicating' in body:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(index, client) for index in range(users)))
+        elapsed = time.perf_counter() - started
+    return {
+        'users': users,
+        'turns': turns,
+        'models': models,
+        'stream': stream,
+        'errors': errors,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'latency': _summary(latencies),
+    }
+
+
+def _events(frame):
+    message = json.loads(frame)
+    if message.get('type') == 'batch':
+        return message['events']
+    if message.get('type') in ('hello', 'history', 'snapshot', 'subscribed', 'pong'):
+        return []
+    return [message]
+
+
+async def bench_fanout(base_url, ws_url, clients, timeout):
+    received = [0] * clients
+    first_at = []
+    last_at = []
+    lags = []
+    done = [asyncio.Event() for _ in range(clients)]
+    connected = asyncio.Event()
+    ready = 0
+
+    async def client(index):
+        nonlocal ready
+        async with websockets.connect(ws_url, max_size=None) as socket_:
+            await socket_.recv()
+            ready += 1
+            if ready == clients:
+                connected.set()
+            async for frame in socket_:
+                now = time.time()
+                for event in _events(frame):
+                    if not event.get('taskId'):
+                        continue
+                    if not received[index]:
+                        first_at.append(now)
+                    received[index] += 1
+                    hypothesis = event.get('hypothesis') or ''
+                    if hypothesis.startswith(EMIT_MARKER):
+                        lags.append(now - float(hypothesis[len(EMIT_MARKER):]))
+                    if event.get('type') == 'phase_change' and event.get('phase') == 'complete':
+                        last_at.append(now)
+                        done[index].set()
+
+    tasks = [asyncio.create_task(client(index)) for index in range(clients)]
+    await asyncio.wait_for(connected.wait(), timeout)
+    async with httpx.AsyncClient(timeout=30.0) as http:
+        await http.post(base_url + '/api/task/run', json={'task': 'benchmark task', 'config': {}})
+    try:
+        await asyncio.wait_for(asyncio.gather(*(event.wait() for event in done)), timeout)
+    except asyncio.TimeoutError:
+        pass
+    # Per-connection counters are only reported while the clients are still connected.
+    async with httpx.AsyncClient() as http:
+        stats = (await http.get(base_url + '/ws/stats')).json()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    window = (max(last_at) - min(first_at)) if first_at and last_at else 0.0
+    total = sum(received)
+    return {
+        'clients': clients,
+        'completed_clients': len(last_at),
+        'events_per_client': max(received, default=0),
+        'events_delivered': total,
+        'events_per_second': total / window if window else 0.0,
+        'callback_to_client_lag': _summary(lags),
+        'server': {key: stats.get(key) for key in ('sent', 'dropped', 'coalesced', 'send_errors')},
+    }
+
+
+def _print_report(results):
+    chat = results['chat']
+    print(f"\n/api/chat  users={chat['users']} turns={chat['turns']} models={','.join(chat['models'])}")
+    print(f"  p50 {chat['latency']['p50'] * 1000:.1f} ms   p99 {chat['latency']['p99'] * 1000:.1f} ms   "
+          f"{chat['requests_per_second']:.1f} req/s   errors {chat['errors']}")
+    fanout = results['fanout']
+    lag = fanout['callback_to_client_lag']
+    print(f"\nWS fan-out  clients={fanout['clients']} (completed {fanout['completed_clients']})")
+    print(f"  {fanout['events_per_client']} events/client   {fanout['events_per_second']:.0f} events/s delivered")
+    if lag['count']:
+        print(f"  callback->client lag p50 {lag['p50'] * 1000:.1f} ms   p99 {lag['p99'] * 1000:.1f} ms")
+    print(f"  server: {fanout['server']}\n")
+
+
+async def run(args):
+    tmp = tempfile.mkdtemp(prefix='rui-bench-')
+    stub_port, app_port = _free_port(), _free_port()
+    stub_url = f'http://127.0.0.1:{stub_port}'
+    env = {
+        **os.environ,
+        'HOME': tmp,
+        'NO_PROXY': '127.0.0.1,localhost',
+        'OPENAI_API_KEY': 'bench',
+        'ANTHROPIC_API_KEY': 'bench',
+        'GOOGLE_API_KEY': 'bench',
+        'OPENAI_BASE_URL': f'{stub_url}/v1',
+        'ANTHROPIC_BASE_URL': stub_url,
+        'RUI_GOOGLE_BASE_URL': stub_url,
+        'RUI_RATE_LIMITS': UNTHROTTLED,
+        'RUI_GCRI_WORKERS': '1',
+        'RUI_BENCH_GCRI_RATE': str(args.gcri_rate),
+        'RUI_BENCH_GCRI_ITERATIONS': str(args.gcri_iterations),
+        'RUI_BENCH_GCRI_BRANCHES': str(args.gcri_branches),
+    }
+    stub = _start(
+        'benchmarks.stub_llm', stub_port, env,
+        '--latency', str(args.llm_latency), '--jitter', str(args.llm_jitter), '--tool', args.tool,
+    )
+    app = _start('benchmarks.serve', app_port, env)
+    base_url = f'http://127.0.0.1:{app_port}'
+    try:
+        await _wait_ready(f'{stub_url}/health')
+        await _wait_ready(f'{base_url}/ready')
+        results = {
+            'config': vars(args),
+            'chat': await bench_chat(base_url, args.users, args.turns, args.models.split(','), args.stream),
+            'fanout': await bench_fanout(base_url, f'ws://127.0.0.1:{app_port}/ws', args.ws_clients, args.timeout),
+        }
+    finally:
+        for process in (app, stub):
+            process.terminate()
+            process.wait(timeout=10)
+
+    _print_report(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark of chat latency and WebSocket fan-out.')
+    parser.add_argument('--users', type=int, default=10, help='concurrent chat users')
+    parser.add_argument('--turns', type=int, default=5, help='chat turns per user')
+    parser.add_argument('--models', default='gpt-4o', help='comma-separated chat models, assigned round-robin')
+    parser.add_argument('--stream', action='store_true', help='use /api/chat/stream instead of /api/chat')
+    parser.add_argument('--tool', default='check_task_status', help="tool the stub calls each turn, or 'none'")
+    parser.add_argument('--llm-latency', type=float, default=0.1, help='stub response latency, seconds')
+    parser.add_argument('--llm-jitter', type=float, default=0.0, help='extra random stub latency, seconds')
+    parser.add_argument('--ws-clients', type=int, default=20, help='WebSocket clients for the fan-out test')
+    parser.add_argument('--gcri-rate', type=float, default=500, help='fake GCRI callback events per second')
+    parser.add_argument('--gcri-iterations', type=int, default=10)
+    parser.add_argument('--gcri-branches', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=120.0, help='fan-out test timeout, seconds')
+    parser.add_argument('--json', help='write results to this file')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Run ``main:app`` with the fake GCRI installed, for benchmarks.
+
+    python -m benchmarks.serve --port 8800
+"""
+import argparse
+import os
+
+import uvicorn
+
+from benchmarks import fake_gcri
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the backend with a fake GCRI.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    args = parser.parse_args()
+
+    # The fake only exists in this process, so GCRI must run on threads here.
+    os.environ['RUI_GCRI_EXECUTION'] = 'thread'
+    fake_gcri.install()
+
+    from main import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Local stand-in for the OpenAI, Anthropic and Gemini HTTP APIs, plain and
+streaming. Every request that offers tools gets a scripted tool call first;
+once a tool result comes back (or no tools are offered) it answers with text.
+
+    python -m benchmarks.stub_llm --port 8900 --latency 0.2 --jitter 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+REPLY_WORDS = 'The stub model answered this turn without calling any real provider.'.split()
+
+
+class Script:
+    def __init__(self, tool='check_task_status', latency=0.2, jitter=0.0, chunk_delay=0.0):
+        self.tool = tool if tool != 'none' else None
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+
+    async def wait(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+    async def pause(self):
+        if self.chunk_delay:
+            await asyncio.sleep(self.chunk_delay)
+
+
+def _prompt_tokens(body):
+    return max(1, len(json.dumps(body)) // 4)
+
+
+def _sse(data, event=None):
+    prefix = f'event: {event}\n' if event else ''
+    return f'{prefix}data: {json.dumps(data)}\n\n'
+
+
+def create_app(script):
+    app = FastAPI(title='Stub LLM')
+
+    @app.get('/health')
+    async def health():
+        return {'status': 'ok', 'requests': script.requests}
+
+    @app.post('/v1/chat/completions')
+    async def openai_chat(request: Request):
+        body = await request.json()
+        messages = body.get('messages', [])
+        use_tool = script.tool and body.get('tools') and messages and messages[-1]['role'] != 'tool'
+        usage = {
+            'prompt_tokens': _prompt_tokens(body),
+            'completion_tokens': len(REPLY_WORDS),
+            'total_tokens': _prompt_tokens(body) + len(REPLY_WORDS),
+            'prompt_tokens_details': {'cached_tokens': 0},
+        }
+        base = {'id': f'chatcmpl-{uuid.uuid4().hex[:12]}', 'created': int(time.time()), 'model': body.get('model')}
+        tool_call = {
+            'id': f'call_{uuid.uuid4().hex[:8]}',
+            'type': 'function',
+            'function': {'name': script.tool, 'arguments': '{}'},
+        }
+        await script.wait()
+
+        if not body.get('stream'):
+            message = {'role': 'assistant', 'content': None if use_tool else ' '.join(REPLY_WORDS)}
+            if use_tool:
+                message['tool_calls'] = [tool_call]
+            return {
+                **base,
+                'object': 'chat.completion',
+                'choices': [{'index': 0, 'message': message, 'finish_reason': 'tool_calls' if use_tool else 'stop'}],
+                'usage': usage,
+            }
+
+        async def chunks():
+            def chunk(delta, finish=None):
+                return _sse({
+                    **base,
+                    'object': 'chat.completion.chunk',
+                    'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}],
+                })
+            yield chunk({'role': 'assistant', 'content': ''})
+            if use_tool:
+                yield chunk({'tool_calls': [{'index': 0, **tool_call}]})
+            else:
+                for word in REPLY_WORDS:
+                    await script.pause()
+                    yield chunk({'content': word + ' '})
+            yield chunk({}, 'tool_calls' if use_tool else 'stop')
+            yield _sse({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})
+            yield 'data: [DONE]\n\n'
+
+        return StreamingResponse(chunks(), media_type='text/event-stream')
+
+    @app.post('/v1/messages')
+    async def anthropic_messages(request: Request):
+        body = await request.json()
+        last = (body.get('messages') or [{}])[-1]
+        has_result = isinstance(last.get('content'), list) and any(
+            block.get('type') == 'tool_result' for block in last['content']
+        )
+        use_tool = script.tool and body.get('tools') and not has_result
+        usage = {
+            'input_tokens': _prompt_tokens(body),
+            'output_tokens': len(REPLY_WORDS),
+            'cache_read_input_tokens': 0,
+            'cache_creation_input_tokens': 0,
+        }
+        tool_block = {'type': 'tool_use', 'id': f'toolu_{uuid.uuid4().hex[:8]}', 'name': script.tool, 'input': {}}
+        message = {
+            'id': f'msg_{uuid.uuid4().hex[:12]}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': body.get('model'),
+            'stop_sequence': None,
+        }
+        await script.wait()
+
+        if not body.get('stream'):
+            return {
+                **message,
+                'content': [tool_block] if use_tool else [{'type': 'text', 'text': ' '.join(REPLY_WORDS)}],
+                'stop_reason': 'tool_use' if use_tool else 'end_turn',
+                'usage': usage,
+            }
+
+        async def events():
+            yield _sse({
+                'type': 'message_start',
+                'message': {**message, 'content': [], 'stop_reason': None, 'usage': {**usage, 'output_tokens': 1}},
+            }, 'message_start')
+            if use_tool:
+                yield _sse({'type': 'content_block_start', 'index': 0, 'content_block': tool_block}, 'content_block_start')
+                yield _sse({
+                    'type': 'content_block_delta', 'index': 0,
+                    'delta': {'type': 'input_json_delta', 'partial_json': '{}'},
+                }, 'content_block_delta')
+            else:
+                yield _sse({
+                    'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''},
+                }, 'content_block_start')
+                for word in REPLY_WORDS:
+                    await script.pause()
+                    yield _sse({
+                        'type': 'content_block_delta', 'index': 0,
+                        'delta': {'type': 'text_delta', 'text': word + ' '},
+                    }, 'content_block_delta')
+            yield _sse({'type': 'content_block_stop', 'index': 0}, 'content_block_stop')
+            yield _sse({
+                'type': 'message_delta',
+                'delta': {'stop_reason': 'tool_use' if use_tool else 'end_turn', 'stop_sequence': None},
+                'usage': {'output_tokens': usage['output_tokens']},
+            }, 'message_delta')
+            yield _sse({'type': 'message_stop'}, 'message_stop')
+
+        return StreamingResponse(events(), media_type='text/event-stream')
+
+    @app.post('/v1beta/models/{target:path}')
+    async def gemini_generate(target: str, request: Request):
+        body = await request.json()
+        last = (body.get('contents') or [{}])[-1]
+        has_result = any('functionResponse' in part or 'function_response' in part for part in last.get('parts', []))
+        use_tool = script.tool and body.get('tools') and not has_result
+        usage = {
+            'promptTokenCount': _prompt_tokens(body),
+            'candidatesTokenCount': len(REPLY_WORDS),
+            'totalTokenCount': _prompt_tokens(body) + len(REPLY_WORDS),
+        }
+        await script.wait()
+
+        def response(parts, finish='STOP'):
+            return {
+                'candidates': [{'content': {'role': 'model', 'parts': parts}, 'finishReason': finish, 'index': 0}],
+                'usageMetadata': usage,
+            }
+
+        tool_parts = [{'functionCall': {'name': script.tool, 'args': {}}}]
+        if not target.endswith(':streamGenerateContent'):
+            return response(tool_parts if use_tool else [{'text': ' '.join(REPLY_WORDS)}])
+
+        async def chunks():
+            if use_tool:
+                yield _sse(response(tool_parts))
+                return
+            for word in REPLY_WORDS:
+                await script.pause()
+                yield _sse(response([{'text': word + ' '}]))
+
+        return StreamingResponse(chunks(), media_type='text/event-stream')
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scripted stub for the OpenAI, Anthropic and Gemini APIs.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds before each response starts')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra uniform random latency, seconds')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='seconds between streamed chunks')
+    parser.add_argument('--tool', default='check_task_status', help="tool to call first, or 'none'")
+    args = parser.parse_args()
+    script = Script(args.tool, args.latency, args.jitter, args.chunk_delay)
+    uvicorn.run(create_app(script), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,12 @@
+import asyncio
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import uvicorn
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -11,9 +14,45 @@ from routes.chat import router as chat_router
 from routes.task import router as task_router
 from routes.memory import router as memory_router
 from routes.keys import router as keys_router
-from services.ws_manager import ws_manager
+from services import comet_bridge, llm_clients
+from services.chat_sessions import chat_sessions
+from services.context_builder import context_builder
+from services.event_bridge import event_bridge
+from services.gcri_memory_watcher import watch_gcri_memory
+from services.gcri_runner import load_gcri, scheduler
+from services.key_store import load_cached_keys
+from services.metrics import MetricsMiddleware, registry
+from services.rate_limiter import rate_limiter
+from services.tracing import TracingMiddleware, tracer
+from services.warmup import warmup
+from services.ws_manager import negotiate, parse_subscription, ws_manager
 
-app = FastAPI(title='RUI Backend', version='0.1.0')
+
+warmup.add('keys', load_cached_keys)
+if scheduler.execution == 'thread':
+    # In process mode only the worker processes import gcri.
+    warmup.add('gcri', load_gcri)
+warmup.add('llm_clients', llm_clients.warm_up)
+warmup.add('tokenizer', context_builder.warm_up)
+warmup.add('comet', comet_bridge.warm_up)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    event_bridge.bind(asyncio.get_running_loop())
+    warmup.start()
+    watcher = asyncio.create_task(watch_gcri_memory(ws_manager))
+    if scheduler.execution == 'process':
+        scheduler.start()
+    yield
+    watcher.cancel()
+    event_bridge.stop()
+    scheduler.shutdown()
+    chat_sessions.close()
+    tracer.flush()
+
+
+app = FastAPI(title='RUI Backend', version='0.1.0', lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +61,8 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*'],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 app.include_router(chat_router)
 app.include_router(task_router)
@@ -33,12 +74,23 @@ app.state.ws_manager = ws_manager
 
 @app.websocket('/ws')
 async def websocket_endpoint(websocket: WebSocket):
-    await ws_manager.connect(websocket)
+    params = websocket.query_params
+    last_seq = params.get('last_seq')
+    encoding, compress = negotiate(params)
+    await ws_manager.connect(
+        websocket,
+        parse_subscription(params),
+        last_seq=int(last_seq) if last_seq and last_seq.isdigit() else None,
+        encoding=encoding,
+        compress=compress,
+    )
     try:
         while True:
             data = await websocket.receive_json()
             if data.get('type') == 'ping':
-                await websocket.send_json({'type': 'pong'})
+                ws_manager.send(websocket, {'type': 'pong'})
+            elif data.get('type') == 'subscribe':
+                ws_manager.subscribe(websocket, data)
     except WebSocketDisconnect:
         ws_manager.disconnect(websocket)
     except Exception:
@@ -50,5 +102,43 @@ async def health():
     return {'status': 'ok'}
 
 
+@app.get('/ready')
+async def ready():
+    """Readiness probe: 503 until every dependency warm-up has finished, with per-dependency state and timing."""
+    status = warmup.get_status()
+    return JSONResponse(status, status_code=200 if status['ready'] else 503)
+
+
+@app.get('/ws/stats')
+async def websocket_stats():
+    return {**ws_manager.get_stats(), 'bridge': event_bridge.get_stats()}
+
+
+@app.get('/metrics', response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of the metrics in services.metrics."""
+    return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.get('/debug/traces')
+def debug_traces(limit: int = Query(20, ge=1, le=200)):
+    """Most recent traces from the in-memory span buffer, as nested span trees."""
+    return {'traces': tracer.traces(limit), 'stats': tracer.get_stats()}
+
+
+@app.get('/debug/traces/{trace_id}')
+def debug_trace(trace_id: str):
+    trace = tracer.trace(trace_id)
+    if trace is None:
+        return {'status': 'error', 'message': f'Unknown trace: {trace_id}'}
+    return trace
+
+
+@app.get('/limits')
+async def rate_limits():
+    """Per-provider request/token buckets shared by chat and GCRI."""
+    return rate_limiter.get_stats()
+
+
 if __name__ == '__main__':
     uvicorn.run('main:app', host='0.0.0.0', port=8000, reload=True)
@@ -1,16 +1,33 @@
+import asyncio
+import contextlib
 import json
+import time
 
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from loguru import logger
 
 from agent.agent_prompt import SYSTEM_PROMPT
-from agent.agent_tools import TOOLS
-from agent.tool_executor import execute_tool
-from services.key_store import get_key
+from agent.tool_executor import execute_tool_calls
+from services.chat_sessions import chat_sessions
+from services.context_builder import context_builder
+from services.llm_clients import genai_types, get_client, get_tool_schemas
+from services.llm_hedging import BACKUP_MODEL, hedger
+from services.metrics import llm_errors, llm_request_seconds
+from services.llm_usage import add_usage, anthropic_usage, gemini_usage, openai_usage, usage_stats
+from services.rate_limiter import rate_limiter
+from services.tracing import tracer
 
 router = APIRouter(prefix='/api', tags=['chat'])
 
+# Anthropic prompt-cache breakpoint. One goes on the static system prompt
+# (caching tools + system), one on the newest message (caching the
+# conversation so far for the next round of the tool loop).
+CACHE_CONTROL = {'type': 'ephemeral'}
+# Output tokens charged against the provider's TPM bucket up front; corrected from usage afterwards.
+OUTPUT_TOKEN_ESTIMATE = 1024
+
 MODEL_PROVIDERS = {
     # OpenAI — GPT-5.x
     'gpt-5.2': 'openai',
@@ -48,61 +65,104 @@ MODEL_PROVIDERS = {
 class ChatRequest(BaseModel):
     message: str
     config: dict = {}
+    # Only used to seed a session the server does not know yet, or to replace
+    # its transcript when ``reset`` is set (e.g. after editing an earlier message).
     history: list = []
     session_id: str = None
+    reset: bool = False
 
 
-async def _call_openai(model, messages, tools):
-    """Call OpenAI-compatible API with function calling."""
-    try:
-        from openai import AsyncOpenAI
-    except ImportError:
-        raise ImportError('openai package not installed. Run: pip install openai')
+class NormalizedMessage:
+    """Provider-agnostic assistant message in the OpenAI message shape."""
 
-    client = AsyncOpenAI(api_key=get_key('openai'))
-    kwargs = dict(model=model, messages=messages, tools=tools)
+    def __init__(self, content, tool_calls, usage=None):
+        self.content = content or None
+        self.tool_calls = tool_calls or None
+        self.usage = usage
+
+    def model_dump(self):
+        result = {'role': 'assistant', 'content': self.content}
+        if self.tool_calls:
+            result['tool_calls'] = self.tool_calls
+        return result
+
+
+def _openai_kwargs(model, messages, tools):
+    kwargs = dict(model=model, messages=messages)
+    if tools:
+        kwargs['tools'] = tools
     if not model.startswith(('o1', 'o3', 'o4', 'gpt-5')):
         kwargs['temperature'] = 0.7
-    response = await client.chat.completions.create(**kwargs)
-    return response.choices[0].message
-
+    return kwargs
 
-async def _call_anthropic(model, messages, tools):
-    """Call Anthropic API with tool use."""
-    try:
-        from anthropic import AsyncAnthropic
-    except ImportError:
-        raise ImportError('anthropic package not installed. Run: pip install anthropic')
-
-    client = AsyncAnthropic(api_key=get_key('anthropic'))
-
-    anthropic_tools = []
-    for tool in tools:
-        func = tool['function']
-        anthropic_tools.append({
-            'name': func['name'],
-            'description': func['description'],
-            'input_schema': func['parameters'],
-        })
-
-    system_message = None
-    chat_messages = []
-    for msg in messages:
-        if msg['role'] == 'system':
-            system_message = msg['content']
-        else:
-            chat_messages.append(msg)
 
-    response = await client.messages.create(
+def _anthropic_kwargs(model, messages, tools):
+    system_blocks, chat_messages = _anthropic_messages(messages)
+    _mark_cache_breakpoints(system_blocks, chat_messages)
+    kwargs = dict(
         model=model,
-        system=system_message or '',
         messages=chat_messages,
-        tools=anthropic_tools,
         max_tokens=4096,
         temperature=0.7,
     )
+    if system_blocks:
+        kwargs['system'] = system_blocks
+    if tools:
+        kwargs['tools'] = tools
+    return kwargs
+
+
+def _anthropic_messages(messages):
+    """Split system messages out as text blocks and convert tool turns to Anthropic content blocks."""
+    system_blocks = []
+    chat_messages = []
+    for msg in messages:
+        role = msg['role']
+        if role == 'system':
+            system_blocks.append({'type': 'text', 'text': msg['content']})
+        elif role == 'tool':
+            block = {
+                'type': 'tool_result',
+                'tool_use_id': msg['tool_call_id'],
+                'content': msg['content'],
+            }
+            previous = chat_messages[-1] if chat_messages else None
+            if previous and previous['role'] == 'user' and isinstance(previous['content'], list):
+                previous['content'].append(block)
+            else:
+                chat_messages.append({'role': 'user', 'content': [block]})
+        elif role == 'assistant' and msg.get('tool_calls'):
+            blocks = []
+            if msg.get('content'):
+                blocks.append({'type': 'text', 'text': msg['content']})
+            for tool_call in msg['tool_calls']:
+                func = tool_call['function']
+                blocks.append({
+                    'type': 'tool_use',
+                    'id': tool_call['id'],
+                    'name': func['name'],
+                    'input': json.loads(func.get('arguments') or '{}'),
+                })
+            chat_messages.append({'role': 'assistant', 'content': blocks})
+        else:
+            chat_messages.append({'role': role, 'content': msg.get('content') or ''})
+    return system_blocks, chat_messages
 
-    # Normalize Anthropic response to OpenAI-like format
+
+def _mark_cache_breakpoints(system_blocks, chat_messages):
+    if system_blocks:
+        system_blocks[0]['cache_control'] = CACHE_CONTROL
+    if not chat_messages:
+        return
+    last = chat_messages[-1]
+    if isinstance(last['content'], str):
+        if not last['content']:
+            return
+        last['content'] = [{'type': 'text', 'text': last['content']}]
+    last['content'][-1]['cache_control'] = CACHE_CONTROL
+
+
+def _normalize_anthropic(response):
     text_content = ''
     tool_calls = []
     for block in response.content:
@@ -117,60 +177,90 @@ async def _call_anthropic(model, messages, tools):
                     'arguments': json.dumps(block.input),
                 },
             })
+    return NormalizedMessage(text_content, tool_calls, anthropic_usage(response.usage))
+
+
+def _gemini_contents(messages, types):
+    """Split the system prompt out and convert tool turns to Gemini function parts."""
+    system_parts = []
+    contents = []
+    call_names = {}
+    for msg in messages:
+        role = msg['role']
+        if role == 'system':
+            system_parts.append(msg['content'])
+        elif role == 'user':
+            contents.append(types.Content(role='user', parts=[types.Part.from_text(text=msg['content'])]))
+        elif role == 'assistant':
+            parts = []
+            if msg.get('content'):
+                parts.append(types.Part.from_text(text=msg['content']))
+            for tool_call in msg.get('tool_calls') or []:
+                func = tool_call['function']
+                call_names[tool_call['id']] = func['name']
+                parts.append(types.Part.from_function_call(
+                    name=func['name'],
+                    args=json.loads(func.get('arguments') or '{}'),
+                ))
+            if parts:
+                contents.append(types.Content(role='model', parts=parts))
+        elif role == 'tool':
+            part = types.Part.from_function_response(
+                name=call_names.get(msg['tool_call_id'], msg['tool_call_id']),
+                response={'result': msg['content']},
+            )
+            previous = contents[-1] if contents else None
+            if previous is not None and previous.role == 'user' and previous.parts[0].function_response:
+                previous.parts.append(part)
+            else:
+                contents.append(types.Content(role='user', parts=[part]))
+    return '\n\n'.join(system_parts) or None, contents
+
+
+def _gemini_config(system_instruction, tools, types):
+    return types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        tools=tools,
+        temperature=0.7,
+    )
 
-    class NormalizedMessage:
-        def __init__(self, content, tool_calls):
-            self.content = content or None
-            self.tool_calls = tool_calls or None
 
-        def model_dump(self):
-            result = {'role': 'assistant', 'content': self.content}
-            if self.tool_calls:
-                result['tool_calls'] = self.tool_calls
-            return result
+def _gemini_tool_call(function_call, index):
+    return {
+        'id': f'gemini_{function_call.name}_{index}',
+        'type': 'function',
+        'function': {
+            'name': function_call.name,
+            'arguments': json.dumps(dict(function_call.args)) if function_call.args else '{}',
+        },
+    }
 
-    return NormalizedMessage(text_content, tool_calls)
+
+async def _call_openai(model, messages, tools):
+    """Call OpenAI-compatible API with function calling."""
+    client = get_client('openai')
+    response = await client.chat.completions.create(**_openai_kwargs(model, messages, tools))
+    message = response.choices[0].message
+    return NormalizedMessage(message.content, message.tool_calls, openai_usage(response.usage))
+
+
+async def _call_anthropic(model, messages, tools):
+    """Call Anthropic API with tool use."""
+    client = get_client('anthropic')
+    response = await client.messages.create(**_anthropic_kwargs(model, messages, tools))
+    return _normalize_anthropic(response)
 
 
 async def _call_google(model, messages, tools):
     """Call Google Gemini API with function calling."""
-    try:
-        from google import genai
-        from google.genai import types
-    except ImportError:
-        raise ImportError('google-genai package not installed. Run: pip install google-genai')
-
-    client = genai.Client(api_key=get_key('google'))
-
-    gemini_tools = []
-    for tool in tools:
-        func = tool['function']
-        gemini_tools.append(types.Tool(
-            function_declarations=[types.FunctionDeclaration(
-                name=func['name'],
-                description=func['description'],
-                parameters=func['parameters'],
-            )]
-        ))
-
-    system_instruction = None
-    contents = []
-    for msg in messages:
-        if msg['role'] == 'system':
-            system_instruction = msg['content']
-        elif msg['role'] == 'user':
-            contents.append(types.Content(role='user', parts=[types.Part.from_text(text=msg['content'])]))
-        elif msg['role'] == 'assistant':
-            contents.append(types.Content(role='model', parts=[types.Part.from_text(text=msg['content'])]))
+    client = get_client('google')
+    types = genai_types()
+    system_instruction, contents = _gemini_contents(messages, types)
 
     response = await client.aio.models.generate_content(
         model=model,
         contents=contents,
-        config=types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            tools=gemini_tools,
-            temperature=0.7,
-        ),
+        config=_gemini_config(system_instruction, tools, types),
     )
 
     text_content = ''
@@ -180,106 +270,352 @@ async def _call_google(model, messages, tools):
             if part.text:
                 text_content += part.text
             elif part.function_call:
-                fc = part.function_call
-                tool_calls.append({
-                    'id': f'gemini_{fc.name}',
-                    'type': 'function',
-                    'function': {
-                        'name': fc.name,
-                        'arguments': json.dumps(dict(fc.args)) if fc.args else '{}',
-                    },
-                })
+                tool_calls.append(_gemini_tool_call(part.function_call, len(tool_calls)))
 
-    class NormalizedMessage:
-        def __init__(self, content, tool_calls):
-            self.content = content or None
-            self.tool_calls = tool_calls or None
+    return NormalizedMessage(text_content, tool_calls, gemini_usage(response.usage_metadata))
 
-        def model_dump(self):
-            result = {'role': 'assistant', 'content': self.content}
-            if self.tool_calls:
-                result['tool_calls'] = self.tool_calls
-            return result
 
-    return NormalizedMessage(text_content, tool_calls)
+async def _stream_openai(model, messages, tools):
+    """Stream an OpenAI completion, yielding text deltas and then the full message."""
+    client = get_client('openai')
+    stream = await client.chat.completions.create(
+        **_openai_kwargs(model, messages, tools),
+        stream=True,
+        stream_options={'include_usage': True},
+    )
+
+    text_content = ''
+    partial_calls = {}
+    usage = None
+    async for chunk in stream:
+        if chunk.usage is not None:
+            usage = openai_usage(chunk.usage)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            text_content += delta.content
+            yield delta.content
+        for tool_delta in delta.tool_calls or []:
+            call = partial_calls.setdefault(tool_delta.index, {
+                'id': None,
+                'type': 'function',
+                'function': {'name': '', 'arguments': ''},
+            })
+            if tool_delta.id:
+                call['id'] = tool_delta.id
+            if tool_delta.function:
+                if tool_delta.function.name:
+                    call['function']['name'] += tool_delta.function.name
+                if tool_delta.function.arguments:
+                    call['function']['arguments'] += tool_delta.function.arguments
+
+    tool_calls = [partial_calls[index] for index in sorted(partial_calls)]
+    yield NormalizedMessage(text_content, tool_calls, usage)
+
+
+async def _stream_anthropic(model, messages, tools):
+    """Stream an Anthropic message, yielding text deltas and then the full message."""
+    client = get_client('anthropic')
+    async with client.messages.stream(**_anthropic_kwargs(model, messages, tools)) as stream:
+        async for text in stream.text_stream:
+            yield text
+        response = await stream.get_final_message()
+    yield _normalize_anthropic(response)
+
+
+async def _stream_google(model, messages, tools):
+    """Stream a Gemini completion, yielding text deltas and then the full message."""
+    client = get_client('google')
+    types = genai_types()
+    system_instruction, contents = _gemini_contents(messages, types)
+
+    stream = await client.aio.models.generate_content_stream(
+        model=model,
+        contents=contents,
+        config=_gemini_config(system_instruction, tools, types),
+    )
+
+    text_content = ''
+    tool_calls = []
+    usage_metadata = None
+    async for chunk in stream:
+        if chunk.usage_metadata is not None:
+            usage_metadata = chunk.usage_metadata
+        for candidate in chunk.candidates or []:
+            if candidate.content is None:
+                continue
+            for part in candidate.content.parts or []:
+                if part.text:
+                    text_content += part.text
+                    yield part.text
+                elif part.function_call:
+                    tool_calls.append(_gemini_tool_call(part.function_call, len(tool_calls)))
+
+    yield NormalizedMessage(text_content, tool_calls, gemini_usage(usage_metadata))
+
+
+def _model_label(model):
+    """Model name for metric labels; unknown ids (the config accepts any) share one series."""
+    return model if model in MODEL_PROVIDERS else 'other'
 
 
-async def _call_llm(model, messages, tools):
-    """Route to the correct provider based on model ID."""
+def _estimate_tokens(model, messages):
+    return sum(context_builder.count(model, message) for message in messages) + OUTPUT_TOKEN_ESTIMATE
+
+
+def _paused_for(model):
+    return rate_limiter.get(MODEL_PROVIDERS.get(model, 'openai')).paused_for()
+
+
+def _settle(provider, estimate, usage):
+    if usage:
+        rate_limiter.get(provider).settle(estimate, usage['input_tokens'] + usage['output_tokens'])
+
+
+async def _call_llm(model, messages, use_tools=True, on_acquired=None):
+    """Route to the correct provider based on model ID, under that provider's rate limits."""
     provider = MODEL_PROVIDERS.get(model, 'openai')
+    tools = get_tool_schemas(provider) if use_tools else None
     if provider == 'anthropic':
-        return await _call_anthropic(model, messages, tools)
+        request = lambda: _call_anthropic(model, messages, tools)
     elif provider == 'google':
-        return await _call_google(model, messages, tools)
+        request = lambda: _call_google(model, messages, tools)
+    else:
+        request = lambda: _call_openai(model, messages, tools)
+    estimate = _estimate_tokens(model, messages)
+    started = time.perf_counter()
+    try:
+        with tracer.span('llm.call', provider=provider, model=model, tokens_estimate=estimate):
+            message = await rate_limiter.call(provider, request, tokens=estimate, on_acquired=on_acquired)
+    except Exception:
+        llm_errors.inc(provider, _model_label(model))
+        raise
+    llm_request_seconds.observe(time.perf_counter() - started, provider, _model_label(model), 'call')
+    _settle(provider, estimate, message.usage)
+    usage_stats.record(provider, model, message.usage)
+    return message
+
+
+async def _stream_llm(model, messages, on_acquired=None):
+    """Route a streaming call to the correct provider based on model ID."""
+    provider = MODEL_PROVIDERS.get(model, 'openai')
+    tools = get_tool_schemas(provider)
+
+    async def open_stream():
+        # Failures before the first item (including 429s) are retried by the limiter.
+        if provider == 'anthropic':
+            stream = _stream_anthropic(model, messages, tools)
+        elif provider == 'google':
+            stream = _stream_google(model, messages, tools)
+        else:
+            stream = _stream_openai(model, messages, tools)
+        try:
+            return stream, await stream.__anext__()
+        except BaseException:
+            await stream.aclose()
+            raise
+
+    estimate = _estimate_tokens(model, messages)
+    started = time.perf_counter()
+    # Not a current span: the hedger may resume or close this generator from another task.
+    span = tracer.start_span('llm.stream', provider=provider, model=model, tokens_estimate=estimate)
+    try:
+        stream, item = await rate_limiter.call(provider, open_stream, tokens=estimate, on_acquired=on_acquired)
+        span.set_attribute('first_item_seconds', round(time.perf_counter() - started, 6))
+        async with contextlib.aclosing(stream):
+            while True:
+                if isinstance(item, NormalizedMessage):
+                    _settle(provider, estimate, item.usage)
+                    usage_stats.record(provider, model, item.usage)
+                    llm_request_seconds.observe(time.perf_counter() - started, provider, _model_label(model), 'stream')
+                yield item
+                try:
+                    item = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+    except Exception as error:
+        llm_errors.inc(provider, _model_label(model))
+        span.record_error(error)
+        raise
+    finally:
+        span.end()
+
+
+async def _complete(model, messages, emit, backup_model=None):
+    """
+    Run one LLM round, streaming text deltas through ``emit`` when given.
+    With a ``backup_model`` the call is hedged: see services.llm_hedging.
+    """
+    with tracer.span('chat.llm_round', model=model, backup_model=backup_model, stream=emit is not None) as span:
+        if emit is None:
+            answered_by, message = await hedger.call(
+                model, backup_model, lambda m, mark: _call_llm(m, messages, on_acquired=mark), paused_for=_paused_for,
+            )
+            span.set_attribute('answered_by', answered_by)
+            return message
+
+        message = None
+        open_stream = lambda m, mark: _stream_llm(m, messages, on_acquired=mark)
+        async for item in hedger.stream(model, backup_model, open_stream, paused_for=_paused_for):
+            if isinstance(item, str):
+                await emit({'type': 'token', 'content': item})
+            else:
+                message = item
+        return message
+
+
+def _parse_tool_call(tool_call):
+    if isinstance(tool_call, dict):
+        func = tool_call['function']
+        tool_name = func['name']
+        raw_args = func.get('arguments', '{}')
+        call_id = tool_call.get('id', tool_name)
     else:
-        return await _call_openai(model, messages, tools)
+        func = tool_call.function
+        tool_name = func.name
+        raw_args = func.arguments or '{}'
+        call_id = tool_call.id or tool_name
+    try:
+        arguments = json.loads(raw_args)
+    except json.JSONDecodeError:
+        arguments = {}
+    return call_id, tool_name, arguments
+
+
+def _transcript_entry(message):
+    """Plain-dict copy of an assistant message, keeping only what the providers read back."""
+    entry = {'role': 'assistant', 'content': message.content}
+    if message.tool_calls:
+        entry['tool_calls'] = [
+            tool_call if isinstance(tool_call, dict) else {
+                'id': tool_call.id,
+                'type': 'function',
+                'function': {'name': tool_call.function.name, 'arguments': tool_call.function.arguments or '{}'},
+            }
+            for tool_call in message.tool_calls
+        ]
+    return entry
 
 
-@router.post('/chat')
-async def chat(request: ChatRequest, raw_request: Request):
+def _seed_history(request):
+    history = [
+        {'role': entry['role'], 'content': entry.get('content', '')}
+        for entry in request.history
+        if entry.get('role') in ('user', 'assistant')
+    ]
+    if history and history[-1] == {'role': 'user', 'content': request.message}:
+        history.pop()
+    return history
+
+
+async def _session_history(request):
     """
-    Chat endpoint with LLM function-calling loop.
-    The agent receives a system prompt and tools, and can invoke backend
-    services (GCRI runner, memory) through tool calls.
+    Prior messages for this turn and whether they still need to be stored.
+    The server-side transcript wins; the client's history only seeds
+    sessions the server has not seen, or replaces the transcript on reset.
     """
-    ws_manager = raw_request.app.state.ws_manager
+    if request.session_id and not request.reset:
+        stored = await asyncio.to_thread(chat_sessions.get, request.session_id)
+        if stored is not None:
+            return stored, False
+    return _seed_history(request), True
+
+
+async def _summarize(model, messages):
+    """Plain completion without tools, used to fold older turns into a summary."""
+    message = await _call_llm(model, messages, use_tools=False)
+    return message.content or ''
+
+
+async def _save_turn(request, history, seeded, turn_messages):
+    if not request.session_id:
+        return
+    if seeded:
+        await asyncio.to_thread(chat_sessions.replace, request.session_id, history + turn_messages)
+    else:
+        await asyncio.to_thread(chat_sessions.append, request.session_id, turn_messages)
+
 
+async def _run_chat(request, ws_manager, emit=None):
+    """
+    Run the LLM function-calling loop for one chat turn and return
+    ``(result, error)``: failures become an error reply in ``result``, with
+    the exception in ``error`` (None on success) for the caller's span.
+    When ``emit`` is given, assistant tokens and tool-call progress are
+    passed to it as events while the loop runs.
+    """
     chat_model = request.config.get('chatModel', 'gpt-4o')
     config = request.config
+    backup_model = config.get('backupModel') or BACKUP_MODEL
 
-    messages = [{'role': 'system', 'content': SYSTEM_PROMPT}]
-
+    # SYSTEM_PROMPT and the tool schemas form a byte-identical prefix shared by
+    # every request, so provider prompt caches can reuse it. Anything that
+    # varies per session or turn comes after it.
     config_summary = (
         f'Current config: {config.get("branchCount", 3)} branches. '
         f'Chat model: {chat_model}. '
         f'Session ID: {request.session_id or "default"}.'
     )
-    messages[0]['content'] += f'\n\n## Current User Config\n{config_summary}'
-
-    for entry in request.history[-20:]:
-        role = entry.get('role', 'user')
-        if role in ('user', 'assistant'):
-            messages.append({'role': role, 'content': entry.get('content', '')})
-
-    messages.append({'role': 'user', 'content': request.message})
+    system_messages = [
+        {'role': 'system', 'content': SYSTEM_PROMPT},
+        {'role': 'system', 'content': f'## Current User Config\n{config_summary}'},
+    ]
 
+    summary_model = config.get('summaryModel') or chat_model
     max_tool_rounds = 5
     tool_calls_made = []
+    usage = {}
 
     try:
+        history, seeded = await _session_history(request)
+        messages = await context_builder.build(
+            chat_model,
+            system_messages,
+            history,
+            {'role': 'user', 'content': request.message},
+            session_key=request.session_id,
+            summarize=lambda prompt: _summarize(summary_model, prompt),
+            budget=config.get('contextBudget'),
+        )
+        turn_start = len(messages) - 1
+
         for _ in range(max_tool_rounds):
-            assistant_message = await _call_llm(chat_model, messages, TOOLS)
+            assistant_message = await _complete(chat_model, messages, emit, backup_model)
+            add_usage(usage, assistant_message.usage)
 
             if not assistant_message.tool_calls:
+                reply = assistant_message.content or ''
+                await _save_turn(
+                    request, history, seeded, messages[turn_start:] + [{'role': 'assistant', 'content': reply}],
+                )
                 return {
-                    'reply': assistant_message.content or '',
+                    'reply': reply,
                     'tool_calls': tool_calls_made,
-                }
-
-            messages.append(assistant_message.model_dump())
-
-            for tool_call in assistant_message.tool_calls:
-                if isinstance(tool_call, dict):
-                    func = tool_call['function']
-                    tool_name = func['name']
-                    raw_args = func.get('arguments', '{}')
-                    call_id = tool_call.get('id', tool_name)
-                else:
-                    func = tool_call.function
-                    tool_name = func.name
-                    raw_args = func.arguments or '{}'
-                    call_id = tool_call.id or tool_name
-                try:
-                    arguments = json.loads(raw_args)
-                except json.JSONDecodeError:
-                    arguments = {}
-
-                result = await execute_tool(tool_name, arguments, config, ws_manager)
+                    'usage': usage,
+                }, None
+
+            messages.append(_transcript_entry(assistant_message))
+
+            parsed_calls = [_parse_tool_call(tool_call) for tool_call in assistant_message.tool_calls]
+            if emit is not None:
+                for call_id, tool_name, arguments in parsed_calls:
+                    await emit({'type': 'tool_call', 'id': call_id, 'tool': tool_name, 'arguments': arguments})
+
+            results = await execute_tool_calls(
+                [(tool_name, arguments) for _, tool_name, arguments in parsed_calls],
+                config,
+                ws_manager,
+                session_id=request.session_id,
+            )
+            for (call_id, tool_name, arguments), result in zip(parsed_calls, results):
                 tool_calls_made.append({
                     'tool': tool_name,
                     'arguments': arguments,
                     'result': result,
                 })
+                if emit is not None:
+                    await emit({'type': 'tool_result', 'id': call_id, 'tool': tool_name, 'result': result})
 
                 messages.append({
                     'role': 'tool',
@@ -287,21 +623,126 @@ async def chat(request: ChatRequest, raw_request: Request):
                     'content': result,
                 })
 
-        final = await _call_llm(chat_model, messages, TOOLS)
+        final = await _complete(chat_model, messages, emit, backup_model)
+        add_usage(usage, final.usage)
+        reply = final.content or 'Task processing complete.'
+        await _save_turn(request, history, seeded, messages[turn_start:] + [{'role': 'assistant', 'content': reply}])
         return {
-            'reply': final.content or 'Task processing complete.',
+            'reply': reply,
             'tool_calls': tool_calls_made,
-        }
+            'usage': usage,
+        }, None
 
     except ImportError as error:
         logger.error(f'Missing dependency: {error}')
         return {
             'reply': f'⚠️ {error}',
             'tool_calls': [],
-        }
+        }, error
     except Exception as error:
         logger.error(f'Chat error: {error}')
         return {
             'reply': f'Error communicating with the LLM: {str(error)}',
             'tool_calls': [],
-        }
+        }, error
+
+
+async def _traced_chat(request, ws_manager, emit=None):
+    """_run_chat inside a 'chat.turn' span, bookmarked so a GCRI run started from this session links back to it."""
+    with tracer.span(
+        'chat.turn',
+        model=request.config.get('chatModel', 'gpt-4o'),
+        session_id=request.session_id,
+        stream=emit is not None,
+    ) as span:
+        if request.session_id:
+            tracer.bookmark(('chat', request.session_id), span.context)
+        result, error = await _run_chat(request, ws_manager, emit)
+        if error is not None:
+            span.record_error(error)
+        span.set_attribute('tool_calls', len(result['tool_calls']))
+        return result
+
+
+def _sse_frame(event):
+    return f'event: {event["type"]}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n'
+
+
+@router.post('/chat')
+async def chat(request: ChatRequest, raw_request: Request):
+    """
+    Chat endpoint with LLM function-calling loop.
+    The agent receives a system prompt and tools, and can invoke backend
+    services (GCRI runner, memory) through tool calls.
+    """
+    return await _traced_chat(request, raw_request.app.state.ws_manager)
+
+
+@router.post('/chat/stream')
+async def chat_stream(request: ChatRequest, raw_request: Request):
+    """
+    Streaming variant of /chat as a text/event-stream response.
+    Emits ``token``, ``tool_call`` and ``tool_result`` events while the
+    tool-calling loop runs, then a single ``done`` event carrying the same
+    payload /chat would have returned.
+    """
+    ws_manager = raw_request.app.state.ws_manager
+    queue = asyncio.Queue()
+
+    async def run():
+        try:
+            result = await _traced_chat(request, ws_manager, emit=queue.put)
+            await queue.put({'type': 'done', **result})
+        finally:
+            await queue.put(None)
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield _sse_frame(event)
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@router.get('/chat/context')
+def chat_context_stats():
+    """Token-count and summary cache statistics of the context builder."""
+    return context_builder.get_stats()
+
+
+@router.get('/chat/usage')
+def chat_usage_stats():
+    """Token totals and prompt-cache hit rates per provider and model, from provider usage fields."""
+    return usage_stats.get_stats()
+
+
+@router.get('/chat/latency')
+def chat_latency_stats():
+    """Per-model latency percentiles, current hedge thresholds and hedge/fallback counts."""
+    return hedger.get_stats()
+
+
+@router.get('/chat/sessions/{session_id}')
+def get_chat_session(session_id: str):
+    """Server-side transcript of a chat session, including tool calls and results."""
+    messages = chat_sessions.get(session_id)
+    if messages is None:
+        return {'session_id': session_id, 'exists': False, 'messages': []}
+    return {'session_id': session_id, 'exists': True, 'messages': messages}
+
+
+@router.delete('/chat/sessions/{session_id}')
+def delete_chat_session(session_id: str):
+    chat_sessions.delete(session_id)
+    return {'status': 'deleted', 'session_id': session_id}
@@ -1,6 +1,9 @@
-from fastapi import APIRouter
+from typing import Optional
 
-from services.comet_bridge import (
+from fastapi import APIRouter, Query
+
+from services.comet_async import (
+    get_bridge_stats,
     get_comet_memory_nodes,
     get_comet_node_detail,
     get_comet_sessions,
@@ -10,27 +13,69 @@ from services.comet_bridge import (
 
 router = APIRouter(prefix='/api/memory', tags=['memory'])
 
+MAX_PAGE_SIZE = 1000
+
+
+def _split(value):
+    if not value:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _node_query(limit, after, topic_tags, recall_mode, depth_level, fields):
+    return {
+        'limit': limit,
+        'after': after,
+        'topic_tags': _split(topic_tags),
+        'recall_mode': recall_mode,
+        'depth_level': depth_level,
+        'fields': _split(fields),
+    }
+
 
 @router.get('/comet')
-async def list_comet_memory():
-    return get_comet_memory_nodes()
+async def list_comet_memory(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    session_id: Optional[str] = None,
+    topic_tags: Optional[str] = Query(None, description='Comma-separated; matches nodes with any of the tags.'),
+    recall_mode: Optional[str] = None,
+    depth_level: Optional[int] = None,
+    fields: Optional[str] = Query(None, description='Comma-separated node fields to return.'),
+):
+    query = _node_query(limit, after, topic_tags, recall_mode, depth_level, fields)
+    return await get_comet_memory_nodes(session_id=session_id, **query)
 
 
 @router.get('/comet/sessions')
 async def list_comet_sessions():
-    return get_comet_sessions()
+    return await get_comet_sessions()
 
 
 @router.get('/comet/sessions/{session_id}')
-async def list_session_nodes(session_id: str):
-    return get_comet_session_nodes(session_id)
+async def list_session_nodes(
+    session_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    topic_tags: Optional[str] = Query(None, description='Comma-separated; matches nodes with any of the tags.'),
+    recall_mode: Optional[str] = None,
+    depth_level: Optional[int] = None,
+    fields: Optional[str] = Query(None, description='Comma-separated node fields to return.'),
+):
+    query = _node_query(limit, after, topic_tags, recall_mode, depth_level, fields)
+    return await get_comet_session_nodes(session_id, **query)
+
+
+@router.get('/comet/bridge')
+async def comet_bridge_stats():
+    return get_bridge_stats()
 
 
 @router.get('/comet/{node_id}')
 async def get_comet_node(node_id: str, depth: int = 0):
-    return get_comet_node_detail(node_id, depth=depth)
+    return await get_comet_node_detail(node_id, depth=depth)
 
 
 @router.get('/gcri')
 async def list_gcri_memory():
-    return get_gcri_memory()
+    return await get_gcri_memory()
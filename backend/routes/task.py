@@ -1,7 +1,10 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
 
-from services.gcri_runner import run_gcri_task, abort_gcri_task, is_running
+from services.event_journal import event_journal
+from services.gcri_runner import run_gcri_task, abort_gcri_task, is_running, get_task, list_tasks, scheduler
 from services.ws_manager import ws_manager
 
 router = APIRouter(prefix='/api/task', tags=['task'])
@@ -10,6 +13,8 @@ router = APIRouter(prefix='/api/task', tags=['task'])
 class RunTaskRequest(BaseModel):
     task: str
     config: dict = {}
+    priority: int = 0
+    session_id: str = None
 
 
 class ConfirmTaskRequest(BaseModel):
@@ -19,22 +24,29 @@ class ConfirmTaskRequest(BaseModel):
     max_iterations: int = 3
     branch_models: list = []
     global_roles: dict = {}
+    priority: int = 0
+    session_id: str = None
+
+
+def _unknown_task(task_id):
+    return {'status': 'error', 'message': f'Unknown task: {task_id}'}
 
 
 @router.post('/run')
 async def start_task(request: RunTaskRequest):
-    if is_running():
-        return {'status': 'error', 'message': 'A task is already running'}
-    result = await run_gcri_task(request.task, request.config, ws_manager)
+    result = await run_gcri_task(
+        request.task,
+        request.config,
+        ws_manager,
+        priority=request.priority,
+        session_id=request.session_id,
+    )
     return result
 
 
 @router.post('/confirm')
 async def confirm_task(request: ConfirmTaskRequest):
-    """Start GCRI execution from a confirmed proposal scheme."""
-    if is_running():
-        return {'status': 'error', 'message': 'A task is already running'}
-
+    """Queue GCRI execution from a confirmed proposal scheme."""
     config = {
         'branchCount': request.branch_count,
         'maxIterations': request.max_iterations,
@@ -42,17 +54,74 @@ async def confirm_task(request: ConfirmTaskRequest):
         'globalRoles': request.global_roles,
         'commit_mode': request.commit_mode,
     }
-    result = await run_gcri_task(request.task_description, config, ws_manager)
+    result = await run_gcri_task(
+        request.task_description,
+        config,
+        ws_manager,
+        priority=request.priority,
+        session_id=request.session_id,
+    )
     return result
 
 
-@router.post('/abort')
-async def abort_task():
-    return abort_gcri_task()
-
-
 @router.get('/status')
 async def task_status():
     return {
         'running': is_running(),
+        'workers': scheduler.workers,
+        'tasks': list_tasks(),
     }
+
+
+@router.get('/journal')
+def journaled_tasks():
+    """List tasks that have an on-disk event journal, most recent first."""
+    return {'tasks': event_journal.list_tasks(), 'stats': event_journal.get_stats()}
+
+
+@router.get('/{task_id}/status')
+async def single_task_status(task_id: str):
+    task = get_task(task_id)
+    if task is None:
+        return _unknown_task(task_id)
+    return {**task.to_dict(), 'queue_position': scheduler.queue_position(task_id)}
+
+
+@router.post('/{task_id}/abort')
+async def abort_single_task(task_id: str):
+    if get_task(task_id) is None:
+        return _unknown_task(task_id)
+    return abort_gcri_task(task_id)
+
+
+@router.get('/{task_id}/result')
+async def task_result(task_id: str):
+    task = get_task(task_id)
+    if task is None:
+        return _unknown_task(task_id)
+    return {'task_id': task_id, 'status': task.status, 'result': task.result, 'error': task.error}
+
+
+@router.get('/{task_id}/profile')
+async def task_profile(task_id: str):
+    """Per-iteration, per-phase and per-branch timing of a task, assembled from its 'timing' events."""
+    task = get_task(task_id)
+    if task is None:
+        return _unknown_task(task_id)
+    return {'task_id': task_id, 'status': task.status, 'profile': task.profile}
+
+
+@router.get('/{task_id}/events')
+def task_events(
+    task_id: str,
+    start: int = Query(0, alias='from', ge=0),
+    end: Optional[int] = Query(None, alias='to', ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+):
+    """Replay journaled events of a task with ``from <= offset < to``."""
+    try:
+        records = event_journal.read(task_id, start=start, end=end, limit=limit)
+    except ValueError as error:
+        return {'status': 'error', 'message': str(error)}
+    next_offset = records[-1]['offset'] + 1 if records else start
+    return {'task_id': task_id, 'events': records, 'next': next_offset}
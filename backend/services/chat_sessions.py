@@ -0,0 +1,108 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+
+SESSIONS_DB_PATH = Path(os.environ.get('RUI_CHAT_SESSIONS_DB', Path.home() / '.rui' / 'chat_sessions.sqlite3'))
+MAX_MEMORY_SESSIONS = int(os.environ.get('RUI_CHAT_SESSIONS_IN_MEMORY', '200'))
+
+
+class ChatSessionStore:
+    """
+    Full chat transcripts (including tool calls and tool results) keyed by
+    session_id. Every change is written through to SQLite; the most recently
+    used sessions are also kept in memory and loaded back on demand. Calls
+    block on disk I/O, so async code should run them in a thread.
+    """
+
+    def __init__(self, db_path=SESSIONS_DB_PATH, max_memory_sessions=MAX_MEMORY_SESSIONS):
+        self.db_path = Path(db_path)
+        self.max_memory_sessions = max_memory_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connection(self):
+        if self._db is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'session_id TEXT PRIMARY KEY, messages TEXT NOT NULL, updated_at REAL NOT NULL)'
+            )
+        return self._db
+
+    def _write(self, session_id, messages):
+        db = self._connection()
+        db.execute(
+            'INSERT OR REPLACE INTO sessions (session_id, messages, updated_at) VALUES (?, ?, ?)',
+            (session_id, json.dumps(messages, ensure_ascii=False), time.time()),
+        )
+        db.commit()
+
+    def _load(self, session_id):
+        row = self._connection().execute(
+            'SELECT messages FROM sessions WHERE session_id = ?', (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _lookup(self, session_id):
+        messages = self._sessions.get(session_id)
+        if messages is None:
+            messages = self._load(session_id)
+        return messages
+
+    def _remember(self, session_id, messages):
+        self._sessions[session_id] = messages
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_memory_sessions:
+            self._sessions.popitem(last=False)
+
+    def get(self, session_id):
+        """Return a copy of the session's message list, or None if the server has never seen it."""
+        with self._lock:
+            try:
+                messages = self._lookup(session_id)
+            except Exception as error:
+                logger.warning(f'Failed to load chat session {session_id}: {error}')
+                return None
+            if messages is None:
+                return None
+            self._remember(session_id, messages)
+            return list(messages)
+
+    def append(self, session_id, messages):
+        """Add messages to the end of a session, loading it back from disk if it was evicted."""
+        with self._lock:
+            stored = list(self._lookup(session_id) or [])
+            stored.extend(messages)
+            self._write(session_id, stored)
+            self._remember(session_id, stored)
+
+    def replace(self, session_id, messages):
+        with self._lock:
+            stored = list(messages)
+            self._write(session_id, stored)
+            self._remember(session_id, stored)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._connection().execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+            self._connection().commit()
+
+    def close(self):
+        with self._lock:
+            self._sessions.clear()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+chat_sessions = ChatSessionStore()
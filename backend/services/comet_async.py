@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from services import comet_bridge
+from services.metrics import comet_run_seconds, comet_wait_seconds, gauge
+from services.tracing import tracer
+
+
+COMET_MAX_WORKERS = int(os.environ.get('RUI_COMET_WORKERS', '4'))
+COMET_MAX_PENDING = int(os.environ.get('RUI_COMET_MAX_PENDING', '64'))
+COMET_CALL_TIMEOUT = float(os.environ.get('RUI_COMET_TIMEOUT', '30'))
+SLOW_QUEUE_WAIT = 0.5
+
+_executor = ThreadPoolExecutor(max_workers=COMET_MAX_WORKERS, thread_name_prefix='comet')
+_stats_lock = threading.Lock()
+_pending = 0
+_stats = {
+    'calls': 0,
+    'timeouts': 0,
+    'rejected': 0,
+    'queue_wait_total': 0.0,
+    'queue_wait_max': 0.0,
+    'run_total': 0.0,
+}
+
+
+def _record(name, value):
+    with _stats_lock:
+        _stats[name] += value
+
+
+def _record_wait(name, wait):
+    with _stats_lock:
+        _stats['calls'] += 1
+        _stats['queue_wait_total'] += wait
+        _stats['queue_wait_max'] = max(_stats['queue_wait_max'], wait)
+    if wait > SLOW_QUEUE_WAIT:
+        logger.warning(f'CoMeT call {name} waited {wait:.3f}s for a worker')
+
+
+def _release(future=None):
+    global _pending
+    with _stats_lock:
+        _pending -= 1
+
+
+gauge('rui_comet_pending', 'CoMeT calls waiting for or running on a worker.', lambda: _pending)
+
+
+def get_bridge_stats():
+    """Return executor counters, including average and max queue-wait time."""
+    with _stats_lock:
+        stats = dict(_stats)
+    calls = stats['calls']
+    stats['queue_wait_avg'] = stats['queue_wait_total'] / calls if calls else 0.0
+    stats['run_avg'] = stats['run_total'] / calls if calls else 0.0
+    stats['pending'] = _pending
+    stats['max_workers'] = COMET_MAX_WORKERS
+    stats['max_pending'] = COMET_MAX_PENDING
+    stats['search_cache'] = comet_bridge.get_search_cache_stats()
+    return stats
+
+
+async def run_comet_call(func, *args, fallback=None, timeout=COMET_CALL_TIMEOUT, **kwargs):
+    """
+    Run a synchronous comet_bridge function on the bounded CoMeT executor.
+    Returns ``fallback`` with an ``error`` key when the bridge is saturated
+    or the call exceeds ``timeout`` seconds.
+    """
+    global _pending
+    fallback = fallback or {}
+    with _stats_lock:
+        if _pending >= COMET_MAX_PENDING:
+            _stats['rejected'] += 1
+            return {**fallback, 'error': 'CoMeT bridge is overloaded, try again shortly'}
+        _pending += 1
+
+    name = func.__name__
+    submitted = time.perf_counter()
+
+    def job():
+        started = time.perf_counter()
+        _record_wait(name, started - submitted)
+        comet_wait_seconds.observe(started - submitted, name)
+        try:
+            with tracer.span('comet.call', call=name, queue_wait=round(started - submitted, 6)):
+                return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _record('run_total', elapsed)
+            comet_run_seconds.observe(elapsed, name)
+
+    try:
+        # The executor does not carry contextvars over; copy them so the span nests under the caller's.
+        future = _executor.submit(contextvars.copy_context().run, job)
+    except BaseException:
+        _release()
+        raise
+    # A timed-out call keeps its worker busy, so the slot is freed when the job
+    # itself ends (or is cancelled before starting), not when the caller gives up.
+    future.add_done_callback(_release)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        _record('timeouts', 1)
+        logger.warning(f'CoMeT call {name} timed out after {timeout}s')
+        return {**fallback, 'error': f'CoMeT call timed out after {timeout}s'}
+
+
+async def get_comet_memory_nodes(**kwargs):
+    return await run_comet_call(comet_bridge.get_comet_memory_nodes, fallback={'nodes': []}, **kwargs)
+
+
+async def search_comet_memory(query, top_k=5):
+    cached = comet_bridge.peek_search_cache(query, top_k)
+    if cached is not None:
+        return cached
+    return await run_comet_call(comet_bridge.search_comet_memory, query, top_k=top_k, fallback={'results': []})
+
+
+async def get_comet_sessions():
+    return await run_comet_call(comet_bridge.get_comet_sessions, fallback={'sessions': []})
+
+
+async def get_comet_session_nodes(session_id, **kwargs):
+    return await run_comet_call(comet_bridge.get_comet_session_nodes, session_id, fallback={'nodes': []}, **kwargs)
+
+
+async def get_comet_node_detail(node_id, depth=0):
+    return await run_comet_call(comet_bridge.get_comet_node_detail, node_id, depth=depth)
+
+
+async def get_gcri_memory(memory_path=None):
+    return await run_comet_call(
+        comet_bridge.get_gcri_memory,
+        memory_path,
+        fallback={'global_rules': [], 'domain_rules': {}, 'knowledge': {}},
+    )
@@ -1,11 +1,39 @@
+import base64
+import bisect
 import json
+import os
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 
 from ato.adict import ADict
 from loguru import logger
 
+from services.lru_cache import TTLCache
+
 _comet_instance: Optional['CoMeT'] = None
+_comet_lock = threading.Lock()
+
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 300.0
+# Listing every memory is the only version signal CoMeT offers. Writes made by
+# this process invalidate the cache directly; the listing only catches other
+# writers, so it runs lazily, at most once per interval, when a cached search
+# is about to be served.
+VERSION_CHECK_INTERVAL = float(os.environ.get('RUI_COMET_VERSION_INTERVAL', '10'))
+
+_search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+# Bumped on every invalidation; a search only stores its result if no
+# invalidation happened while it ran.
+_generation = 0
+_generation_lock = threading.Lock()
+_memory_version = None
+_version_checked_at = 0.0
+_version_lock = threading.Lock()
+# Sorted index of list_memories() as (generation, (entries, keys)), so cursor
+# pages seek into it instead of listing and sorting the store each time.
+_node_index = None
 
 
 def _get_comet():
@@ -13,6 +41,14 @@ def _get_comet():
     if _comet_instance is not None:
         return _comet_instance
 
+    with _comet_lock:
+        if _comet_instance is not None:
+            return _comet_instance
+        return _init_comet()
+
+
+def _init_comet():
+    global _comet_instance
     try:
         from comet import CoMeT
         from comet.config import scope
@@ -30,39 +66,219 @@ def _get_comet():
         return None
 
 
-def get_comet_memory_nodes():
-    """Read CoMeT memory nodes from the storage backend."""
+def warm_up():
+    """Initialize CoMeT ahead of the first memory request; raises if it cannot be initialized."""
+    comet = _get_comet()
+    if comet is None:
+        raise RuntimeError('CoMeT failed to initialize')
+    _refresh_version(comet)
+
+
+NODE_FIELDS = (
+    'node_id',
+    'summary',
+    'trigger',
+    'session_id',
+    'recall_mode',
+    'topic_tags',
+    'depth_level',
+    'created_at',
+)
+_NODE_DEFAULTS = {
+    'node_id': '',
+    'summary': '',
+    'trigger': '',
+    'session_id': None,
+    'recall_mode': 'active',
+    'topic_tags': [],
+    'depth_level': 0,
+    'created_at': '',
+}
+
+
+def _sort_key(entry):
+    return (str(entry.get('created_at') or ''), str(entry.get('node_id') or ''))
+
+
+def _encode_cursor(entry):
+    raw = json.dumps(list(_sort_key(entry))).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    try:
+        created_at, node_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(created_at), str(node_id)
+    except Exception:
+        raise ValueError(f'Invalid cursor: {cursor}')
+
+
+def _sort_index(entries):
+    """Order entries oldest first, returned with their sort keys for bisecting."""
+    ordered = sorted(entries, key=_sort_key)
+    return ordered, [_sort_key(entry) for entry in ordered]
+
+
+def _page_nodes(
+    index,
+    limit=None,
+    after=None,
+    session_id=None,
+    topic_tags=None,
+    recall_mode=None,
+    depth_level=None,
+    fields=None,
+):
+    """
+    Filter and page a ``_sort_index`` of raw CoMeT entries, newest first.
+    ``after`` is the opaque ``next_cursor`` of the previous page; only the
+    requested ``fields`` of nodes on the returned page are materialized.
+    """
+    fields = [f for f in fields if f in NODE_FIELDS] if fields else list(NODE_FIELDS)
+    tags = set(topic_tags or [])
+    ordered, keys = index
+    end = bisect.bisect_left(keys, _decode_cursor(after)) if after else len(ordered)
+
+    def matches(entry):
+        if session_id is not None and entry.get('session_id') != session_id:
+            return False
+        if recall_mode is not None and entry.get('recall_mode', 'active') != recall_mode:
+            return False
+        if depth_level is not None and entry.get('depth_level', 0) != depth_level:
+            return False
+        return not tags or bool(tags.intersection(entry.get('topic_tags') or []))
+
+    if session_id is None and recall_mode is None and depth_level is None and not tags:
+        total = end
+        start = max(0, end - limit) if limit is not None else 0
+        page = ordered[start:end][::-1]
+    else:
+        # Filtered pages still walk everything before the cursor to report total.
+        total = 0
+        page = []
+        for position in range(end - 1, -1, -1):
+            if matches(ordered[position]):
+                total += 1
+                if limit is None or len(page) < limit:
+                    page.append(ordered[position])
+    next_cursor = _encode_cursor(page[-1]) if limit is not None and total > len(page) else None
+
+    nodes = [{f: entry.get(f, _NODE_DEFAULTS[f]) for f in fields} for entry in page]
+    return {'nodes': nodes, 'next_cursor': next_cursor, 'total': total}
+
+
+def get_comet_memory_nodes(**query):
+    """
+    Read CoMeT memory nodes from the storage backend.
+    Accepts the paging, filter and projection arguments of ``_page_nodes``.
+    """
     comet = _get_comet()
     if comet is None:
         return {'nodes': [], 'error': 'CoMeT not available'}
 
     try:
-        all_nodes = comet.list_memories()
-        result = []
-        for entry in all_nodes:
-            result.append({
-                'node_id': entry.get('node_id', ''),
-                'summary': entry.get('summary', ''),
-                'trigger': entry.get('trigger', ''),
-                'session_id': entry.get('session_id'),
-                'recall_mode': entry.get('recall_mode', 'active'),
-                'topic_tags': entry.get('topic_tags', []),
-                'depth_level': entry.get('depth_level', 0),
-                'created_at': entry.get('created_at', ''),
-            })
-        return {'nodes': result}
+        return _page_nodes(_memory_index(comet), **query)
+    except ValueError as error:
+        return {'nodes': [], 'error': str(error)}
     except Exception as error:
         logger.warning(f'Failed to read CoMeT memory: {error}')
         return {'nodes': [], 'error': str(error)}
 
 
+def _memory_index(comet):
+    """
+    Return the sorted index of all memories, rebuilt only after an
+    invalidation or once the version check interval has passed. CoMeT can
+    only list the whole store, so a rebuild is still a full scan.
+    """
+    global _node_index
+    with _version_lock:
+        if _node_index is not None and _node_index[0] == _generation and _version_is_fresh():
+            return _node_index[1]
+        generation = _generation
+        entries = comet.list_memories()
+        if _observe_version(entries):
+            generation += 1
+        index = _sort_index(entries)
+        _node_index = (generation, index)
+        return index
+
+
+def _observe_version(entries):
+    """Record the memory version seen in a full listing; clear cached searches and return True if it moved."""
+    global _memory_version, _version_checked_at
+    latest = max((str(entry.get('created_at') or '') for entry in entries), default='')
+    version = (len(entries), latest)
+    _version_checked_at = time.monotonic()
+    if version == _memory_version:
+        return False
+    if _memory_version is not None:
+        logger.debug(f'CoMeT memory changed {_memory_version} -> {version}, clearing search cache')
+    invalidate_search_cache()
+    _memory_version = version
+    return True
+
+
+def _version_is_fresh():
+    return time.monotonic() - _version_checked_at < VERSION_CHECK_INTERVAL
+
+
+def _refresh_version(comet):
+    """List CoMeT memory to check its version, unless that was done within the interval."""
+    with _version_lock:
+        if not _version_is_fresh():
+            _observe_version(comet.list_memories())
+
+
+def _search_key(query, top_k):
+    return ' '.join(query.lower().split()), top_k
+
+
+def peek_search_cache(query, top_k=5):
+    """
+    Return a cached search result without touching CoMeT, or None.
+    Only answers while the memory version was checked recently, so it is
+    safe to call from the event loop.
+    """
+    if not _version_is_fresh():
+        return None
+    return _search_cache.get(_search_key(query, top_k), record_miss=False)
+
+
+def invalidate_search_cache():
+    """Drop cached searches after something wrote to CoMeT, without waiting for the next version check."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        _search_cache.clear()
+
+
+def _store_search(key, data, generation):
+    with _generation_lock:
+        if generation == _generation:
+            _search_cache.set(key, data)
+
+
+def get_search_cache_stats():
+    return {**_search_cache.stats(), 'memory_version': _memory_version, 'generation': _generation}
+
+
 def search_comet_memory(query, top_k=5):
-    """Semantic search over CoMeT memory using query string."""
+    """Semantic search over CoMeT memory using query string, cached per memory version."""
     comet = _get_comet()
     if comet is None:
         return {'results': [], 'error': 'CoMeT not available'}
 
     try:
+        key = _search_key(query, top_k)
+        cached = _search_cache.get(key)
+        if cached is not None and not _version_is_fresh():
+            _refresh_version(comet)
+            cached = _search_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = _generation
+
         results = comet.retrieve(query, top_k=top_k)
         items = []
         for r in results:
@@ -75,7 +291,9 @@ def search_comet_memory(query, top_k=5):
                 'relevance_score': round(r.relevance_score, 4),
                 'rank': r.rank,
             })
-        return {'query': query, 'results': items}
+        data = {'query': query, 'results': items}
+        _store_search(key, data, generation)
+        return data
     except Exception as error:
         logger.warning(f'CoMeT search failed: {error}')
         return {'results': [], 'error': str(error)}
@@ -94,27 +312,16 @@ def get_comet_sessions():
         return {'sessions': [], 'error': str(error)}
 
 
-def get_comet_session_nodes(session_id: str):
-    """List nodes for a specific CoMeT session."""
+def get_comet_session_nodes(session_id: str, **query):
+    """List nodes for a specific CoMeT session, with the same paging as get_comet_memory_nodes."""
     comet = _get_comet()
     if comet is None:
         return {'nodes': [], 'error': 'CoMeT not available'}
 
     try:
-        nodes = comet.list_session_memories(session_id)
-        result = []
-        for entry in nodes:
-            result.append({
-                'node_id': entry.get('node_id', ''),
-                'summary': entry.get('summary', ''),
-                'trigger': entry.get('trigger', ''),
-                'session_id': entry.get('session_id'),
-                'recall_mode': entry.get('recall_mode', 'active'),
-                'topic_tags': entry.get('topic_tags', []),
-                'depth_level': entry.get('depth_level', 0),
-                'created_at': entry.get('created_at', ''),
-            })
-        return {'nodes': result}
+        return _page_nodes(_sort_index(comet.list_session_memories(session_id)), **query)
+    except ValueError as error:
+        return {'nodes': [], 'error': str(error)}
     except Exception as error:
         logger.warning(f'Failed to read session nodes: {error}')
         return {'nodes': [], 'error': str(error)}
@@ -135,23 +342,57 @@ def get_comet_node_detail(node_id, depth=0):
         return {'error': str(error)}
 
 
-def get_gcri_memory(memory_path=None):
-    """Read GCRI external memory JSON."""
+_gcri_memory_cache = {}
+_gcri_memory_lock = threading.Lock()
+
+
+def _gcri_memory_candidates(memory_path=None):
     candidates = []
     if memory_path:
         candidates.append(Path(memory_path))
     candidates.append(Path.cwd() / '.gcri' / 'external_memory.json')
     candidates.append(Path.home() / '.gcri' / 'external_memory.json')
+    return candidates
 
-    for path in candidates:
-        if path.exists():
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                data['_source_path'] = str(path)
-                return data
-            except Exception as error:
-                logger.warning(f'Failed to read GCRI memory at {path}: {error}')
+
+def find_gcri_memory(memory_path=None):
+    """Return (path, (mtime_ns, size)) of the first existing GCRI memory file, or (None, None)."""
+    for path in _gcri_memory_candidates(memory_path):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        return path, (stat.st_mtime_ns, stat.st_size)
+    return None, None
+
+
+def _load_gcri_memory(path, signature):
+    cached = _gcri_memory_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with _gcri_memory_lock:
+        cached = _gcri_memory_cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['_source_path'] = str(path)
+        _gcri_memory_cache[path] = (signature, data)
+        return data
+
+
+def get_gcri_memory(memory_path=None):
+    """Read GCRI external memory JSON, reusing the parsed document while mtime and size are unchanged."""
+    for path in _gcri_memory_candidates(memory_path):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        try:
+            return _load_gcri_memory(path, (stat.st_mtime_ns, stat.st_size))
+        except Exception as error:
+            logger.warning(f'Failed to read GCRI memory at {path}: {error}')
 
     return {
         'global_rules': [],
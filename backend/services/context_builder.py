@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+
+from loguru import logger
+
+from services.lru_cache import TTLCache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+CONTEXT_BUDGET = int(os.environ.get('RUI_CONTEXT_BUDGET', '16000'))
+# When history no longer fits, older turns are summarized until the kept turns
+# use at most this fraction of the budget, so the cut point (and the summary)
+# stays put for several requests instead of moving every turn.
+CONTEXT_LOW_WATER = float(os.environ.get('RUI_CONTEXT_LOW_WATER', '0.6'))
+SUMMARY_RESERVE = 600
+MESSAGE_OVERHEAD = 4
+# Fallback ratio for models without a local tokenizer.
+CHARS_PER_TOKEN = 3.5
+TOOL_RESULT_SUMMARY_CHARS = 500
+
+SUMMARY_PROMPT = (
+    'Summarize the earlier part of a conversation between a user and an assistant '
+    'that plans and runs GCRI tasks. Keep the user\'s goals, constraints, decisions, '
+    'task ids and outcomes of tool calls. Write at most 300 words in plain prose.'
+)
+
+
+def _encoding_for(model):
+    if tiktoken is None or not model.startswith(('gpt-', 'o1', 'o3', 'o4')):
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('o200k_base')
+
+
+def _message_text(message):
+    parts = [message.get('content') or '']
+    for tool_call in message.get('tool_calls') or []:
+        func = tool_call['function']
+        parts.append(func['name'])
+        parts.append(func.get('arguments') or '')
+    return '\n'.join(parts)
+
+
+def _digest(message):
+    return hashlib.blake2b(
+        json.dumps(message, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'),
+        digest_size=16,
+    ).hexdigest()
+
+
+def _turns(history):
+    """Split history into turns, each starting at a user message, so tool calls stay with their results."""
+    turns = []
+    for index, message in enumerate(history):
+        if message['role'] == 'user' or not turns:
+            turns.append(index)
+    return turns
+
+
+def _transcript(messages):
+    lines = []
+    for message in messages:
+        if message['role'] == 'tool':
+            lines.append(f'tool result: {(message.get("content") or "")[:TOOL_RESULT_SUMMARY_CHARS]}')
+            continue
+        if message.get('content'):
+            lines.append(f'{message["role"]}: {message["content"]}')
+        for tool_call in message.get('tool_calls') or []:
+            func = tool_call['function']
+            lines.append(f'tool call: {func["name"]}({func.get("arguments") or ""})')
+    return '\n'.join(lines)
+
+
+class ContextBuilder:
+    """
+    Fits chat history into a per-request token budget. Token counts are cached
+    per (tokenizer, message) so each message is counted once across turns.
+    The system prompt and the newest turns are always kept; older turns are
+    folded into a rolling summary that is cached per session and extended
+    only when more turns fall out of the window.
+    """
+
+    def __init__(self, budget=CONTEXT_BUDGET, low_water=CONTEXT_LOW_WATER):
+        self.budget = budget
+        self.low_water = low_water
+        self._encodings = {}
+        self._encoding_errors = set()
+        self._counts = TTLCache(maxsize=8192, ttl=3600.0)
+        self._summaries = TTLCache(maxsize=512, ttl=3600.0)
+        self.summaries_built = 0
+        self.summary_failures = 0
+
+    def _encoding(self, model):
+        if model not in self._encodings:
+            try:
+                self._encodings[model] = _encoding_for(model)
+            except Exception as error:
+                # Usually a failed BPE download; count by characters and try again next time.
+                if model not in self._encoding_errors:
+                    self._encoding_errors.add(model)
+                    logger.warning(f'No tokenizer for {model}, estimating from characters: {error}')
+                return None
+        return self._encodings[model]
+
+    def warm_up(self, models=('gpt-4o',)):
+        """Load the tokenizers of ``models``; tiktoken downloads its BPE files on first use."""
+        for model in models:
+            if model not in self._encodings:
+                self._encodings[model] = _encoding_for(model)
+
+    def count(self, model, message):
+        """Token count of one message for ``model``, including per-message overhead."""
+        encoding = self._encoding(model)
+        key = (encoding.name if encoding else 'chars', _digest(message))
+        tokens = self._counts.get(key)
+        if tokens is None:
+            text = _message_text(message)
+            if encoding is not None:
+                tokens = len(encoding.encode(text, disallowed_special=()))
+            else:
+                tokens = int(len(text) / CHARS_PER_TOKEN) + 1
+            tokens += MESSAGE_OVERHEAD
+            self._counts.set(key, tokens)
+        return tokens
+
+    def _cached_summary(self, session_key, history):
+        cached = self._summaries.get(session_key)
+        if cached is None:
+            return None
+        cut, fingerprint, summary = cached
+        if cut > len(history) or fingerprint != _digest(history[:cut]):
+            return None
+        return cut, summary
+
+    async def _summarize(self, session_key, history, cut, cached, summarize):
+        start, previous = cached if cached else (0, None)
+        if start > cut:
+            start, previous = 0, None
+        prompt = [{'role': 'system', 'content': SUMMARY_PROMPT}]
+        if previous:
+            prompt.append({'role': 'user', 'content': f'Summary so far:\n{previous}'})
+        prompt.append({'role': 'user', 'content': f'Conversation to add:\n{_transcript(history[start:cut])}'})
+        try:
+            summary = await summarize(prompt)
+        except Exception as error:
+            self.summary_failures += 1
+            logger.warning(f'Context summary failed, dropping older turns instead: {error}')
+            return previous
+        self.summaries_built += 1
+        self._summaries.set(session_key, (cut, _digest(history[:cut]), summary))
+        return summary
+
+    async def build(self, model, system_messages, history, new_message, session_key=None, summarize=None, budget=None):
+        """
+        Return the message list for one LLM call: ``system_messages``, an
+        optional summary of older turns, the newest turns that fit, and
+        ``new_message``. ``summarize`` is an async callable taking a message
+        list and returning summary text; without it older turns are dropped.
+        """
+        budget = budget or self.budget
+        fixed = sum(self.count(model, message) for message in system_messages) + self.count(model, new_message)
+        sizes = [self.count(model, message) for message in history]
+        if fixed + sum(sizes) <= budget:
+            return [*system_messages, *history, new_message]
+
+        session_key = session_key or 'default'
+        cached = self._cached_summary(session_key, history)
+        available = budget - fixed - SUMMARY_RESERVE
+        turn_starts = _turns(history)
+        if cached is not None and sum(sizes[cached[0]:]) <= available:
+            cut, summary = cached
+        else:
+            cut = len(history)
+            kept = 0
+            for start in reversed(turn_starts):
+                kept += sum(sizes[start:cut])
+                if kept > available * self.low_water:
+                    break
+                cut = start
+            summary = None
+            if summarize is not None and cut:
+                summary = await self._summarize(session_key, history, cut, cached, summarize)
+
+        messages = list(system_messages)
+        if summary:
+            messages.append({'role': 'system', 'content': f'## Earlier Conversation (summary)\n{summary}'})
+        messages.extend(history[cut:])
+        messages.append(new_message)
+        return messages
+
+    def get_stats(self):
+        return {
+            'budget': self.budget,
+            'low_water': self.low_water,
+            'tokenizer': 'tiktoken' if tiktoken is not None else 'chars',
+            'token_counts': self._counts.stats(),
+            'summaries': self._summaries.stats(),
+            'summaries_built': self.summaries_built,
+            'summary_failures': self.summary_failures,
+        }
+
+
+context_builder = ContextBuilder()
@@ -0,0 +1,155 @@
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from collections import deque
+
+from loguru import logger
+
+from services.metrics import callback_counter, gauge
+from services.tracing import current_context, tracer
+from services.ws_manager import coalesce_key, ws_manager
+
+
+BRIDGE_QUEUE_SIZE = int(os.environ.get('RUI_BRIDGE_QUEUE_SIZE', '2000'))
+BRIDGE_WINDOW = float(os.environ.get('RUI_BRIDGE_WINDOW', '0.05'))
+BRIDGE_PUT_TIMEOUT = 1.0
+
+
+class EventBridge:
+    """
+    Hands events from worker threads to the event loop through one bounded
+    queue. A single pump task drains it, batching events that arrive within
+    ``window`` seconds into one broadcast and keeping only the last of any
+    superseded state events (see ws_manager.coalesce_key). Each event carries
+    the span context it was put from, so the broadcast span of its batch
+    joins that trace.
+    """
+
+    def __init__(self, manager, maxsize=BRIDGE_QUEUE_SIZE, window=BRIDGE_WINDOW):
+        self._ws = manager
+        self.maxsize = maxsize
+        self.window = window
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._loop = None
+        self._loop_thread = None
+        self._wakeup = None
+        self._pump_task = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.delivered = 0
+
+    def bind(self, loop):
+        """Start the pump on ``loop``; must be called from that loop. Safe to call repeatedly."""
+        if self._pump_task is not None and not self._pump_task.done():
+            return
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._wakeup = asyncio.Event()
+        self._pump_task = loop.create_task(self._pump())
+        if self._pending:
+            self._wakeup.set()
+
+    def stop(self):
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+            self._pump_task = None
+
+    def put(self, data, trace=None):
+        """
+        Queue an event from any thread. When the queue is full a worker thread
+        blocks briefly for the pump to drain it; on the loop thread (e.g. an
+        abort from a request handler) waiting would stall the pump itself, so
+        the oldest event is dropped straight away.
+        """
+        key = coalesce_key(data)
+        trace = trace or current_context()
+        on_loop = threading.get_ident() == self._loop_thread
+        with self._condition:
+            if len(self._pending) >= self.maxsize and key is not None:
+                self._drop_superseded(key)
+            if len(self._pending) >= self.maxsize and not on_loop:
+                self._condition.wait_for(lambda: len(self._pending) < self.maxsize, BRIDGE_PUT_TIMEOUT)
+            if len(self._pending) >= self.maxsize:
+                self._pending.popleft()
+                self.dropped += 1
+            was_empty = not self._pending
+            self._pending.append((time.perf_counter(), key, data, trace))
+            self.enqueued += 1
+        if was_empty and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _drop_superseded(self, key):
+        for index, (_, queued_key, _, _) in enumerate(self._pending):
+            if queued_key == key:
+                del self._pending[index]
+                self.coalesced += 1
+                return
+
+    def _drain(self):
+        with self._condition:
+            items = list(self._pending)
+            self._pending.clear()
+            self._condition.notify_all()
+        last_index = {key: index for index, (_, key, _, _) in enumerate(items) if key is not None}
+        events = []
+        traces = []
+        now = time.perf_counter()
+        for index, (enqueued_at, key, data, trace) in enumerate(items):
+            if key is not None and last_index[key] != index:
+                self.coalesced += 1
+                continue
+            lag = now - enqueued_at
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+            events.append(data)
+            if trace is not None and trace not in traces:
+                traces.append(trace)
+        return events, traces
+
+    async def _pump(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.window:
+                await asyncio.sleep(self.window)
+            events, traces = self._drain()
+            if not events:
+                continue
+            self.batches += 1
+            self.delivered += len(events)
+            span = (
+                tracer.span('bridge.broadcast', parent=traces[0], links=traces[1:], events=len(events))
+                if traces else contextlib.nullcontext()
+            )
+            try:
+                with span:
+                    await self._ws.broadcast_many(events)
+            except Exception as error:
+                logger.error(f'Event bridge broadcast failed: {error}')
+
+    def get_stats(self):
+        return {
+            'depth': len(self._pending),
+            'maxsize': self.maxsize,
+            'window': self.window,
+            'enqueued': self.enqueued,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'lag_avg': self.lag_total / self.delivered if self.delivered else 0.0,
+            'lag_max': self.lag_max,
+        }
+
+
+event_bridge = EventBridge(ws_manager)
+
+gauge('rui_bridge_queue_depth', 'GCRI events waiting to be broadcast.', lambda: len(event_bridge._pending))
+callback_counter('rui_bridge_dropped', 'GCRI events dropped because the bridge queue was full.', lambda: event_bridge.dropped)
@@ -0,0 +1,217 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+
+JOURNAL_DIR = Path(os.environ.get('RUI_JOURNAL_DIR', Path.home() / '.rui' / 'journal'))
+SEGMENT_MAX_EVENTS = 5000
+FLUSH_INTERVAL = 0.2
+MAX_BATCH = 500
+MAX_OPEN_FILES = 32
+# Longest a read waits for the task's queued events to reach disk before serving what is there.
+READ_FLUSH_TIMEOUT = 2.0
+
+
+def _sync_and_close(f):
+    f.flush()
+    os.fsync(f.fileno())
+    f.close()
+
+
+class EventJournal:
+    """
+    Append-only, per-task on-disk log of GCRI events. Each task is a
+    directory of JSONL segments named after the offset of their first event.
+    Appends are queued and written by one thread in batches, with an fsync
+    per touched segment per batch.
+    """
+
+    def __init__(self, root=JOURNAL_DIR):
+        self.root = Path(root)
+        self._queue = queue.Queue()
+        self._offsets = {}
+        self._offsets_lock = threading.Lock()
+        self._written = {}
+        self._written_cond = threading.Condition()
+        self._files = OrderedDict()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+
+    def _task_dir(self, task_id):
+        if not task_id or '/' in task_id or task_id.startswith('.'):
+            raise ValueError(f'Invalid task id: {task_id}')
+        return self.root / task_id
+
+    def _segments(self, task_id):
+        task_dir = self._task_dir(task_id)
+        if not task_dir.exists():
+            return []
+        return sorted((int(path.stem), path) for path in task_dir.glob('*.jsonl'))
+
+    def _next_offset(self, task_id):
+        with self._offsets_lock:
+            offset = self._offsets.get(task_id)
+            if offset is None:
+                segments = self._segments(task_id)
+                offset = 0
+                if segments:
+                    start, path = segments[-1]
+                    with open(path, 'r', encoding='utf-8') as f:
+                        offset = start + sum(1 for _ in f)
+                with self._written_cond:
+                    self._written.setdefault(task_id, offset)
+            self._offsets[task_id] = offset + 1
+            return offset
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name='event-journal', daemon=True)
+                self._writer.start()
+
+    def append(self, task_id, event):
+        """Queue ``event`` for ``task_id`` and return its offset in the task's journal."""
+        offset = self._next_offset(task_id)
+        self._ensure_writer()
+        # A copy: callers go on to modify the event (e.g. add its offset) while it waits in the queue.
+        self._queue.put((task_id, {'offset': offset, 'ts': time.time(), 'event': dict(event)}))
+        return offset
+
+    def flush(self):
+        """Block until every queued event is written and synced."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def flush_task(self, task_id, until=None, timeout=READ_FLUSH_TIMEOUT):
+        """
+        Wait until the events of ``task_id`` queued so far (or those below offset
+        ``until``) are on disk, without waiting on other tasks. Returns False
+        on timeout.
+        """
+        with self._offsets_lock:
+            target = self._offsets.get(task_id)
+        if target is None:
+            return True
+        if until is not None:
+            target = min(target, until)
+        with self._written_cond:
+            return self._written_cond.wait_for(lambda: self._written.get(task_id, 0) >= target, timeout)
+
+    def _file_for(self, task_id, offset):
+        handle = self._files.get(task_id)
+        if handle is not None and offset - handle[0] < SEGMENT_MAX_EVENTS:
+            self._files.move_to_end(task_id)
+            return handle[1]
+        if handle is not None:
+            _sync_and_close(handle[1])
+            del self._files[task_id]
+
+        segments = self._segments(task_id)
+        start = segments[-1][0] if segments and offset - segments[-1][0] < SEGMENT_MAX_EVENTS else offset
+        task_dir = self._task_dir(task_id)
+        task_dir.mkdir(parents=True, exist_ok=True)
+        f = open(task_dir / f'{start:010d}.jsonl', 'a', encoding='utf-8')
+        self._files[task_id] = (start, f)
+        while len(self._files) > MAX_OPEN_FILES:
+            _, (_, old) = self._files.popitem(last=False)
+            _sync_and_close(old)
+        return f
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < MAX_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as error:
+                logger.error(f'Event journal write failed: {error}')
+            finally:
+                self._mark_written(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _mark_written(self, batch):
+        with self._written_cond:
+            for task_id, record in batch:
+                self._written[task_id] = max(self._written.get(task_id, 0), record['offset'] + 1)
+            self._written_cond.notify_all()
+
+    def _write_batch(self, batch):
+        touched = {}
+        for task_id, record in batch:
+            f = self._file_for(task_id, record['offset'])
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            touched[id(f)] = f
+        for f in touched.values():
+            if not f.closed:
+                f.flush()
+                os.fsync(f.fileno())
+        self.written += len(batch)
+        self.batches += 1
+
+    def read(self, task_id, start=0, end=None, limit=1000):
+        """
+        Return journal records with ``start <= offset < end``, at most ``limit``
+        of them. Waits briefly for this task's queued events; if they are not
+        on disk by then the prefix that is gets served.
+        """
+        self.flush_task(task_id, until=end)
+        records = []
+        segments = self._segments(task_id)
+        for index, (segment_start, path) in enumerate(segments):
+            next_start = segments[index + 1][0] if index + 1 < len(segments) else None
+            if next_start is not None and next_start <= start:
+                continue
+            if end is not None and segment_start >= end:
+                break
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # still being written
+                    record = json.loads(line)
+                    if record['offset'] < start:
+                        continue
+                    if end is not None and record['offset'] >= end:
+                        break
+                    records.append(record)
+                    if len(records) >= limit:
+                        return records
+        return records
+
+    def list_tasks(self):
+        if not self.root.exists():
+            return []
+        tasks = []
+        for task_dir in sorted(self.root.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True):
+            if task_dir.is_dir():
+                tasks.append({'task_id': task_dir.name, 'updated_at': task_dir.stat().st_mtime})
+        return tasks
+
+    def get_stats(self):
+        return {
+            'pending': self._queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'open_files': len(self._files),
+        }
+
+
+event_journal = EventJournal()
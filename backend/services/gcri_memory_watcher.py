@@ -0,0 +1,48 @@
+import asyncio
+
+from loguru import logger
+
+from services.comet_async import get_gcri_memory
+from services.comet_bridge import find_gcri_memory
+
+
+WATCH_INTERVAL = 2.0
+
+
+def _summarize(data):
+    return {
+        'global_rules': len(data.get('global_rules') or []),
+        'domain_rules': sum(len(rules) for rules in (data.get('domain_rules') or {}).values()),
+        'knowledge': sum(len(items) for items in (data.get('knowledge') or {}).values()),
+    }
+
+
+async def watch_gcri_memory(ws_manager, interval=WATCH_INTERVAL):
+    """
+    Poll the GCRI external memory file's stat and, when it changes, reload
+    the cached document and broadcast a ``gcri_memory_updated`` event.
+    """
+    last_seen = find_gcri_memory()
+    if last_seen[0] is not None:
+        await get_gcri_memory()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            current = find_gcri_memory()
+            if current == last_seen:
+                continue
+            last_seen = current
+            path, signature = current
+            data = await get_gcri_memory()
+            logger.info(f'GCRI memory changed: {path}')
+            await ws_manager.broadcast({
+                'type': 'gcri_memory_updated',
+                'source_path': str(path) if path else None,
+                'mtime_ns': signature[0] if signature else None,
+                'counts': _summarize(data),
+            })
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning(f'GCRI memory watcher error: {error}')
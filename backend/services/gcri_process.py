@@ -0,0 +1,197 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from loguru import logger
+
+
+ABORT_GRACE_SECONDS = 10.0
+POLL_INTERVAL = 0.5
+# Fraction of each provider's limits split among the worker processes; the API
+# process keeps the rest for chat, whose lane priority only holds within a process.
+GCRI_RATE_SHARE = float(os.environ.get('RUI_GCRI_RATE_SHARE', '0.5'))
+
+_context = multiprocessing.get_context('spawn')
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+def _worker_main(job_queue, event_queue, abort_event):
+    """Child process entrypoint: import gcri once, then run jobs until told to stop."""
+    from services.gcri_runner import GCRI_WORKERS, QueueCallbacks, execute_gcri, load_gcri
+    from services.key_store import load_cached_keys
+    from services.rate_limiter import rate_limiter
+
+    load_gcri()
+    load_cached_keys()
+
+    # Each worker process gets an equal slice of the GCRI share of the provider limits.
+    rate_limiter.set_share(GCRI_RATE_SHARE / max(GCRI_WORKERS, 1))
+    event_queue.put(('ready', None, multiprocessing.current_process().pid))
+    while True:
+        job = job_queue.get()
+        if job is None:
+            return
+        task_id, description, rui_config = job
+        callbacks = QueueCallbacks(event_queue, task_id)
+        try:
+            result = execute_gcri(description, rui_config, abort_event, callbacks)
+            event_queue.put(('result', task_id, result))
+        except Exception as error:
+            event_queue.put(('error', task_id, str(error)))
+
+
+class ProcessWorker:
+    """
+    A pre-warmed child process that runs one GCRI task at a time. It has its
+    own event queue and dispatcher thread, so killing the child mid-write
+    only loses that queue; a fresh one comes with the replacement process.
+    """
+
+    def __init__(self, on_message, name):
+        self.name = name
+        self._on_message = on_message
+        self._start()
+
+    def _start(self):
+        self.job_queue = _context.Queue()
+        self.event_queue = _context.Queue()
+        self.abort_event = _context.Event()
+        self.process = _context.Process(
+            target=_worker_main,
+            args=(self.job_queue, self.event_queue, self.abort_event),
+            name=self.name,
+            daemon=True,
+        )
+        self.process.start()
+        threading.Thread(
+            target=self._dispatch, args=(self.event_queue,), name=f'{self.name}-ipc', daemon=True,
+        ).start()
+        logger.info(f'GCRI worker process {self.name} started (pid={self.process.pid})')
+
+    def _dispatch(self, event_queue):
+        # Runs until the queue is replaced by a restart.
+        while event_queue is self.event_queue:
+            try:
+                message = event_queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            except Exception as error:
+                if event_queue is self.event_queue:
+                    logger.warning(f'Bad message from GCRI worker process {self.name}: {error}')
+                continue
+            self._on_message(*message)
+
+    def _discard(self):
+        stale_queues = (self.job_queue, self.event_queue)
+        self.event_queue = None
+        for stale in stale_queues:
+            stale.cancel_join_thread()
+            stale.close()
+
+    def submit(self, task_id, description, rui_config):
+        if not self.process.is_alive():
+            self._discard()
+            self._start()
+        self.abort_event.clear()
+        self.job_queue.put((task_id, description, rui_config))
+
+    def kill(self):
+        """Hard-kill the child and start a fresh one in its place."""
+        logger.warning(f'Killing GCRI worker process {self.name} (pid={self.process.pid})')
+        self.process.kill()
+        self.process.join(timeout=5)
+        self._discard()
+        self._start()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self):
+        if self.process.is_alive():
+            self.job_queue.put(None)
+            self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class ProcessExecutor:
+    """
+    Runs GCRI tasks in child processes instead of threads of the API process.
+    Each scheduler worker thread owns one ProcessWorker; callback events and
+    results come back over that worker's IPC queue.
+    """
+
+    def __init__(self, on_event):
+        from services.rate_limiter import rate_limiter
+
+        rate_limiter.set_share(1 - GCRI_RATE_SHARE)
+        self._on_event = on_event
+        self._results = {}
+        self._results_lock = threading.Lock()
+        self._local = threading.local()
+        self._workers = []
+
+    def _dispatch(self, kind, task_id, payload):
+        if kind == 'ready':
+            logger.info(f'GCRI worker process {payload} warmed up')
+        elif kind == 'event':
+            self._on_event(task_id, payload)
+        else:
+            with self._results_lock:
+                waiter = self._results.get(task_id)
+            if waiter is not None:
+                waiter.put((kind, payload))
+
+    def worker(self):
+        """Return the calling thread's ProcessWorker, spawning it on first use."""
+        worker = getattr(self._local, 'worker', None)
+        if worker is None:
+            worker = ProcessWorker(self._dispatch, f'gcri-proc-{len(self._workers)}')
+            self._workers.append(worker)
+            self._local.worker = worker
+        return worker
+
+    def execute(self, task):
+        """Run ``task`` in this thread's worker process and block until it finishes."""
+        worker = self.worker()
+        waiter = queue.Queue()
+        with self._results_lock:
+            self._results[task.task_id] = waiter
+        try:
+            worker.submit(task.task_id, task.description, task.rui_config)
+            abort_deadline = None
+            while True:
+                try:
+                    kind, payload = waiter.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if task.abort_event.is_set():
+                        if abort_deadline is None:
+                            worker.abort_event.set()
+                            abort_deadline = time.monotonic() + ABORT_GRACE_SECONDS
+                        elif time.monotonic() > abort_deadline:
+                            worker.kill()
+                            self._on_event(task.task_id, {
+                                'type': 'system_message',
+                                'content': '🛑 GCRI task aborted by user.',
+                            })
+                            self._on_event(task.task_id, {'type': 'phase_change', 'phase': 'aborted'})
+                            return None
+                    if not worker.is_alive():
+                        worker.kill()
+                        raise WorkerCrashed('GCRI worker process exited unexpectedly')
+                    continue
+                if kind == 'error':
+                    raise RuntimeError(payload)
+                return payload
+        finally:
+            with self._results_lock:
+                self._results.pop(task.task_id, None)
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.stop()
@@ -0,0 +1,216 @@
+"""
+Timing profile of one GCRI run, built from the callback transitions that
+WebCallbacks timestamps: wall time per iteration, the phase segments inside
+it, and hypothesis/verification durations per branch, with totals by phase
+and by branch model. Offsets are seconds since the run started. Iterations
+can be read one at a time as they complete, so callers can send each once
+instead of the whole profile every time.
+"""
+import threading
+import time
+
+from services.tracing import tracer
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+class TimingProfile:
+    """Collects transition timestamps; safe to call from concurrent branch threads."""
+
+    def __init__(self, models=None):
+        self.models = list(models or [])
+        self.started_at = time.time()
+        self.outcome = None
+        self._origin = time.perf_counter()
+        self._finished = None
+        self._iterations = {}
+        self._open = None
+        self._lock = threading.Lock()
+
+    def _now(self):
+        return time.perf_counter() - self._origin
+
+    def _model(self, branch):
+        return self.models[branch] if 0 <= branch < len(self.models) else None
+
+    def _iteration(self, iteration, now):
+        entry = self._iterations.get(iteration)
+        if entry is None:
+            entry = self._iterations[iteration] = {
+                'start': now,
+                'end': None,
+                'branchStart': now,
+                'phases': [],
+                'branches': {},
+            }
+        return entry
+
+    def _close(self, now):
+        if self._open is not None:
+            self._open['end'] = now
+            self._open = None
+
+    def _enter(self, iteration, phase, now):
+        if self._open is not None and self._open['iteration'] == iteration and self._open['phase'] == phase:
+            return
+        self._close(now)
+        self._open = {'iteration': iteration, 'phase': phase, 'start': now, 'end': None}
+        self._iteration(iteration, now)['phases'].append(self._open)
+
+    def iteration_start(self, iteration):
+        with self._lock:
+            now = self._now()
+            self._iteration(iteration, now)
+            self._enter(iteration, 'strategy', now)
+
+    def phase(self, iteration, phase):
+        with self._lock:
+            self._enter(iteration, phase, self._now())
+
+    def strategies(self, iteration):
+        # Branches fan out once the strategies exist.
+        with self._lock:
+            now = self._now()
+            self._iteration(iteration, now)['branchStart'] = now
+
+    def hypothesis(self, iteration, branch):
+        with self._lock:
+            now = self._now()
+            entry = self._iteration(iteration, now)
+            entry['branches'].setdefault(branch, {})['hypothesisAt'] = now
+
+    def verification(self, iteration, branch):
+        with self._lock:
+            now = self._now()
+            entry = self._iteration(iteration, now)
+            entry['branches'].setdefault(branch, {})['verificationAt'] = now
+
+    def decision(self, iteration):
+        with self._lock:
+            self._enter(iteration, 'decision', self._now())
+
+    def iteration_complete(self, iteration):
+        with self._lock:
+            now = self._now()
+            self._close(now)
+            self._iteration(iteration, now)['end'] = now
+
+    def finish(self, outcome):
+        with self._lock:
+            now = self._now()
+            self._close(now)
+            self._finished = now
+            self.outcome = outcome
+
+    def _branch(self, branch, marks, branch_start):
+        hypothesis_at = marks.get('hypothesisAt')
+        verification_at = marks.get('verificationAt')
+        end = verification_at if verification_at is not None else hypothesis_at
+        return {
+            'branch': branch,
+            'model': self._model(branch),
+            'hypothesis': _round(hypothesis_at - branch_start) if hypothesis_at is not None else None,
+            'verification': (
+                _round(verification_at - (hypothesis_at if hypothesis_at is not None else branch_start))
+                if verification_at is not None else None
+            ),
+            'total': _round(end - branch_start) if end is not None else None,
+        }
+
+    def _iteration_dict(self, iteration, entry, now):
+        end = entry['end'] if entry['end'] is not None else now
+        return {
+            'iteration': iteration,
+            'start': _round(entry['start']),
+            'duration': _round(end - entry['start']),
+            'branchStart': _round(entry['branchStart']),
+            'complete': entry['end'] is not None,
+            'phases': [
+                {
+                    'phase': segment['phase'],
+                    'start': _round(segment['start']),
+                    'duration': _round((segment['end'] if segment['end'] is not None else now) - segment['start']),
+                    'open': segment['end'] is None,
+                }
+                for segment in entry['phases']
+            ],
+            'branches': [
+                self._branch(branch, marks, entry['branchStart'])
+                for branch, marks in sorted(entry['branches'].items())
+            ],
+        }
+
+    def iteration(self, iteration):
+        """Timing of one iteration, in the shape of an entry of ``to_dict()['iterations']``."""
+        with self._lock:
+            now = self._now()
+            return self._iteration_dict(iteration, self._iteration(iteration, now), now)
+
+    def to_dict(self, exclude=()):
+        """The whole profile with totals; iterations listed in ``exclude`` are left out of ``iterations``."""
+        with self._lock:
+            now = self._now()
+            iterations = []
+            phase_totals = {}
+            model_totals = {}
+            for iteration, entry in sorted(self._iterations.items()):
+                timing = self._iteration_dict(iteration, entry, now)
+                for phase in timing['phases']:
+                    phase_totals[phase['phase']] = phase_totals.get(phase['phase'], 0.0) + phase['duration']
+                for branch in timing['branches']:
+                    if branch['model'] is None or branch['total'] is None:
+                        continue
+                    totals = model_totals.setdefault(branch['model'], {'count': 0, 'total': 0.0, 'max': 0.0})
+                    totals['count'] += 1
+                    totals['total'] += branch['total']
+                    totals['max'] = max(totals['max'], branch['total'])
+                if iteration not in exclude:
+                    iterations.append(timing)
+            return {
+                'startedAt': self.started_at,
+                'elapsed': _round(self._finished if self._finished is not None else now),
+                'outcome': self.outcome,
+                'iterations': iterations,
+                'phaseTotals': {phase: _round(total) for phase, total in phase_totals.items()},
+                'modelTotals': {
+                    model: {
+                        'branches': totals['count'],
+                        'total': _round(totals['total']),
+                        'mean': _round(totals['total'] / totals['count']),
+                        'max': _round(totals['max']),
+                    }
+                    for model, totals in model_totals.items()
+                },
+            }
+
+
+def trace_iteration(profile, iteration, parent):
+    """Record one iteration of a profile dict as spans: phases and branches under an iteration span."""
+    origin = profile['startedAt']
+    start = origin + iteration['start']
+    span = tracer.record(
+        'gcri.iteration', start, start + iteration['duration'], parent=parent,
+        iteration=iteration['iteration'], complete=iteration['complete'],
+    )
+    for phase in iteration['phases']:
+        phase_start = origin + phase['start']
+        tracer.record(f"gcri.phase.{phase['phase']}", phase_start, phase_start + phase['duration'], parent=span.context)
+    branch_start = origin + iteration['branchStart']
+    for branch in iteration['branches']:
+        if branch['total'] is None:
+            continue
+        branch_span = tracer.record(
+            'gcri.branch', branch_start, branch_start + branch['total'], parent=span.context,
+            branch=branch['branch'], model=branch['model'],
+        )
+        hypothesis = branch['hypothesis'] or 0.0
+        if branch['hypothesis'] is not None:
+            tracer.record('gcri.hypothesis', branch_start, branch_start + hypothesis, parent=branch_span.context)
+        if branch['verification'] is not None:
+            verification_start = branch_start + hypothesis
+            tracer.record(
+                'gcri.verification', verification_start, verification_start + branch['verification'],
+                parent=branch_span.context,
+            )
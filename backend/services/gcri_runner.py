@@ -1,40 +1,135 @@
 import asyncio
+import functools
+import itertools
 import json
+import os
+import queue
 import threading
+import time
+import uuid
+from collections import OrderedDict
 
 from loguru import logger
 
-from gcri.config import scope
-from gcri.graphs.callbacks import GCRICallbacks
-from gcri.graphs.gcri_unit import GCRI
+from services.comet_bridge import invalidate_search_cache
+from services.event_bridge import event_bridge
+from services.event_journal import event_journal
+from services.gcri_profile import TimingProfile, trace_iteration
+from services.key_store import MODEL_PROVIDER, load_cached_keys
+from services.metrics import gauge
+from services.rate_limiter import langchain_rate_limiter
+from services.tracing import current_context, current_span, tracer
+
+GCRI_WORKERS = int(os.environ.get('RUI_GCRI_WORKERS', '2'))
+# 'thread' runs GCRI inside the API process; 'process' runs it in pre-warmed child processes.
+GCRI_EXECUTION = os.environ.get('RUI_GCRI_EXECUTION', 'thread')
+MAX_FINISHED_TASKS = 100
+DEFAULT_BRANCH_MODEL = 'gpt-5-mini'
+# Run-level fields of a 'timing' event, next to its 'iterations'.
+PROFILE_SUMMARY_KEYS = ('startedAt', 'elapsed', 'outcome', 'phaseTotals', 'modelTotals')
+
+
+def _clip(value, limit):
+    return value[:limit] if isinstance(value, str) else value
+
+
+@functools.cache
+def load_gcri():
+    """
+    Import gcri on first use and return ``(scope, GCRICallbacks, GCRI)``. It pulls
+    in langchain and every provider SDK, so the API process leaves it to
+    startup warm-up or the first run instead of paying for it at import.
+    """
+    from gcri.config import scope
+    from gcri.graphs.callbacks import GCRICallbacks
+    from gcri.graphs.gcri_unit import GCRI
+    return scope, GCRICallbacks, GCRI
+
+
+@functools.cache
+def _with_gcri_base(cls):
+    _, callbacks_base, _ = load_gcri()
+    return type(cls.__name__, (cls, callbacks_base), {'__module__': cls.__module__})
+
+
+def branch_models(rui_config):
+    """Model of each configured branch in the RUI config, in branch order."""
+    return [
+        branch.get('model', DEFAULT_BRANCH_MODEL) if isinstance(branch, dict) else DEFAULT_BRANCH_MODEL
+        for branch in (rui_config or {}).get('branches', [])
+    ]
+
+
+def for_wire(event):
+    """Trim the long text fields of a GCRI event for WebSocket clients; the journal keeps them whole."""
+    kind = event.get('type')
+    wire = dict(event)
+    if kind == 'hypothesis':
+        wire['hypothesis'] = _clip(event.get('hypothesis'), 300)
+    elif kind == 'verification':
+        wire['counterExample'] = _clip(event.get('counterExample'), 300)
+    elif kind in ('decision', 'iteration_complete'):
+        wire['feedback'] = _clip(event.get('feedback'), 500)
+    elif kind == 'strategies':
+        wire['strategies'] = [
+            {**s, 'description': _clip(s.get('description'), 300), 'hints': (s.get('hints') or [])[:5]}
+            for s in event.get('strategies', [])
+        ]
+    if kind == 'iteration_complete':
+        wire['evaluations'] = [
+            {
+                **e,
+                'summary_hypothesis': _clip(e.get('summary_hypothesis'), 300),
+                'summary_counter_example': _clip(e.get('summary_counter_example'), 200),
+            }
+            for e in event.get('evaluations', [])
+        ]
+    return wire
+
+
+class WebCallbacks:
+    """
+    GCRI Callbacks that publish full events for a task; see GCRITask.publish.
+    Every transition is also timestamped into a TimingProfile. Each iteration
+    is sent once in a 'timing' event when it completes, and a last one at the
+    end of the run carries the totals plus any iteration not yet sent.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        # Instances also derive from GCRICallbacks (defaults for the hooks not
+        # overridden here), attached on first use so gcri is not imported early.
+        _, callbacks_base, _ = load_gcri()
+        if not issubclass(cls, callbacks_base):
+            cls = _with_gcri_base(cls)
+        return super().__new__(cls)
+
+    def __init__(self, publish):
+        self._publish = publish
+        self.profile = TimingProfile()
+        self._timed_iterations = set()
 
+    def _send(self, data):
+        self._publish(data)
 
-_gcri_task_thread = None
-_abort_event = threading.Event()
-
-
-def get_abort_event():
-    return _abort_event
-
-
-def is_running():
-    return _gcri_task_thread is not None and _gcri_task_thread.is_alive()
-
-
-class WebCallbacks(GCRICallbacks):
-    """GCRI Callbacks that broadcast events to RUI frontend via WebSocket."""
-
-    def __init__(self, ws_manager, loop):
-        self._ws = ws_manager
-        self._loop = loop
+    def _send_timing(self, iteration):
+        self._timed_iterations.add(iteration)
+        self._send({
+            'type': 'timing',
+            'startedAt': self.profile.started_at,
+            'iterations': [self.profile.iteration(iteration)],
+        })
 
-    def _send(self, data):
-        asyncio.run_coroutine_threadsafe(self._ws.broadcast(data), self._loop)
+    def finish(self, outcome):
+        """Close the profile and send its totals once; later calls are no-ops."""
+        if self.profile.outcome is None:
+            self.profile.finish(outcome)
+            self._send({'type': 'timing', **self.profile.to_dict(exclude=self._timed_iterations)})
 
     def on_commit_request(self, context):
         return True
 
     def on_iteration_start(self, iteration, max_iterations):
+        self.profile.iteration_start(iteration)
         self._send({
             'type': 'phase_change',
             'phase': 'strategy',
@@ -43,6 +138,7 @@ class WebCallbacks(GCRICallbacks):
         })
 
     def on_iteration_complete(self, iteration, result):
+        self.profile.iteration_complete(iteration)
         decision = result.get('decision', False)
         feedback = result.get('global_feedback', '')
         evals = result.get('branch_evaluations', [])
@@ -53,19 +149,21 @@ class WebCallbacks(GCRICallbacks):
             safe_evals.append({
                 'branch_index': e.get('branch_index', 0),
                 'status': str(e.get('status', '')),
-                'summary_hypothesis': str(e.get('summary_hypothesis', ''))[:300],
-                'summary_counter_example': str(e.get('summary_counter_example', ''))[:200],
+                'summary_hypothesis': str(e.get('summary_hypothesis', '')),
+                'summary_counter_example': str(e.get('summary_counter_example', '')),
                 'failure_category': str(e.get('failure_category', '')),
             })
         self._send({
             'type': 'iteration_complete',
             'iteration': iteration,
             'decision': decision,
-            'feedback': (feedback or '')[:500],
+            'feedback': feedback or '',
             'evaluations': safe_evals,
         })
+        self._send_timing(iteration)
 
     def on_phase_change(self, phase, iteration=0, **kwargs):
+        self.profile.phase(iteration, phase)
         self._send({
             'type': 'phase_change',
             'phase': phase,
@@ -73,12 +171,13 @@ class WebCallbacks(GCRICallbacks):
         })
 
     def on_strategies_generated(self, iteration, strategies):
+        self.profile.strategies(iteration)
         safe = []
         for s in strategies:
             safe.append({
                 'name': s.get('name', ''),
-                'description': str(s.get('description', ''))[:300],
-                'hints': s.get('hints', [])[:5],
+                'description': str(s.get('description', '')),
+                'hints': list(s.get('hints', [])),
             })
         self._send({
             'type': 'strategies',
@@ -87,30 +186,33 @@ class WebCallbacks(GCRICallbacks):
         })
 
     def on_hypothesis_generated(self, iteration, branch, hypothesis, strategy_name):
+        self.profile.hypothesis(iteration, branch)
         self._send({
             'type': 'hypothesis',
             'iteration': iteration,
             'branch': branch,
-            'hypothesis': hypothesis[:300],
+            'hypothesis': hypothesis,
             'strategyName': strategy_name,
         })
 
     def on_verification_complete(self, iteration, branch, counter_strength, counter_example):
+        self.profile.verification(iteration, branch)
         self._send({
             'type': 'verification',
             'iteration': iteration,
             'branch': branch,
             'counterStrength': counter_strength,
-            'counterExample': counter_example[:300],
+            'counterExample': counter_example,
         })
 
     def on_decision(self, iteration, decision, best_branch, feedback, evaluations):
+        self.profile.decision(iteration)
         self._send({
             'type': 'decision',
             'iteration': iteration,
             'decision': decision,
             'bestBranch': best_branch,
-            'feedback': (feedback or '')[:500],
+            'feedback': feedback or '',
         })
 
     def on_task_complete(self, result, elapsed_seconds):
@@ -119,6 +221,7 @@ class WebCallbacks(GCRICallbacks):
             'phase': 'complete',
             'elapsed': round(elapsed_seconds, 1),
         })
+        self.finish('complete')
 
     def on_task_error(self, error):
         self._send({
@@ -129,6 +232,7 @@ class WebCallbacks(GCRICallbacks):
             'type': 'phase_change',
             'phase': 'idle',
         })
+        self.finish('failed')
 
     def on_task_abort(self, error):
         self._send({
@@ -139,9 +243,45 @@ class WebCallbacks(GCRICallbacks):
             'type': 'phase_change',
             'phase': 'aborted',
         })
+        self.finish('aborted')
+
+
+class QueueCallbacks(WebCallbacks):
+    """WebCallbacks variant for worker processes: events go to an IPC queue instead of the socket."""
+
+    def __init__(self, event_queue, task_id):
+        super().__init__(None)
+        self._queue = event_queue
+        self._task_id = task_id
+
+    def _send(self, data):
+        self._queue.put(('event', self._task_id, data))
+
+
+def config_branch_models(config):
+    """
+    Model of each branch GCRI will run, read from the built config so GCRI's
+    default branch agents count too; None where a branch's model is unknown.
+    """
+    from gcri.config import AGENT_NAMES_IN_BRANCH
+
+    branches = list(config.agents.branches or [])
+    models = []
+    for index in range(config.num_branches):
+        agents = branches[index] if index < len(branches) else None
+        model = None
+        if isinstance(agents, dict):
+            model = next(
+                (
+                    agents[name].get('model_id') for name in AGENT_NAMES_IN_BRANCH
+                    if isinstance(agents.get(name), dict) and agents[name].get('model_id')
+                ),
+                None,
+            )
+        models.append(model)
+    return models
 
 
-@scope
 def _build_config(config, rui_config=None):
     """Get GCRI scope config with RUI sidebar overrides applied."""
     from gcri.config import AGENT_NAMES_IN_BRANCH
@@ -153,15 +293,18 @@ def _build_config(config, rui_config=None):
     num_branches = rui_config.get('branchCount', config.num_branches)
     config.num_branches = num_branches
 
-    branches = rui_config.get('branches', [])
-    if branches:
+    if rui_config.get('branches'):
         branch_agents = []
-        for branch in branches[:num_branches]:
-            model = branch.get('model', 'gpt-5-mini') if isinstance(branch, dict) else 'gpt-5-mini'
+        for model in branch_models(rui_config)[:num_branches]:
+            parameters = dict(max_completion_tokens=16384)
+            # Branch calls share the process-wide provider limits with chat, in the batch lane.
+            limiter = langchain_rate_limiter(MODEL_PROVIDER.get(model, 'openai'))
+            if limiter is not None:
+                parameters['rate_limiter'] = limiter
             branch_agents.append({
                 agent_name: ADict(
                     model_id=model,
-                    parameters=dict(max_completion_tokens=16384),
+                    parameters=parameters,
                     gcri_options=ADict(
                         use_code_tools=True,
                         use_web_search=True,
@@ -183,77 +326,339 @@ def _build_config(config, rui_config=None):
     return config
 
 
-async def run_gcri_task(task_description, rui_config, ws_manager):
-    global _gcri_task_thread
-
-    if is_running():
-        raise RuntimeError('A GCRI task is already running')
-
-    _abort_event.clear()
-    ws_manager.clear_history()
-
-    loop = asyncio.get_event_loop()
-
-    def execute():
+@functools.cache
+def _scoped_build_config():
+    scope, _, _ = load_gcri()
+    return scope(_build_config)
+
+
+def _format_final_output(result):
+    if isinstance(result, dict):
+        final_output = result.get('final_output') or ''
+        if hasattr(final_output, 'model_dump'):
+            return json.dumps(final_output.model_dump(), ensure_ascii=False)
+        elif isinstance(final_output, dict):
+            return json.dumps(final_output, ensure_ascii=False)
+        elif not isinstance(final_output, str):
+            return str(final_output)
+        return final_output
+    return str(result)
+
+
+def execute_gcri(description, rui_config, abort_event, callbacks):
+    """Run one GCRI task to completion and return its result payload, or None."""
+    _, _, gcri_class = load_gcri()
+    load_cached_keys()
+    config = _scoped_build_config()(rui_config=rui_config)
+    callbacks.profile.models = config_branch_models(config)
+    gcri = gcri_class(config, abort_event=abort_event, callbacks=callbacks)
+    try:
+        result = gcri(task=description)
+    except Exception:
+        callbacks.finish('aborted' if abort_event.is_set() else 'failed')
+        raise
+    callbacks.finish('aborted' if abort_event.is_set() else 'complete')
+
+    logger.info(f'GCRI result type: {type(result).__name__}')
+    if isinstance(result, dict):
+        logger.info(f'GCRI result keys: {list(result.keys())}')
+
+    if not result:
+        return None
+    return {
+        'final_output': _format_final_output(result),
+        'best_branch': result.get('best_branch_index') if isinstance(result, dict) else None,
+        'iterations': result.get('count') if isinstance(result, dict) else None,
+    }
+
+
+class GCRITask:
+    """One submitted GCRI run and its lifecycle state."""
+
+    def __init__(self, description, rui_config, ws_manager, priority=0, session_id=None):
+        self.task_id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.description = description
+        self.rui_config = rui_config
+        self.priority = priority
+        self.ws_manager = ws_manager
+        self.abort_event = threading.Event()
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.profile = None
+        # Parent for the run's spans on the worker thread; the run span replaces it once started.
+        self.trace_context = current_context()
+        self._traced_iterations = set()
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+    def publish(self, data):
+        """Journal the full event and send a trimmed copy to WebSocket clients."""
+        data['taskId'] = self.task_id
+        if data.get('type') == 'timing':
+            self._merge_timing(data)
+        if self.session_id is not None:
+            data['sessionId'] = self.session_id
         try:
-            config = _build_config(rui_config=rui_config)
-            callbacks = WebCallbacks(ws_manager, loop)
-            gcri = GCRI(config, abort_event=_abort_event, callbacks=callbacks)
-            result = gcri(task=task_description)
+            data['offset'] = event_journal.append(self.task_id, data)
+        except Exception as error:
+            logger.warning(f'Failed to journal event for task {self.task_id}: {error}')
+        event_bridge.put(for_wire(data), trace=self.trace_context)
+
+    def _merge_timing(self, timing):
+        """Fold a 'timing' event into the task's full profile, served at /profile."""
+        profile = self.profile or {'iterations': []}
+        iterations = {entry['iteration']: entry for entry in profile['iterations']}
+        iterations.update((entry['iteration'], entry) for entry in timing.get('iterations', []))
+        self.profile = {
+            **profile,
+            **{key: timing[key] for key in PROFILE_SUMMARY_KEYS if key in timing},
+            'iterations': [iterations[index] for index in sorted(iterations)],
+        }
+        self._trace_profile(self.profile)
+
+    def _trace_profile(self, profile):
+        finished = profile.get('outcome') is not None
+        for iteration in profile['iterations']:
+            if iteration['iteration'] in self._traced_iterations or not (iteration['complete'] or finished):
+                continue
+            self._traced_iterations.add(iteration['iteration'])
+            trace_iteration(profile, iteration, self.trace_context)
+
+    def to_dict(self):
+        return {
+            'task_id': self.task_id,
+            'task': self.description,
+            'session_id': self.session_id,
+            'status': self.status,
+            'priority': self.priority,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+
+
+class GCRIScheduler:
+    """
+    Runs submitted GCRI tasks on a fixed pool of worker threads.
+    Tasks are taken from a priority queue (lower value first, FIFO within
+    a priority); each task carries its own abort event.
+    """
+
+    def __init__(self, workers=GCRI_WORKERS, execution=GCRI_EXECUTION):
+        self.workers = max(1, workers)
+        self.execution = execution
+        self._queue = queue.PriorityQueue()
+        self._tasks = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._sequence = itertools.count()
+        self._process_executor = None
+
+    def start(self):
+        """Start worker threads (and, in process mode, their child processes) ahead of the first task."""
+        with self._lock:
+            if self.execution == 'process' and self._process_executor is None:
+                from services.gcri_process import ProcessExecutor
+                self._process_executor = ProcessExecutor(self._forward_event)
+            self._ensure_workers()
+
+    def shutdown(self):
+        if self._process_executor is not None:
+            self._process_executor.shutdown()
+
+    def _forward_event(self, task_id, data):
+        task = self.get(task_id)
+        if task is not None:
+            task.publish(data)
+
+    def _ensure_workers(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._worker_loop,
+                name=f'gcri-worker-{len(self._threads)}',
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, description, rui_config, ws_manager, priority=0, session_id=None):
+        self.start()
+        task = GCRITask(description, rui_config, ws_manager, priority=priority, session_id=session_id)
+        with self._lock:
+            if not any(t.active for t in self._tasks.values()):
+                ws_manager.clear_history()
+            self._tasks[task.task_id] = task
+            self._prune()
+        self._queue.put((priority, next(self._sequence), task))
+        logger.info(f'GCRI task {task.task_id} queued (priority={priority})')
+        return task
+
+    def _prune(self):
+        finished = [task_id for task_id, task in self._tasks.items() if not task.active]
+        for task_id in finished[:max(0, len(finished) - MAX_FINISHED_TASKS)]:
+            del self._tasks[task_id]
+
+    def get(self, task_id):
+        return self._tasks.get(task_id)
+
+    def list(self):
+        return list(self._tasks.values())
+
+    def running(self):
+        return [task for task in self.list() if task.status == 'running']
+
+    def queued(self):
+        return [task for task in self.list() if task.status == 'queued']
+
+    def queue_position(self, task_id):
+        queued = sorted(self.queued(), key=lambda t: (t.priority, t.created_at))
+        for index, task in enumerate(queued):
+            if task.task_id == task_id:
+                return index
+        return None
+
+    def abort(self, task_id):
+        task = self.get(task_id)
+        with self._lock:
+            if task is None or not task.active:
+                return False
+            task.abort_event.set()
+            # Decided under the lock so a worker can't claim the task in between.
+            never_started = task.status == 'queued'
+            if never_started:
+                task.status = 'aborted'
+                task.finished_at = time.time()
+        if never_started:
+            # It never reaches a worker, so nothing else would tell clients or the journal.
+            task.publish({'type': 'system_message', 'content': '🛑 GCRI task aborted before it started.'})
+            task.publish({'type': 'phase_change', 'phase': 'aborted'})
+        return True
 
-            logger.info(f'GCRI result type: {type(result).__name__}')
-            if isinstance(result, dict):
-                logger.info(f'GCRI result keys: {list(result.keys())}')
+    def _worker_loop(self):
+        if self._process_executor is not None:
+            self._process_executor.worker()
+        while True:
+            _, _, task = self._queue.get()
+            try:
+                if self._claim(task):
+                    self._traced_run(task)
+            finally:
+                self._queue.task_done()
+
+    def _claim(self, task):
+        """Move a queued task to running; False if it was aborted while it waited."""
+        with self._lock:
+            if task.status != 'queued' or task.abort_event.is_set():
+                return False
+            task.status = 'running'
+            task.started_at = time.time()
+            return True
+
+    def _traced_run(self, task):
+        # Worker threads are pooled, so the submitting request's span context arrives with the task.
+        queue_wait = round(time.time() - task.created_at, 6)
+        with tracer.span(
+            'gcri.run', parent=task.trace_context, task_id=task.task_id, execution=self.execution, queue_wait=queue_wait,
+        ) as span:
+            task.trace_context = span.context or task.trace_context
+            self._run(task)
+            span.set_attribute('status', task.status)
+
+    def _run(self, task):
+        logger.info(f'GCRI task {task.task_id} started')
+        try:
+            if self._process_executor is not None:
+                result = self._process_executor.execute(task)
+            else:
+                callbacks = WebCallbacks(task.publish)
+                result = execute_gcri(task.description, task.rui_config, task.abort_event, callbacks)
 
             if result:
-                final_output = ''
-                if isinstance(result, dict):
-                    final_output = result.get('final_output') or ''
-                    if hasattr(final_output, 'model_dump'):
-                        final_output = json.dumps(final_output.model_dump(), ensure_ascii=False, indent=2)
-                    elif isinstance(final_output, dict):
-                        final_output = json.dumps(final_output, ensure_ascii=False, indent=2)
-                    elif not isinstance(final_output, str):
-                        final_output = str(final_output)
-                else:
-                    final_output = str(result)
-
-                asyncio.run_coroutine_threadsafe(
-                    ws_manager.broadcast({
-                        'type': 'gcri_result',
-                        'final_output': final_output,
-                        'best_branch': result.get('best_branch_index') if isinstance(result, dict) else None,
-                        'iterations': result.get('count') if isinstance(result, dict) else None,
-                    }),
-                    loop,
-                )
+                task.result = result
+                task.publish({'type': 'gcri_result', **task.result})
+            task.status = 'aborted' if task.abort_event.is_set() else 'completed'
 
         except Exception as error:
-            logger.error(f'GCRI task failed: {error}')
-            asyncio.run_coroutine_threadsafe(
-                ws_manager.broadcast({
-                    'type': 'system_message',
-                    'content': f'GCRI task error: {str(error)}',
-                }),
-                loop,
-            )
-            asyncio.run_coroutine_threadsafe(
-                ws_manager.broadcast({
-                    'type': 'phase_change',
-                    'phase': 'idle',
-                }),
-                loop,
-            )
+            logger.error(f'GCRI task {task.task_id} failed: {error}')
+            current_span().record_error(error)
+            task.status = 'aborted' if task.abort_event.is_set() else 'failed'
+            task.error = str(error)
+            task.publish({
+                'type': 'system_message',
+                'content': f'GCRI task error: {str(error)}',
+            })
+            task.publish({
+                'type': 'phase_change',
+                'phase': 'idle',
+            })
         finally:
-            global _gcri_task_thread
-            _gcri_task_thread = None
+            task.finished_at = time.time()
+            # Runs write to CoMeT (use_comet), so searches cached before this one may be stale.
+            invalidate_search_cache()
 
-    _gcri_task_thread = threading.Thread(target=execute, daemon=True)
-    _gcri_task_thread.start()
 
-    return {'status': 'started', 'task': task_description}
+scheduler = GCRIScheduler()
 
+gauge('rui_gcri_queued_tasks', 'GCRI tasks waiting for a worker.', lambda: len(scheduler.queued()))
+gauge('rui_gcri_running_tasks', 'GCRI tasks currently running.', lambda: len(scheduler.running()))
 
-def abort_gcri_task():
-    _abort_event.set()
-    return {'status': 'abort_requested'}
+
+def is_running():
+    return bool(scheduler.running())
+
+
+def get_task(task_id):
+    return scheduler.get(task_id)
+
+
+def list_tasks():
+    return [task.to_dict() for task in scheduler.list()]
+
+
+async def run_gcri_task(task_description, rui_config, ws_manager, priority=0, session_id=None):
+    """Queue a GCRI task and return its id; it starts as soon as a worker is free."""
+    event_bridge.bind(asyncio.get_running_loop())
+    # Link to the chat turn of the same session that proposed this run, if there was one.
+    chat_turn = tracer.bookmarked(('chat', session_id)) if session_id else None
+    with tracer.span('gcri.schedule', links=[chat_turn], priority=priority, session_id=session_id) as span:
+        task = scheduler.submit(
+            task_description,
+            rui_config,
+            ws_manager,
+            priority=priority,
+            session_id=session_id,
+        )
+        span.set_attribute('task_id', task.task_id)
+    position = scheduler.queue_position(task.task_id)
+    starts_now = len(scheduler.running()) + len(scheduler.queued()) <= scheduler.workers
+    return {
+        'status': 'started' if starts_now else 'queued',
+        'task_id': task.task_id,
+        'task': task_description,
+        'queue_position': None if starts_now else position,
+    }
+
+
+def abort_gcri_task(task_id):
+    """Abort one queued or running task."""
+    if not scheduler.abort(task_id):
+        return {'status': 'error', 'message': f'No active task {task_id}'}
+    return {'status': 'abort_requested', 'task_id': task_id}
+
+
+def abort_session_tasks(session_id):
+    """Abort every active task submitted from chat session ``session_id``."""
+    aborted = [
+        task.task_id for task in scheduler.list()
+        if task.session_id == session_id and scheduler.abort(task.task_id)
+    ]
+    return {'status': 'abort_requested', 'task_ids': aborted}
@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 from pathlib import Path
 
 from loguru import logger
@@ -7,6 +8,9 @@ from loguru import logger
 
 _CACHE_PATH = Path.home() / '.rui' / 'keys.json'
 _runtime_keys = {}
+_key_listeners = []
+_keys_loaded = False
+_load_lock = threading.Lock()
 
 PROVIDER_KEY_MAP = {
     'openai': 'OPENAI_API_KEY',
@@ -60,38 +64,52 @@ def _save_cache():
     _CACHE_PATH.chmod(0o600)
 
 
-def _load_cached_keys():
-    if not _CACHE_PATH.exists():
+def load_cached_keys():
+    """Load keys saved by set_key into the environment, once; done on first use instead of at import."""
+    global _keys_loaded
+    if _keys_loaded:
         return
-    try:
-        cached = json.loads(_CACHE_PATH.read_text())
-        for env_var, key in cached.items():
-            _runtime_keys[env_var] = key
-            os.environ[env_var] = key
-        if cached:
-            providers = [p for p, ev in PROVIDER_KEY_MAP.items() if ev in cached]
-            logger.info(f'Loaded cached API keys for: {providers}')
-    except Exception as error:
-        logger.warning(f'Failed to load cached keys: {error}')
-
-
-_load_cached_keys()
+    with _load_lock:
+        if _keys_loaded:
+            return
+        try:
+            cached = json.loads(_CACHE_PATH.read_text()) if _CACHE_PATH.exists() else {}
+            for env_var, key in cached.items():
+                _runtime_keys[env_var] = key
+                os.environ[env_var] = key
+            if cached:
+                providers = [p for p, ev in PROVIDER_KEY_MAP.items() if ev in cached]
+                logger.info(f'Loaded cached API keys for: {providers}')
+        except Exception as error:
+            logger.warning(f'Failed to load cached keys: {error}')
+        _keys_loaded = True
+
+
+def add_key_listener(callback):
+    """Register ``callback(provider)`` to run whenever a provider key changes."""
+    _key_listeners.append(callback)
 
 
 def set_key(provider, key):
     env_var = PROVIDER_KEY_MAP.get(provider)
     if not env_var:
         raise ValueError(f'Unknown provider: {provider}')
+    load_cached_keys()
+    changed = _runtime_keys.get(env_var) != key
     _runtime_keys[env_var] = key
     os.environ[env_var] = key
     _save_cache()
     logger.info(f'API key set for {provider} ({_mask_key(key)})')
+    if changed:
+        for callback in _key_listeners:
+            callback(provider)
 
 
 def get_key(provider):
     env_var = PROVIDER_KEY_MAP.get(provider)
     if not env_var:
         return None
+    load_cached_keys()
     return _runtime_keys.get(env_var) or os.environ.get(env_var)
 
 
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import threading
+
+from loguru import logger
+
+from agent.agent_tools import TOOLS
+from services.key_store import PROVIDER_KEY_MAP, add_key_listener, get_key
+
+
+_clients = {}
+_tool_schemas = {}
+_lock = threading.Lock()
+
+
+def _import_openai():
+    try:
+        from openai import AsyncOpenAI
+    except ImportError:
+        raise ImportError('openai package not installed. Run: pip install openai')
+    return AsyncOpenAI
+
+
+def _import_anthropic():
+    try:
+        from anthropic import AsyncAnthropic
+    except ImportError:
+        raise ImportError('anthropic package not installed. Run: pip install anthropic')
+    return AsyncAnthropic
+
+
+def _import_genai():
+    try:
+        from google import genai
+        from google.genai import types
+    except ImportError:
+        raise ImportError('google-genai package not installed. Run: pip install google-genai')
+    return genai, types
+
+
+def genai_types():
+    """Return the ``google.genai.types`` module, raising ImportError if missing."""
+    return _import_genai()[1]
+
+
+def _create_client(provider, key):
+    # Retries are left to services.rate_limiter so every caller shares one backoff policy.
+    if provider == 'anthropic':
+        return _import_anthropic()(api_key=key, max_retries=0)
+    elif provider == 'google':
+        genai, types = _import_genai()
+        base_url = os.environ.get('RUI_GOOGLE_BASE_URL')
+        if base_url:
+            return genai.Client(api_key=key, http_options=types.HttpOptions(base_url=base_url))
+        return genai.Client(api_key=key)
+    else:
+        return _import_openai()(api_key=key, max_retries=0)
+
+
+def _close_client(client):
+    """Close a replaced client's connection pool without blocking the caller."""
+    close = getattr(client, 'close', None)
+    if close is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    try:
+        result = close()
+        if asyncio.iscoroutine(result):
+            loop.create_task(result)
+    except Exception as error:
+        logger.debug(f'Failed to close LLM client: {error}')
+
+
+def get_client(provider):
+    """Return the long-lived client for a provider, rebuilding it if its key changed."""
+    key = get_key(provider)
+    cached = _clients.get(provider)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with _lock:
+        cached = _clients.get(provider)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        client = _create_client(provider, key)
+        _clients[provider] = (key, client)
+    if cached is not None:
+        _close_client(cached[1])
+    logger.info(f'LLM client created for {provider}')
+    return client
+
+
+def warm_up():
+    """Import the SDK and build the client and tool schemas of every provider that has a key."""
+    for provider in PROVIDER_KEY_MAP:
+        if get_key(provider):
+            get_client(provider)
+            get_tool_schemas(provider)
+
+
+def invalidate(provider=None):
+    """Drop cached clients so the next call builds one with the current key."""
+    with _lock:
+        providers = [provider] if provider else list(_clients)
+        dropped = [_clients.pop(name) for name in providers if name in _clients]
+    for _, client in dropped:
+        _close_client(client)
+
+
+def _build_tool_schemas(provider):
+    if provider == 'anthropic':
+        anthropic_tools = []
+        for tool in TOOLS:
+            func = tool['function']
+            anthropic_tools.append({
+                'name': func['name'],
+                'description': func['description'],
+                'input_schema': func['parameters'],
+            })
+        return anthropic_tools
+    elif provider == 'google':
+        types = genai_types()
+        gemini_tools = []
+        for tool in TOOLS:
+            func = tool['function']
+            gemini_tools.append(types.Tool(
+                function_declarations=[types.FunctionDeclaration(
+                    name=func['name'],
+                    description=func['description'],
+                    parameters=func['parameters'],
+                )]
+            ))
+        return gemini_tools
+    else:
+        return TOOLS
+
+
+def get_tool_schemas(provider):
+    """Return ``TOOLS`` converted to the provider's native schema, built once."""
+    schemas = _tool_schemas.get(provider)
+    if schemas is None:
+        schemas = _build_tool_schemas(provider)
+        _tool_schemas[provider] = schemas
+    return schemas
+
+
+add_key_listener(invalidate)
@@ -0,0 +1,229 @@
+import asyncio
+import os
+import threading
+import time
+
+from loguru import logger
+
+
+# Hedge delay used until a model has enough samples for an adaptive p95.
+HEDGE_DEFAULT_DELAY = float(os.environ.get('RUI_HEDGE_DELAY', '8.0'))
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MAX_DELAY = 60.0
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+BACKUP_MODEL = os.environ.get('RUI_BACKUP_MODEL') or None
+
+# Log-spaced bucket bounds in seconds, 0.1s .. ~300s.
+LATENCY_BUCKETS = tuple(round(0.1 * 1.25 ** index, 3) for index in range(36))
+# Counts are halved once a histogram holds this many samples, so old latencies fade out.
+HISTOGRAM_DECAY_AT = 1000
+
+
+class LatencyHistogram:
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0.0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.samples = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(self.bounds) and seconds > self.bounds[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += 1
+        self.samples += 1
+        self.sum += seconds
+        if self.total >= HISTOGRAM_DECAY_AT:
+            self.counts = [count / 2 for count in self.counts]
+            self.total /= 2
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside the bucket that contains it."""
+        if not self.total:
+            return None
+        target = q * self.total
+        seen = 0.0
+        for index, count in enumerate(self.counts):
+            if seen + count >= target and count:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.bounds[-1] * 1.25
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+class Hedger:
+    """
+    Hedged and fallback LLM requests. The primary model gets a head start of
+    its adaptive p95 latency, counted from when its request clears the rate
+    limiter; if it has not answered by then the same request goes to the
+    backup model and the first success wins. No hedge is sent while either
+    model's provider is paused after a 429. An error from one side falls back
+    to the other. Latency is tracked per (model, kind), where kind is
+    'complete' for whole responses and 'first_token' for streams.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.backup_wins = 0
+        self.fallbacks = 0
+        self.errors = {}
+
+    def _histogram(self, model, kind):
+        with self._lock:
+            return self._histograms.setdefault((model, kind), LatencyHistogram())
+
+    def threshold(self, model, kind='complete'):
+        histogram = self._histogram(model, kind)
+        if histogram.samples < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return min(max(histogram.quantile(HEDGE_PERCENTILE), HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+    def observe(self, model, kind, seconds):
+        histogram = self._histogram(model, kind)
+        with self._lock:
+            histogram.observe(seconds)
+
+    async def _race(self, primary, backup, start, kind, discard=None, paused_for=None):
+        if backup == primary:
+            backup = None
+        self.calls += 1
+        tasks = {}
+        launched = []
+        # Latency is timed from when a request clears the rate limiter, reported by start's ``mark`` callback.
+        sent_at = {}
+        primary_sent = asyncio.Event()
+
+        def launch(model):
+            def mark():
+                sent_at[model] = time.perf_counter()
+                if model == primary:
+                    primary_sent.set()
+
+            tasks[asyncio.ensure_future(start(model, mark))] = model
+            launched.append(model)
+
+        launch(primary)
+        errors = []
+        try:
+            while tasks:
+                waiting = set(tasks)
+                timeout = None
+                paused = 0.0
+                sent_watch = None
+                if backup and len(launched) == 1:
+                    hedge_after = self.threshold(primary, kind)
+                    if primary not in sent_at:
+                        # The head start begins once the primary clears the limiter.
+                        sent_watch = asyncio.ensure_future(primary_sent.wait())
+                        waiting.add(sent_watch)
+                    else:
+                        paused = max(paused_for(primary), paused_for(backup)) if paused_for else 0.0
+                        timeout = paused or max(0.0, sent_at[primary] + hedge_after - time.perf_counter())
+                try:
+                    done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    if sent_watch is not None:
+                        sent_watch.cancel()
+                done.discard(sent_watch)
+                if not done:
+                    if timeout is None or paused:
+                        continue
+                    self.hedged += 1
+                    logger.info(f'{primary} slower than {hedge_after:.1f}s, hedging with {backup}')
+                    launch(backup)
+                    continue
+                for task in done:
+                    model = tasks.pop(task)
+                    if task.exception() is None:
+                        if model in sent_at:
+                            self.observe(model, kind, time.perf_counter() - sent_at[model])
+                        if model != primary:
+                            self.backup_wins += 1
+                        return model, task.result()
+                    errors.append(task.exception())
+                    self.errors[model] = self.errors.get(model, 0) + 1
+                    logger.warning(f'LLM call to {model} failed: {task.exception()}')
+                if not tasks and backup and len(launched) == 1:
+                    self.fallbacks += 1
+                    launch(backup)
+            raise errors[0]
+        finally:
+            for task, model in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    # The loser took at least this long; leaving it out would pull the p95 down.
+                    if model in sent_at:
+                        self.observe(model, kind, time.perf_counter() - sent_at[model])
+                elif discard is not None and not task.cancelled() and task.exception() is None:
+                    await discard(task.result())
+
+    async def call(self, primary, backup, request, paused_for=None):
+        """
+        Run ``request(model, mark)`` hedged across the two models; return
+        (model, result). ``request`` calls ``mark()`` once it is actually
+        sent, so time spent queued for the rate limiter is not counted.
+        ``paused_for(model)`` gives the seconds left on the model's provider
+        pause; hedging waits it out.
+        """
+        return await self._race(primary, backup, request, 'complete', paused_for=paused_for)
+
+    async def stream(self, primary, backup, open_stream, paused_for=None):
+        """
+        Hedge an async-iterator response on time to first item, then commit to
+        the winner. Errors after the first item are not retried, since its
+        output has already been passed on. ``open_stream`` and ``paused_for``
+        are as for ``call``.
+        """
+        async def first_item(model, mark):
+            iterator = open_stream(model, mark)
+            try:
+                return iterator, await iterator.__anext__()
+            except BaseException:
+                await iterator.aclose()
+                raise
+
+        async def discard(result):
+            await result[0].aclose()
+
+        _, (iterator, item) = await self._race(primary, backup, first_item, 'first_token', discard, paused_for)
+        try:
+            yield item
+            async for item in iterator:
+                yield item
+        finally:
+            await iterator.aclose()
+
+    def get_stats(self):
+        with self._lock:
+            models = [
+                {
+                    'model': model,
+                    'kind': kind,
+                    'samples': histogram.samples,
+                    'avg': histogram.sum / histogram.samples if histogram.samples else 0.0,
+                    'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(HEDGE_PERCENTILE),
+                }
+                for (model, kind), histogram in sorted(self._histograms.items())
+            ]
+        for entry in models:
+            entry['hedge_after'] = self.threshold(entry['model'], entry['kind'])
+        return {
+            'calls': self.calls,
+            'hedged': self.hedged,
+            'backup_wins': self.backup_wins,
+            'fallbacks': self.fallbacks,
+            'errors': dict(self.errors),
+            'default_backup': BACKUP_MODEL,
+            'models': models,
+        }
+
+
+hedger = Hedger()
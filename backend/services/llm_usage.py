@@ -0,0 +1,80 @@
+import threading
+
+
+USAGE_FIELDS = ('input_tokens', 'cached_tokens', 'cache_write_tokens', 'output_tokens')
+
+
+def openai_usage(usage):
+    if usage is None:
+        return None
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {
+        'input_tokens': usage.prompt_tokens or 0,
+        'cached_tokens': (getattr(details, 'cached_tokens', None) or 0) if details else 0,
+        'cache_write_tokens': 0,
+        'output_tokens': usage.completion_tokens or 0,
+    }
+
+
+def anthropic_usage(usage):
+    """Anthropic reports uncached input separately from cache reads and writes; input_tokens here is the total."""
+    if usage is None:
+        return None
+    cached = getattr(usage, 'cache_read_input_tokens', None) or 0
+    written = getattr(usage, 'cache_creation_input_tokens', None) or 0
+    return {
+        'input_tokens': (usage.input_tokens or 0) + cached + written,
+        'cached_tokens': cached,
+        'cache_write_tokens': written,
+        'output_tokens': usage.output_tokens or 0,
+    }
+
+
+def gemini_usage(usage):
+    if usage is None:
+        return None
+    return {
+        'input_tokens': usage.prompt_token_count or 0,
+        'cached_tokens': usage.cached_content_token_count or 0,
+        'cache_write_tokens': 0,
+        'output_tokens': usage.candidates_token_count or 0,
+    }
+
+
+def add_usage(total, usage):
+    """Add a normalized usage dict into ``total`` in place and return it."""
+    for field in USAGE_FIELDS:
+        total[field] = total.get(field, 0) + (usage or {}).get(field, 0)
+    return total
+
+
+class UsageStats:
+    """Process-wide prompt-cache and token totals per provider and model."""
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider, model, usage):
+        if not usage:
+            return
+        with self._lock:
+            total = self._totals.setdefault((provider, model), {'calls': 0})
+            total['calls'] += 1
+            add_usage(total, usage)
+
+    def get_stats(self):
+        with self._lock:
+            models = []
+            for (provider, model), total in sorted(self._totals.items()):
+                input_tokens = total.get('input_tokens', 0)
+                models.append({
+                    'provider': provider,
+                    'model': model,
+                    **total,
+                    'cache_hit_rate': total.get('cached_tokens', 0) / input_tokens if input_tokens else 0.0,
+                })
+            return {'models': models}
+
+
+usage_stats = UsageStats()
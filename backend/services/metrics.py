@@ -0,0 +1,210 @@
+"""
+Minimal Prometheus metrics: counters and histograms updated on the hot path
+with one dict lookup, a bisect and an increment under a per-metric lock, plus
+gauges that read existing state only when /metrics is scraped.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+    # Appended to the name of every sample and of the HELP/TYPE lines, e.g. '_total' for counters.
+    suffix = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        name = self.name + self.suffix
+        return [f'# HELP {name} {self.documentation}', f'# TYPE {name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    suffix = '_total'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f'{self.name}{self.suffix}{_labels(self.labelnames, labels)} {_number(value)}' for labels, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        lines = self.header()
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge whose value is computed at scrape time by ``read()``; returns a number or {labels: number}."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, read, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.read = read
+
+    def render(self):
+        value = self.read()
+        items = sorted(value.items()) if isinstance(value, dict) else [((), value)]
+        return self.header() + [
+            f'{self.name}{self.suffix}{_labels(self.labelnames, labels)} {_number(number)}' for labels, number in items
+        ]
+
+
+class CallbackCounter(Gauge):
+    """Counter kept elsewhere (e.g. an existing stats attribute), read at scrape time."""
+
+    kind = 'counter'
+    suffix = '_total'
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as error:
+                lines.append(f'# {metric.name} unavailable: {_escape(error)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def counter(name, documentation, labelnames=()):
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def gauge(name, documentation, read, labelnames=()):
+    return registry.register(Gauge(name, documentation, read, labelnames))
+
+
+def callback_counter(name, documentation, read, labelnames=()):
+    return registry.register(CallbackCounter(name, documentation, read, labelnames))
+
+
+http_request_seconds = histogram(
+    'rui_http_request_seconds', 'HTTP request latency by route template.', ('method', 'route', 'status'),
+)
+llm_request_seconds = histogram(
+    'rui_llm_request_seconds', 'LLM call latency.', ('provider', 'model', 'mode'), LLM_BUCKETS,
+)
+llm_errors = counter('rui_llm_errors', 'Failed LLM calls.', ('provider', 'model'))
+tool_seconds = histogram('rui_tool_seconds', 'execute_tool duration by tool.', ('tool',))
+comet_wait_seconds = histogram('rui_comet_queue_wait_seconds', 'Time CoMeT calls waited for a worker.', ('call',))
+comet_run_seconds = histogram('rui_comet_run_seconds', 'CoMeT bridge call run time.', ('call',))
+ws_broadcast_seconds = histogram('rui_ws_broadcast_seconds', 'Time to fan a broadcast out to client queues.')
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording HTTP latency labeled by route template, not raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                scope['method'],
+                getattr(route, 'path', 'unmatched'),
+                status[0],
+            )
@@ -0,0 +1,311 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+from loguru import logger
+
+
+# Requests and tokens per minute per provider, overridable with
+# RUI_RATE_LIMITS="openai=500/300000,anthropic=200/100000".
+DEFAULT_LIMITS = {
+    'openai': (500, 300000),
+    'anthropic': (200, 100000),
+    'google': (300, 1000000),
+}
+# Lower number goes first among waiters.
+LANES = {'chat': 0, 'batch': 1}
+# Fraction of each bucket the batch lane may not dip into, so chat keeps headroom.
+BATCH_RESERVE = float(os.environ.get('RUI_RATE_BATCH_RESERVE', '0.2'))
+POLL_INTERVAL = 0.05
+MAX_RETRIES = int(os.environ.get('RUI_RATE_MAX_RETRIES', '4'))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+# Failures without a status: the SDK clients run with max_retries=0, so dropped
+# connections and timeouts are retried here. Matched by class name (including
+# base classes) to avoid importing the provider SDKs.
+RETRYABLE_ERRORS = {'APIConnectionError', 'APITimeoutError', 'TransportError'}
+# Token cost charged for GCRI branch calls, whose prompt size is not visible here.
+BATCH_REQUEST_TOKENS = int(os.environ.get('RUI_RATE_BATCH_TOKENS', '4000'))
+
+
+def _parse_limits(text):
+    limits = dict(DEFAULT_LIMITS)
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        provider, _, values = item.partition('=')
+        rpm, _, tpm = values.partition('/')
+        limits[provider.strip()] = (int(rpm), int(tpm or limits.get(provider.strip(), (0, 0))[1]))
+    return limits
+
+
+class TokenBucket:
+    """Continuously refilling bucket; callers hold the limiter lock."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount, reserve=0.0):
+        """Seconds until ``amount`` can be taken while leaving ``reserve`` of capacity untouched."""
+        needed = min(amount, self.capacity) + reserve * self.capacity - self.level
+        return max(0.0, needed / self.rate) if self.rate else float('inf')
+
+
+class ProviderLimiter:
+    """
+    RPM and TPM buckets for one provider, shared by every caller in the
+    process. Waiters queue in lane order (chat before batch, then arrival),
+    and only the head of the queue may take from the buckets, so a steady
+    stream of batch calls cannot starve an interactive one.
+    """
+
+    def __init__(self, provider, rpm, tpm):
+        self.provider = provider
+        self.limits = (rpm, tpm)
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._waiting = []
+        self._tickets = itertools.count()
+        self.acquired = {lane: 0 for lane in LANES}
+        self.waited = {lane: 0.0 for lane in LANES}
+        self.throttled = 0
+
+    def _enqueue(self, lane):
+        ticket = (LANES.get(lane, LANES['batch']), next(self._tickets))
+        with self._lock:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _leave(self, ticket):
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+
+    def _try_take(self, ticket, tokens, lane):
+        """Take from both buckets if ``ticket`` is at the head; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self._waiting[0] != ticket:
+                return POLL_INTERVAL
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            reserve = BATCH_RESERVE if lane == 'batch' else 0.0
+            wait = max(self.requests.wait_for(1, reserve), self.tokens.wait_for(tokens, reserve))
+            if wait > 0:
+                return wait
+            self.requests.level -= 1
+            self.tokens.level -= tokens
+            heapq.heappop(self._waiting)
+            self.acquired[lane] = self.acquired.get(lane, 0) + 1
+            return 0.0
+
+    def acquire(self, tokens=1, lane='batch', blocking=True):
+        """Block the calling thread until the request may be sent; without ``blocking`` only try once."""
+        ticket = self._enqueue(lane)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_take(ticket, tokens, lane)
+                if not wait:
+                    break
+                if not blocking:
+                    return False
+                time.sleep(min(wait, POLL_INTERVAL * 4))
+        finally:
+            self._leave(ticket)
+        self.waited[lane] = self.waited.get(lane, 0.0) + time.monotonic() - started
+        return True
+
+    async def aacquire(self, tokens=1, lane='chat', blocking=True):
+        ticket = self._enqueue(lane)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_take(ticket, tokens, lane)
+                if not wait:
+                    break
+                if not blocking:
+                    return False
+                await asyncio.sleep(min(wait, POLL_INTERVAL * 4))
+        finally:
+            self._leave(ticket)
+        self.waited[lane] = self.waited.get(lane, 0.0) + time.monotonic() - started
+        return True
+
+    def settle(self, estimated, actual):
+        """Correct the token bucket once the real usage of a request is known."""
+        if actual is None:
+            return
+        with self._lock:
+            self.tokens.level -= actual - estimated
+
+    def pause(self, seconds):
+        """Hold every caller for ``seconds``, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.throttled += 1
+
+    def paused_for(self):
+        """Seconds left on a pause set by ``pause``, or 0.0."""
+        return max(0.0, self.blocked_until - time.monotonic())
+
+    def scale(self, share):
+        """Resize both buckets to ``share`` of the configured limits."""
+        with self._lock:
+            for bucket, limit in zip((self.requests, self.tokens), self.limits):
+                bucket.capacity = limit * share
+                bucket.rate = limit * share / 60.0
+                bucket.level = min(bucket.level, bucket.capacity)
+
+    def get_stats(self):
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                'rpm': self.requests.capacity,
+                'tpm': self.tokens.capacity,
+                'requests_available': self.requests.level,
+                'tokens_available': self.tokens.level,
+                'waiting': len(self._waiting),
+                'paused_for': max(0.0, self.blocked_until - now),
+                'acquired': dict(self.acquired),
+                'wait_seconds': dict(self.waited),
+                'throttled': self.throttled,
+            }
+
+
+def _status_of(error):
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None) or getattr(error, 'status', None)
+    return status if isinstance(status, int) else None
+
+
+def _is_transient(error):
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def _retry_after(error):
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class RateLimiter:
+    """Process-wide registry of per-provider limiters plus the shared retry policy."""
+
+    def __init__(self, limits=None):
+        self._limits = limits or _parse_limits(os.environ.get('RUI_RATE_LIMITS'))
+        self._providers = {}
+        self._lock = threading.Lock()
+        self._share = 1.0
+
+    def get(self, provider):
+        limiter = self._providers.get(provider)
+        if limiter is None:
+            with self._lock:
+                limiter = self._providers.get(provider)
+                if limiter is None:
+                    rpm, tpm = self._limits.get(provider, DEFAULT_LIMITS['openai'])
+                    limiter = ProviderLimiter(provider, rpm, tpm)
+                    limiter.scale(self._share)
+                    self._providers[provider] = limiter
+        return limiter
+
+    def set_share(self, share):
+        """Use only ``share`` of each provider's limits, for processes that split them with siblings."""
+        with self._lock:
+            self._share = share
+            for limiter in self._providers.values():
+                limiter.scale(share)
+
+    def backoff(self, provider, error, attempt):
+        """
+        Delay before retrying after ``error``, or None if it should not be
+        retried. Full-jitter exponential backoff, but never shorter than the
+        provider's Retry-After, which also pauses every other caller.
+        """
+        status = _status_of(error)
+        if attempt >= MAX_RETRIES or (status not in RETRYABLE_STATUS and not _is_transient(error)):
+            return None
+        retry_after = _retry_after(error)
+        if retry_after is not None and status == 429:
+            self.get(provider).pause(retry_after)
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def call(self, provider, request, tokens=1, lane='chat', on_acquired=None):
+        """
+        Await ``request()`` under the provider's limits, retrying throttled and
+        transient failures. ``on_acquired`` is called each time a slot is taken,
+        just before the request goes out.
+        """
+        limiter = self.get(provider)
+        for attempt in itertools.count():
+            await limiter.aacquire(tokens, lane)
+            if on_acquired is not None:
+                on_acquired()
+            try:
+                return await request()
+            except Exception as error:
+                delay = self.backoff(provider, error, attempt)
+                if delay is None:
+                    raise
+                logger.warning(f'{provider} call failed ({error}), retrying in {delay:.1f}s')
+                await asyncio.sleep(delay)
+
+    def get_stats(self):
+        with self._lock:
+            providers = dict(self._providers)
+        return {
+            'share': self._share,
+            'providers': {provider: limiter.get_stats() for provider, limiter in providers.items()},
+        }
+
+
+rate_limiter = RateLimiter()
+
+
+def langchain_rate_limiter(provider, tokens=BATCH_REQUEST_TOKENS):
+    """
+    A langchain ``BaseRateLimiter`` drawing from this process's limiter in
+    the batch lane, or None if langchain_core is not installed. Charges a
+    flat ``tokens`` per call because langchain does not pass the prompt.
+    """
+    try:
+        from langchain_core.rate_limiters import BaseRateLimiter
+    except ImportError:
+        return None
+
+    class _ProviderRateLimiter(BaseRateLimiter):
+        def acquire(self, *, blocking=True):
+            return rate_limiter.get(provider).acquire(tokens, 'batch', blocking)
+
+        async def aacquire(self, *, blocking=True):
+            return await rate_limiter.get(provider).aacquire(tokens, 'batch', blocking)
+
+        def __deepcopy__(self, memo):
+            return self
+
+    return _ProviderRateLimiter()
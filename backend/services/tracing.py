@@ -0,0 +1,356 @@
+"""
+In-process span tracing. The current span lives in a contextvar, so it
+follows asyncio tasks on its own; code that hands work to another thread
+(GCRI workers, the event bridge, the CoMeT executor) carries a SpanContext
+across explicitly. Finished spans go to a ring buffer served at
+/debug/traces and, when RUI_TRACE_FILE is set, are appended to that file as
+OTLP/JSON lines (one ExportTraceServiceRequest per line), which the
+OpenTelemetry collector's otlpjsonfile receiver can read.
+"""
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+
+
+TRACING_ENABLED = os.environ.get('RUI_TRACING', '1') != '0'
+TRACE_BUFFER_SIZE = int(os.environ.get('RUI_TRACE_BUFFER', '10000'))
+TRACE_FILE = os.environ.get('RUI_TRACE_FILE')
+TRACE_FLUSH_INTERVAL = 1.0
+SERVICE_NAME = 'rui-backend'
+MAX_LINKS = 32
+MAX_BOOKMARKS = 1000
+# Requests to these paths are not traced; they are polled and would crowd out real traces.
+UNTRACED_PATHS = ('/debug/', '/metrics', '/health', '/ready', '/ws/stats')
+
+_OTLP_KIND = {'internal': 1, 'server': 2, 'client': 3}
+_CURRENT = object()
+_current_span = contextvars.ContextVar('rui_current_span', default=None)
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+
+
+def _new_id(bits):
+    return f'{random.getrandbits(bits):0{bits // 4}x}'
+
+
+def parse_traceparent(header):
+    """SpanContext from a W3C ``traceparent`` header, or None when it is missing or malformed."""
+    parts = (header or '').split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    if parts[1] == '0' * 32 or parts[2] == '0' * 16:
+        return None
+    return SpanContext(parts[1], parts[2])
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Span:
+    __slots__ = (
+        '_tracer', 'name', 'kind', 'context', 'parent_id', 'start', 'end_time', 'attributes', 'links', 'status', 'error',
+    )
+
+    def __init__(self, tracer, name, context, parent_id, kind, start, attributes, links):
+        self._tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start = start
+        self.end_time = None
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.links = [link for link in links if link is not None][:MAX_LINKS]
+        self.status = 'ok'
+        self.error = None
+
+    def set_attribute(self, key, value):
+        if value is not None:
+            self.attributes[key] = value
+
+    def add_link(self, context):
+        if context is not None and len(self.links) < MAX_LINKS and context not in self.links:
+            self.links.append(context)
+
+    def record_error(self, error, status='error'):
+        self.status = status
+        self.error = f'{type(error).__name__}: {error}'
+
+    def end(self, end=None):
+        if self.end_time is None:
+            self.end_time = time.time() if end is None else end
+            self._tracer._export(self)
+
+    @property
+    def duration(self):
+        return (self.end_time if self.end_time is not None else time.time()) - self.start
+
+    def to_otlp(self):
+        span = {
+            'traceId': self.context.trace_id,
+            'spanId': self.context.span_id,
+            'name': self.name,
+            'kind': _OTLP_KIND.get(self.kind, 1),
+            'startTimeUnixNano': str(int(self.start * 1e9)),
+            'endTimeUnixNano': str(int((self.end_time or self.start) * 1e9)),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+            'links': [{'traceId': link.trace_id, 'spanId': link.span_id} for link in self.links],
+            'status': {'code': 2, 'message': self.error} if self.status == 'error' else {'code': 1},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    context = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def add_link(self, context):
+        pass
+
+    def record_error(self, error, status='error'):
+        pass
+
+    def end(self, end=None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+def current_context():
+    """SpanContext of the active span, for handing to another thread; None outside any span."""
+    span = _current_span.get()
+    return span.context if span is not None else None
+
+
+class Tracer:
+    """Creates spans and keeps the most recent finished ones in memory."""
+
+    def __init__(self, enabled=TRACING_ENABLED, buffer_size=TRACE_BUFFER_SIZE, file_path=TRACE_FILE):
+        self.enabled = enabled
+        self.file_path = Path(file_path) if file_path else None
+        self._finished = deque(maxlen=buffer_size)
+        self._unwritten = []
+        self._bookmarks = OrderedDict()
+        self._lock = threading.Lock()
+        self._writer = None
+        self.exported = 0
+        self.write_errors = 0
+
+    def start_span(self, name, parent=_CURRENT, kind='internal', links=(), start=None, **attributes):
+        """
+        Start a span without making it current; call ``end()`` on it. ``parent``
+        defaults to the active span; pass a SpanContext from another thread,
+        or None for a new trace.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        if parent is _CURRENT:
+            parent = current_context()
+        trace_id = parent.trace_id if parent is not None else _new_id(128)
+        return Span(
+            self,
+            name,
+            SpanContext(trace_id, _new_id(64)),
+            parent.span_id if parent is not None else None,
+            kind,
+            time.time() if start is None else start,
+            attributes,
+            links,
+        )
+
+    @contextmanager
+    def span(self, name, parent=_CURRENT, kind='internal', links=(), **attributes):
+        """Run the block inside a new current span, recording any exception that escapes it."""
+        span = self.start_span(name, parent, kind, links, **attributes)
+        if span is NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.record_error(error, 'error' if isinstance(error, Exception) else 'cancelled')
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def record(self, name, start, end, parent=_CURRENT, **attributes):
+        """Record an already-finished span from epoch-second timestamps."""
+        span = self.start_span(name, parent, start=start, **attributes)
+        span.end(end)
+        return span
+
+    def bookmark(self, key, context):
+        """Remember a SpanContext under ``key`` so a later trace can link back to it."""
+        if context is None:
+            return
+        with self._lock:
+            self._bookmarks[key] = context
+            self._bookmarks.move_to_end(key)
+            while len(self._bookmarks) > MAX_BOOKMARKS:
+                self._bookmarks.popitem(last=False)
+
+    def bookmarked(self, key):
+        with self._lock:
+            return self._bookmarks.get(key)
+
+    def _export(self, span):
+        with self._lock:
+            self._finished.append(span)
+            self.exported += 1
+            if self.file_path is not None:
+                self._unwritten.append(span)
+                self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name='trace-exporter', daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            time.sleep(TRACE_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        """Append pending spans to the OTLP/JSON file, if one is configured."""
+        with self._lock:
+            batch, self._unwritten = self._unwritten, []
+        if not batch or self.file_path is None:
+            return
+        request = {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+                'scopeSpans': [{'scope': {'name': 'rui'}, 'spans': [span.to_otlp() for span in batch]}],
+            }],
+        }
+        try:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.file_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(request, default=str) + '\n')
+        except OSError as error:
+            self.write_errors += 1
+            logger.warning(f'Failed to write traces to {self.file_path}: {error}')
+
+    def _spans_by_trace(self):
+        with self._lock:
+            spans = list(self._finished)
+        traces = OrderedDict()
+        for span in spans:
+            traces.setdefault(span.context.trace_id, []).append(span)
+        return traces
+
+    def traces(self, limit=20):
+        """Most recently finished traces first, each as a span tree."""
+        traces = self._spans_by_trace()
+        ordered = sorted(traces.values(), key=lambda spans: max(span.end_time for span in spans), reverse=True)
+        return [_trace_tree(spans) for spans in ordered[:limit]]
+
+    def trace(self, trace_id):
+        spans = self._spans_by_trace().get(trace_id)
+        return _trace_tree(spans) if spans else None
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'buffered': len(self._finished),
+                'buffer_size': self._finished.maxlen,
+                'exported': self.exported,
+                'file': str(self.file_path) if self.file_path else None,
+                'pending_writes': len(self._unwritten),
+                'write_errors': self.write_errors,
+            }
+
+
+def _trace_tree(spans):
+    """Nest spans under their parents with offsets in ms from the trace start, flame-graph style."""
+    origin = min(span.start for span in spans)
+    ids = {span.context.span_id for span in spans}
+    nodes = {}
+    for span in sorted(spans, key=lambda s: s.start):
+        nodes[span.context.span_id] = {
+            'name': span.name,
+            'span_id': span.context.span_id,
+            'start_ms': round((span.start - origin) * 1000, 3),
+            'duration_ms': round(span.duration * 1000, 3),
+            'status': span.status,
+            'error': span.error,
+            'attributes': span.attributes,
+            'links': [link._asdict() for link in span.links],
+            'children': [],
+        }
+    roots = []
+    for span in sorted(spans, key=lambda s: s.start):
+        node = nodes[span.context.span_id]
+        if span.parent_id in ids:
+            nodes[span.parent_id]['children'].append(node)
+        else:
+            node['parent_span_id'] = span.parent_id
+            roots.append(node)
+    return {
+        'trace_id': spans[0].context.trace_id,
+        'start': origin,
+        'duration_ms': round((max(span.end_time for span in spans) - origin) * 1000, 3),
+        'span_count': len(spans),
+        'roots': roots,
+    }
+
+
+tracer = Tracer()
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request, continuing an incoming ``traceparent``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not tracer.enabled or scope['path'].startswith(UNTRACED_PATHS):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get('headers') or [])
+        parent = parse_traceparent(headers.get(b'traceparent', b'').decode('latin-1'))
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                span.set_attribute('http.status_code', message['status'])
+            await send(message)
+
+        with tracer.span(scope['method'], parent=parent, kind='server', **{'http.method': scope['method']}) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get('route'), 'path', scope['path'])
+                span.name = f"{scope['method']} {route}"
+                span.set_attribute('http.route', route)
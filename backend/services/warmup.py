@@ -0,0 +1,94 @@
+"""
+Background warm-up of slow dependencies at startup. Each registered step
+runs once on its own thread so the server can accept connections right
+away; /ready reports every step's state and timing and only returns 200
+once none is still pending or running.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from loguru import logger
+
+
+# Comma-separated step names to leave cold, e.g. 'comet' where CoMeT is not installed.
+WARMUP_SKIP = {name.strip() for name in os.environ.get('RUI_WARMUP_SKIP', '').split(',') if name.strip()}
+
+
+class _Step:
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+        self.state = 'skipped' if name in WARMUP_SKIP else 'pending'
+        self.started_at = None
+        self.seconds = None
+        self.error = None
+
+    def run(self):
+        self.state = 'running'
+        self.started_at = time.time()
+        started = time.perf_counter()
+        try:
+            self.func()
+            self.state = 'ready'
+        except Exception as error:
+            self.state = 'failed'
+            self.error = f'{type(error).__name__}: {error}'
+            logger.warning(f'Warm-up of {self.name} failed: {self.error}')
+        finally:
+            self.seconds = time.perf_counter() - started
+        if self.state == 'ready':
+            logger.info(f'Warm-up of {self.name} done in {self.seconds:.2f}s')
+
+    def to_dict(self):
+        return {
+            'state': self.state,
+            'started_at': self.started_at,
+            'seconds': round(self.seconds, 3) if self.seconds is not None else None,
+            'error': self.error,
+        }
+
+
+class Warmup:
+    """Registry of warm-up steps; ``start`` launches them all in parallel."""
+
+    def __init__(self):
+        self._steps = OrderedDict()
+        self._lock = threading.Lock()
+        self.created_at = time.time()
+        self.started_at = None
+
+    def add(self, name, func):
+        with self._lock:
+            self._steps[name] = _Step(name, func)
+
+    def start(self):
+        with self._lock:
+            if self.started_at is not None:
+                return
+            self.started_at = time.time()
+            steps = [step for step in self._steps.values() if step.state == 'pending']
+        for step in steps:
+            threading.Thread(target=step.run, name=f'warmup-{step.name}', daemon=True).start()
+
+    @property
+    def ready(self):
+        with self._lock:
+            steps = list(self._steps.values())
+        return self.started_at is not None and all(step.state not in ('pending', 'running') for step in steps)
+
+    def get_status(self):
+        with self._lock:
+            steps = list(self._steps.items())
+        ready = self.ready
+        return {
+            'ready': ready,
+            # Failed steps do not hold readiness back: their features degrade and retry on first use.
+            'degraded': any(step.state == 'failed' for _, step in steps),
+            'since_start': round(time.time() - self.created_at, 3),
+            'dependencies': {name: step.to_dict() for name, step in steps},
+        }
+
+
+warmup = Warmup()
@@ -1,45 +1,355 @@
 import asyncio
 import json
+import os
+import time
+import zlib
+from collections import OrderedDict, deque
 
-from fastapi import WebSocket, WebSocketDisconnect
+from fastapi import WebSocket
+from loguru import logger
+
+from services.metrics import callback_counter, gauge, ws_broadcast_seconds
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+WS_QUEUE_SIZE = int(os.environ.get('RUI_WS_QUEUE_SIZE', '256'))
+# What to do when a client's queue is full: 'drop' the oldest frame, 'coalesce'
+# superseded state frames, or 'disconnect' the client.
+WS_OVERFLOW_POLICY = os.environ.get('RUI_WS_OVERFLOW', 'coalesce')
+COALESCE_TYPES = {'phase_change', 'node_update'}
+TERMINAL_PHASES = {'complete', 'idle', 'aborted'}
+WS_HISTORY_SIZE = int(os.environ.get('RUI_WS_HISTORY', '500'))
+# Latest event of these types per task is kept for snapshots when a resume gap is too large.
+# 'timing' events each carry only new iterations, so the latest one is no snapshot;
+# clients catch up from /api/task/{id}/profile instead.
+SNAPSHOT_TYPES = (
+    'phase_change', 'node_update', 'strategies', 'iteration_complete', 'decision', 'gcri_result',
+)
+
+
+# Frames at least this large are zlib-compressed for clients that asked for compression.
+COMPRESS_THRESHOLD = int(os.environ.get('RUI_WS_COMPRESS_THRESHOLD', '4096'))
+ENCODINGS = ('json', 'msgpack')
+
+
+def _encode(message, encoding='json'):
+    if encoding == 'msgpack':
+        return msgpack.packb(message, use_bin_type=True, default=str)
+    return json.dumps(message, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _encode_batch(parts, encoding='json'):
+    """Wrap already-encoded events in a batch frame without re-encoding them."""
+    if encoding == 'msgpack':
+        packer = msgpack.Packer(use_bin_type=True)
+        header = packer.pack_map_header(2) + packer.pack('type') + packer.pack('batch') + packer.pack('events')
+        return header + packer.pack_array_header(len(parts)) + b''.join(parts)
+    return '{"type":"batch","events":[' + ','.join(parts) + ']}'
+
+
+def _compress(frame, compress):
+    """
+    Deflate (zlib format) large frames. Compressed frames are always binary;
+    they start with 0x78, which no uncompressed msgpack map frame does.
+    """
+    if not compress or len(frame) < COMPRESS_THRESHOLD:
+        return frame
+    if isinstance(frame, str):
+        frame = frame.encode('utf-8')
+    return zlib.compress(frame, 6)
+
+
+def negotiate(params):
+    """Pick the wire format for a client from its /ws query params."""
+    encoding = params.get('encoding', 'json')
+    if encoding not in ENCODINGS or (encoding == 'msgpack' and msgpack is None):
+        encoding = 'json'
+    compress = params.get('compress') in ('deflate', '1', 'true')
+    return encoding, compress
+
+
+SUBSCRIPTION_FIELDS = {
+    'tasks': 'taskId',
+    'sessions': 'sessionId',
+    'events': 'type',
+}
+
+
+def parse_subscription(data):
+    """
+    Build a subscription filter from a subscribe frame or query params; empty
+    means everything. Values other than a comma-separated string or a list of
+    strings are ignored.
+    """
+    subscription = {}
+    for field in SUBSCRIPTION_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            value = [item.strip() for item in value.split(',') if item.strip()]
+        elif not isinstance(value, list):
+            value = None
+        values = {item for item in value or () if isinstance(item, str)}
+        subscription[field] = values or None
+    return subscription
+
+
+def coalesce_key(message):
+    """
+    Key under which a newer frame replaces an older one, or None if the frame
+    must always be delivered. A phase_change only supersedes one for the same
+    phase and iteration; iteration starts (they carry maxIterations) and
+    terminal phases are never merged away.
+    """
+    kind = message.get('type')
+    if kind not in COALESCE_TYPES:
+        return None
+    if kind == 'phase_change':
+        if 'maxIterations' in message or message.get('phase') in TERMINAL_PHASES:
+            return None
+        return kind, message.get('taskId'), message.get('phase'), message.get('iteration')
+    return kind, message.get('taskId')
+
+
+class _Connection:
+    """One client socket with a bounded outbound queue drained by its own writer task."""
+
+    def __init__(self, websocket: WebSocket, maxsize: int, policy: str, encoding='json', compress=False):
+        self.websocket = websocket
+        self.encoding = encoding
+        self.compress = compress
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue = deque()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.subscription = parse_subscription({})
+        self._wakeup = asyncio.Event()
+        self.writer = None
+
+    def matches(self, message):
+        """
+        Whether the message passes this client's subscription. A message
+        without a task or session id is not filtered on that dimension.
+        """
+        for field, key in SUBSCRIPTION_FIELDS.items():
+            wanted = self.subscription[field]
+            if wanted is None:
+                continue
+            value = message.get(key)
+            if value is not None and value not in wanted:
+                return False
+        return True
+
+    @property
+    def codec(self):
+        return self.encoding, self.compress
+
+    def frame(self, message):
+        return _compress(_encode(message, self.encoding), self.compress)
+
+    def enqueue(self, text, key=None):
+        """Queue an encoded frame (str or bytes); return False if the client should be disconnected."""
+        if len(self.queue) >= self.maxsize:
+            if self.policy == 'disconnect':
+                return False
+            if self.policy == 'coalesce' and key is not None:
+                for index, (queued_key, _) in enumerate(self.queue):
+                    if queued_key == key:
+                        del self.queue[index]
+                        self.coalesced += 1
+                        break
+            if len(self.queue) >= self.maxsize:
+                self.queue.popleft()
+                self.dropped += 1
+        self.queue.append((key, text))
+        self._wakeup.set()
+        return True
+
+    async def run(self):
+        while True:
+            await self._wakeup.wait()
+            while self.queue:
+                _, payload = self.queue.popleft()
+                if isinstance(payload, bytes):
+                    await self.websocket.send_bytes(payload)
+                else:
+                    await self.websocket.send_text(payload)
+                self.sent += 1
+            self._wakeup.clear()
 
 
 class WSManager:
-    def __init__(self):
-        self.connections: list[WebSocket] = []
-        self.log_history: list[dict] = []
-        self.max_history = 500
+    def __init__(self, queue_size=WS_QUEUE_SIZE, overflow_policy=WS_OVERFLOW_POLICY, max_history=WS_HISTORY_SIZE):
+        self.connections: dict[WebSocket, _Connection] = {}
+        self.log_history: deque[dict] = deque(maxlen=max_history)
+        self.max_history = max_history
+        self.seq = 0
+        self._history_floor = 0
+        self._latest_state = OrderedDict()
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.send_errors = 0
+        self.overflow_disconnects = 0
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        subscription: dict = None,
+        last_seq: int = None,
+        encoding: str = 'json',
+        compress: bool = False,
+    ):
         await websocket.accept()
-        self.connections.append(websocket)
-        if self.log_history:
-            await websocket.send_json({
-                'type': 'history',
-                'data': self.log_history,
-            })
+        connection = _Connection(websocket, self.queue_size, self.overflow_policy, encoding, compress)
+        if subscription:
+            connection.subscription = subscription
+        connection.writer = asyncio.create_task(self._write(connection))
+        self.connections[websocket] = connection
+        connection.enqueue(connection.frame({'type': 'hello', 'latest_seq': self.seq, 'encoding': encoding, 'compress': compress}))
+        for frame in self._replay_frames(connection, last_seq):
+            connection.enqueue(connection.frame(frame))
+
+    def _replay_frames(self, connection, last_seq):
+        """
+        Frames that bring a (re)connecting client up to date. With a
+        ``last_seq`` still covered by the ring buffer only the missed events
+        are sent; otherwise a snapshot of the latest per-task state.
+        """
+        if last_seq is None:
+            history = [message for message in self.log_history if connection.matches(message)]
+            return [{'type': 'history', 'seq': self.seq, 'data': history}] if history else []
+        if self._history_floor <= last_seq <= self.seq:
+            missed = [m for m in self.log_history if m['seq'] > last_seq and connection.matches(m)]
+            return [{'type': 'history', 'seq': self.seq, 'resumed': True, 'data': missed}]
+        state = [message for message in self._latest_state.values() if connection.matches(message)]
+        return [{'type': 'snapshot', 'seq': self.seq, 'data': sorted(state, key=lambda m: m['seq'])}]
+
+    def subscribe(self, websocket: WebSocket, data: dict):
+        """Replace a client's subscription with the tasks, sessions and events in ``data``."""
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return
+        connection.subscription = parse_subscription(data)
+        self.send(websocket, {
+            'type': 'subscribed',
+            **{field: sorted(values) if values else None for field, values in connection.subscription.items()},
+        })
+
+    async def _write(self, connection):
+        try:
+            await connection.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            self.send_errors += 1
+            logger.debug(f'WebSocket send failed, dropping client: {error}')
+            self.disconnect(connection.websocket)
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.connections:
-            self.connections.remove(websocket)
+        connection = self.connections.pop(websocket, None)
+        if connection is not None and connection.writer is not None:
+            if connection.writer is not asyncio.current_task():
+                connection.writer.cancel()
+
+    def send(self, websocket: WebSocket, message: dict):
+        """Queue a message for a single client."""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.enqueue(connection.frame(message))
+
+    def _record(self, message):
+        self.seq += 1
+        message['seq'] = self.seq
+        if len(self.log_history) == self.max_history:
+            self._history_floor = self.log_history[0]['seq']
+        self.log_history.append(message)
+        if message.get('type') in SNAPSHOT_TYPES:
+            key = (message.get('taskId'), message.get('type'))
+            self._latest_state.pop(key, None)
+            self._latest_state[key] = message
+            while len(self._latest_state) > self.max_history:
+                self._latest_state.popitem(last=False)
 
     async def broadcast(self, message: dict):
-        if message.get('type') in ('phase_change', 'node_update'):
-            self.log_history.append(message)
-            if len(self.log_history) > self.max_history:
-                self.log_history = self.log_history[-self.max_history:]
-
-        disconnected = []
-        for ws in self.connections:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                disconnected.append(ws)
-        for ws in disconnected:
-            self.disconnect(ws)
+        await self.broadcast_many([message])
+
+    async def broadcast_many(self, messages: list[dict]):
+        """
+        Record and send several events. Each client gets the ones matching its
+        subscription in a single frame: the bare event if there is one, else a
+        ``batch`` frame. Every event is encoded once per wire format, and each
+        distinct frame is built and compressed once.
+        """
+        started = time.perf_counter()
+        for message in messages:
+            self._record(message)
+
+        encoded = {}
+        frames = {}
+        overflowed = []
+        for websocket, connection in self.connections.items():
+            selected = tuple(index for index, message in enumerate(messages) if connection.matches(message))
+            if not selected:
+                continue
+            frame_key = (connection.codec, selected)
+            if frame_key not in frames:
+                parts = encoded.setdefault(connection.encoding, {})
+                for index in selected:
+                    if index not in parts:
+                        parts[index] = _encode(messages[index], connection.encoding)
+                if len(selected) == 1:
+                    frame = parts[selected[0]]
+                else:
+                    frame = _encode_batch([parts[index] for index in selected], connection.encoding)
+                frames[frame_key] = _compress(frame, connection.compress)
+            key = coalesce_key(messages[selected[0]]) if len(selected) == 1 else None
+            if not connection.enqueue(frames[frame_key], key):
+                overflowed.append(websocket)
+        for websocket in overflowed:
+            self.overflow_disconnects += 1
+            logger.warning('WebSocket client fell too far behind, disconnecting')
+            self.disconnect(websocket)
+            asyncio.create_task(self._close(websocket))
+        ws_broadcast_seconds.observe(time.perf_counter() - started)
+
+    async def _close(self, websocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
 
     def clear_history(self):
         self.log_history.clear()
+        self._latest_state.clear()
+        self._history_floor = self.seq
+
+    def get_stats(self):
+        depths = [len(connection.queue) for connection in self.connections.values()]
+        return {
+            'connections': len(self.connections),
+            'seq': self.seq,
+            'history_size': len(self.log_history),
+            'queue_size': self.queue_size,
+            'overflow_policy': self.overflow_policy,
+            'queue_depth_max': max(depths, default=0),
+            'queue_depth_total': sum(depths),
+            'sent': sum(connection.sent for connection in self.connections.values()),
+            'dropped': sum(connection.dropped for connection in self.connections.values()),
+            'coalesced': sum(connection.coalesced for connection in self.connections.values()),
+            'send_errors': self.send_errors,
+            'overflow_disconnects': self.overflow_disconnects,
+        }
 
 
 ws_manager = WSManager()
+
+gauge('rui_ws_connections', 'Connected WebSocket clients.', lambda: len(ws_manager.connections))
+callback_counter('rui_ws_send_errors', 'WebSocket sends that failed.', lambda: ws_manager.send_errors)
+callback_counter(
+    'rui_ws_overflow_disconnects', 'Clients disconnected for falling behind.', lambda: ws_manager.overflow_disconnects,
+)
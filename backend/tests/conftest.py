@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The backend runs from its own directory (``uvicorn main:app``); import it the same way.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
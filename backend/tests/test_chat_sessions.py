@@ -0,0 +1,51 @@
+import pytest
+
+from services.chat_sessions import ChatSessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ChatSessionStore(tmp_path / 'sessions.sqlite3', max_memory_sessions=1)
+    yield store
+    store.close()
+
+
+def message(content):
+    return {'role': 'user', 'content': content}
+
+
+def test_unknown_session(store):
+    assert store.get('missing') is None
+
+
+def test_append_after_eviction_keeps_history(store):
+    store.append('a', [message('1')])
+    store.append('b', [message('x')])
+    assert 'a' not in store._sessions
+    store.append('a', [message('2')])
+    assert [m['content'] for m in store.get('a')] == ['1', '2']
+    assert [m['content'] for m in store.get('b')] == ['x']
+
+
+def test_sessions_survive_restart(tmp_path, store):
+    store.append('a', [message('1'), message('2')])
+    store.close()
+    reopened = ChatSessionStore(tmp_path / 'sessions.sqlite3')
+    try:
+        assert [m['content'] for m in reopened.get('a')] == ['1', '2']
+    finally:
+        reopened.close()
+
+
+def test_get_returns_a_copy(store):
+    store.append('a', [message('1')])
+    store.get('a').append(message('not saved'))
+    assert len(store.get('a')) == 1
+
+
+def test_replace_and_delete(store):
+    store.append('a', [message('1')])
+    store.replace('a', [message('edited')])
+    assert [m['content'] for m in store.get('a')] == ['edited']
+    store.delete('a')
+    assert store.get('a') is None
@@ -0,0 +1,49 @@
+from services import lru_cache
+from services.lru_cache import TTLCache
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(lru_cache.time, 'monotonic', lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set('a', 1)
+    now[0] += 4.9
+    assert cache.get('a') == 1
+    now[0] += 0.2
+    assert cache.get('a', 'gone') == 'gone'
+    assert cache.stats()['size'] == 0
+
+
+def test_set_restarts_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(lru_cache.time, 'monotonic', lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set('a', 1)
+    now[0] += 4
+    cache.set('a', 2)
+    now[0] += 4
+    assert cache.get('a') == 2
+
+
+def test_stats_count_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('b')
+    cache.get('c', record_miss=False)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['hit_rate'] == 0.5
+    cache.clear()
+    assert cache.get('a') is None
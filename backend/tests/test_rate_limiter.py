@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from services import rate_limiter as rl
+from services.rate_limiter import BATCH_RESERVE, ProviderLimiter, RateLimiter, TokenBucket
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f'status {status_code}')
+        self.status_code = status_code
+        self.response = type('Response', (), {'headers': headers or {}})()
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+def test_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(60)
+    bucket.level = 0.0
+    bucket.refill(bucket.updated + 10)
+    assert bucket.level == pytest.approx(10)
+    bucket.refill(bucket.updated + 600)
+    assert bucket.level == bucket.capacity
+
+
+def test_bucket_wait_accounts_for_reserve():
+    bucket = TokenBucket(60)
+    bucket.level = 20.0
+    assert bucket.wait_for(10) == 0.0
+    # Keeping half of the bucket untouched needs 30 + 10 tokens, 20 more than are there.
+    assert bucket.wait_for(10, reserve=0.5) == pytest.approx(20.0)
+
+
+def test_chat_waiter_goes_before_earlier_batch():
+    limiter = ProviderLimiter('openai', 100, 100000)
+    chat_ticket = limiter._enqueue('chat')
+    assert limiter.acquire(1, 'batch', blocking=False) is False
+    limiter._leave(chat_ticket)
+    assert limiter.acquire(1, 'batch', blocking=False) is True
+    assert limiter.acquired == {'chat': 0, 'batch': 1}
+
+
+def test_batch_lane_leaves_reserve_for_chat():
+    rpm = 10
+    limiter = ProviderLimiter('openai', rpm, 100000)
+    batch_calls = 0
+    while limiter.acquire(1, 'batch', blocking=False):
+        batch_calls += 1
+    assert batch_calls == int(rpm * (1 - BATCH_RESERVE))
+    assert limiter.acquire(1, 'chat', blocking=False) is True
+
+
+def test_set_share_scales_existing_and_new_providers():
+    limiter = RateLimiter({'openai': (100, 1000), 'anthropic': (50, 500)})
+    openai = limiter.get('openai')
+    limiter.set_share(0.25)
+    assert openai.get_stats()['rpm'] == 25
+    assert limiter.get('anthropic').get_stats()['tpm'] == 125
+
+
+def test_backoff_policy():
+    limiter = RateLimiter({'openai': (100, 1000)})
+    assert limiter.backoff('openai', StatusError(400), 0) is None
+    assert limiter.backoff('openai', StatusError(503), rl.MAX_RETRIES) is None
+    assert limiter.backoff('openai', APITimeoutError(), 0) is not None
+
+    delay = limiter.backoff('openai', StatusError(429, {'retry-after': '3'}), 0)
+    assert delay >= 3
+    assert limiter.get('openai').get_stats()['paused_for'] > 2
+
+
+def test_call_retries_transient_failures(monkeypatch):
+    monkeypatch.setattr(rl.random, 'uniform', lambda low, high: 0.0)
+    limiter = RateLimiter({'openai': (100, 1000)})
+    attempts = []
+    acquired = []
+
+    async def request():
+        attempts.append(len(attempts))
+        if len(attempts) < 3:
+            raise StatusError(503)
+        return 'ok'
+
+    result = asyncio.run(limiter.call('openai', request, on_acquired=lambda: acquired.append(True)))
+    assert result == 'ok'
+    assert len(attempts) == 3
+    assert len(acquired) == 3
@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+import pytest
+
+from services.ws_manager import WSManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.frames.append(text)
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+
+def first_frame(encoding):
+    async def connect():
+        manager = WSManager()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, encoding=encoding)
+        await asyncio.sleep(0)
+        manager.disconnect(websocket)
+        return websocket.frames[0]
+
+    return asyncio.run(connect())
+
+
+def test_hello_is_json_by_default():
+    hello = json.loads(first_frame('json'))
+    assert hello['type'] == 'hello'
+    assert hello['encoding'] == 'json'
+
+
+def test_hello_uses_negotiated_encoding():
+    msgpack = pytest.importorskip('msgpack')
+    frame = first_frame('msgpack')
+    assert isinstance(frame, bytes)
+    assert msgpack.unpackb(frame)['encoding'] == 'msgpack'
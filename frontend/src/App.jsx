@@ -6,7 +6,7 @@ import ProgressSidebar from './components/ProgressSidebar';
 import ApiKeyModal from './components/ApiKeyModal';
 import Toast from './components/Toast';
 import { createWebSocket } from './utils/ws';
-import { sendChatMessage, checkMissingKeys, setApiKeys } from './utils/api';
+import { streamChatMessage, deleteChatSession, checkMissingKeys, setApiKeys, abortTask } from './utils/api';
 
 const API_BASE = 'http://localhost:8000';
 const SESSIONS_KEY = 'rui_chat_sessions';
@@ -37,6 +37,41 @@ function saveSessions(sessions) {
   localStorage.setItem(SESSIONS_KEY, JSON.stringify(sessions));
 }
 
+// The server sends structured final outputs as compact JSON; pretty-print them for display.
+function formatFinalOutput(output) {
+  if (!output) return '';
+  try {
+    const parsed = JSON.parse(output);
+    if (parsed && typeof parsed === 'object') {
+      return '```json\n' + JSON.stringify(parsed, null, 2) + '\n```';
+    }
+  } catch {
+    // Plain text or markdown output.
+  }
+  return output;
+}
+
+const TERMINAL_PHASES = ['complete', 'idle', 'aborted'];
+
+// Apply update to the task an event belongs to, found by its taskId (events
+// without one go to the latest task). With create, an unknown task is added first.
+function updateTask(tasks, taskId, update, create = false) {
+  let index = taskId === undefined ? tasks.length - 1 : tasks.findIndex((task) => task.taskId === taskId);
+  const next = [...tasks];
+  if (index === -1) {
+    if (!create) return tasks;
+    next.push({ taskId, phase: 'idle', iterationIndex: 0, branches: [] });
+    index = next.length - 1;
+  }
+  next[index] = update(next[index]);
+  return next;
+}
+
+// Drop the in-progress flag from streamed assistant messages once their round is over.
+function settleStreaming(messages) {
+  return messages.map((m) => (m.streaming ? { role: m.role, content: m.content } : m));
+}
+
 function App() {
   const [sessions, setSessions] = useState(() => {
     const loaded = loadSessions();
@@ -75,9 +110,13 @@ function App() {
   const [missingProviders, setMissingProviders] = useState(null);
   const [manualKeyModal, setManualKeyModal] = useState(false);
   const [toasts, setToasts] = useState([]);
+  const [gcriMemoryVersion, setGcriMemoryVersion] = useState(0);
   const toastIdRef = useRef(0);
   const pendingMessageRef = useRef(null);
   const wsRef = useRef(null);
+  const syncedSessionsRef = useRef(new Set());
+  // Tasks this client confirmed; Stop only aborts these, not other users' tasks.
+  const ownTaskIdsRef = useRef(new Set());
 
   const addToast = useCallback((message, type = 'error') => {
     const id = ++toastIdRef.current;
@@ -110,34 +149,20 @@ function App() {
   }
 
   const handleWsMessage = useCallback((data) => {
+    const addDetail = (task) => ({ ...task, details: [...(task.details || []), data] });
     if (data.type === 'phase_change') {
       setTaskState((prev) => {
-        const tasks = [...prev.tasks];
-        const currentTask = tasks[tasks.length - 1] || {
-          phase: 'idle',
-          iterationIndex: 0,
-          branches: [],
-        };
-        currentTask.phase = data.phase;
-        if (data.iteration !== undefined) {
-          currentTask.iterationIndex = data.iteration;
-        }
-        if (data.phase === 'strategy') {
-          setIsRunning(true);
-          if (!tasks.length || tasks[tasks.length - 1].phase === 'complete') {
-            tasks.push({ ...currentTask, phase: 'strategy' });
-          } else {
-            tasks[tasks.length - 1] = currentTask;
-          }
-        } else if (data.phase === 'complete' || data.phase === 'idle' || data.phase === 'aborted') {
-          setIsRunning(false);
-          if (tasks.length) tasks[tasks.length - 1] = currentTask;
-        } else {
-          if (tasks.length) tasks[tasks.length - 1] = currentTask;
-          else tasks.push(currentTask);
-        }
+        const tasks = updateTask(prev.tasks, data.taskId, (task) => ({
+          ...task,
+          phase: data.phase,
+          iterationIndex: data.iteration !== undefined ? data.iteration : task.iterationIndex,
+        }), true);
+        setIsRunning(tasks.some((task) => !TERMINAL_PHASES.includes(task.phase)));
         return { tasks };
       });
+      if (data.phase === 'complete' || data.phase === 'aborted') {
+        ownTaskIdsRef.current.delete(data.taskId);
+      }
       if (data.phase === 'strategy' && data.maxIterations) {
         const iter = `Iteration ${(data.iteration ?? 0) + 1}/${data.maxIterations}`;
         updateMessages((prev) => [...prev, { role: 'gcri_progress', gcriType: 'iteration_start', summary: iter, detail: null }]);
@@ -148,12 +173,10 @@ function App() {
         updateMessages((prev) => [...prev, { role: 'gcri_progress', gcriType: 'aborted', summary: '🛑 GCRI task aborted', detail: null }]);
       }
     } else if (data.type === 'node_update') {
-      setTaskState((prev) => {
-        const tasks = [...prev.tasks];
-        if (tasks.length === 0) return prev;
-        const currentTask = { ...tasks[tasks.length - 1] };
-        if (data.branch_index !== undefined) {
-          const branches = [...(currentTask.branches || [])];
+      setTaskState((prev) => ({
+        tasks: updateTask(prev.tasks, data.taskId, (task) => {
+          if (data.branch_index === undefined) return task;
+          const branches = [...(task.branches || [])];
           while (branches.length <= data.branch_index) {
             branches.push({ model: 'default', status: 'pending' });
           }
@@ -163,86 +186,41 @@ function App() {
             node: data.node,
             data: data.data,
           };
-          currentTask.branches = branches;
-        }
-        tasks[tasks.length - 1] = currentTask;
-        return { tasks };
-      });
+          return { ...task, branches };
+        }),
+      }));
     } else if (data.type === 'strategies') {
-      setTaskState((prev) => {
-        const tasks = [...prev.tasks];
-        if (tasks.length === 0) return prev;
-        const currentTask = { ...tasks[tasks.length - 1] };
-        const details = [...(currentTask.details || [])];
-        details.push(data);
-        currentTask.details = details;
-        tasks[tasks.length - 1] = currentTask;
-        return { tasks };
-      });
+      setTaskState((prev) => ({ tasks: updateTask(prev.tasks, data.taskId, addDetail) }));
       const names = (data.strategies || []).map((s) => s.name).filter(Boolean);
       const summary = names.length ? names.join(', ') : `${(data.strategies || []).length} strategies`;
       updateMessages((prev) => [...prev, { role: 'gcri_progress', gcriType: 'strategies', summary, detail: data }]);
     } else if (data.type === 'hypothesis') {
-      setTaskState((prev) => {
-        const tasks = [...prev.tasks];
-        if (tasks.length === 0) return prev;
-        const currentTask = { ...tasks[tasks.length - 1] };
-        const details = [...(currentTask.details || [])];
-        details.push(data);
-        currentTask.details = details;
-        tasks[tasks.length - 1] = currentTask;
-        return { tasks };
-      });
+      setTaskState((prev) => ({ tasks: updateTask(prev.tasks, data.taskId, addDetail) }));
       const preview = data.hypothesis ? data.hypothesis.slice(0, 120) : '';
       const branchLabel = `Branch ${(data.branch || 0) + 1}`;
       updateMessages((prev) => [...prev, { role: 'gcri_progress', gcriType: 'hypothesis', summary: `${branchLabel}: ${preview}${data.hypothesis?.length > 120 ? '…' : ''}`, detail: data }]);
     } else if (data.type === 'verification') {
-      setTaskState((prev) => {
-        const tasks = [...prev.tasks];
-        if (tasks.length === 0) return prev;
-        const currentTask = { ...tasks[tasks.length - 1] };
-        const details = [...(currentTask.details || [])];
-        details.push(data);
-        currentTask.details = details;
-        tasks[tasks.length - 1] = currentTask;
-        return { tasks };
-      });
+      setTaskState((prev) => ({ tasks: updateTask(prev.tasks, data.taskId, addDetail) }));
       updateMessages((prev) => [...prev, { role: 'gcri_progress', gcriType: 'verification', summary: `Branch ${(data.branch || 0) + 1} — ${data.counterStrength || 'n/a'}`, detail: data }]);
     } else if (data.type === 'decision') {
-      setTaskState((prev) => {
-        const tasks = [...prev.tasks];
-        if (tasks.length === 0) return prev;
-        const currentTask = { ...tasks[tasks.length - 1] };
-        const details = [...(currentTask.details || [])];
-        details.push(data);
-        currentTask.details = details;
-        tasks[tasks.length - 1] = currentTask;
-        return { tasks };
-      });
+      setTaskState((prev) => ({ tasks: updateTask(prev.tasks, data.taskId, addDetail) }));
       const gcriType = data.decision ? 'decision_accept' : 'decision_reject';
       const summary = data.decision
         ? `Accepted — best branch: ${(data.bestBranch || 0) + 1}`
         : `Rejected${data.feedback ? ': ' + data.feedback.slice(0, 120) + '…' : ''}`;
       updateMessages((prev) => [...prev, { role: 'gcri_progress', gcriType, summary, detail: data }]);
     } else if (data.type === 'iteration_complete') {
-      setTaskState((prev) => {
-        const tasks = [...prev.tasks];
-        if (tasks.length === 0) return prev;
-        const currentTask = { ...tasks[tasks.length - 1] };
-        const details = [...(currentTask.details || [])];
-        details.push(data);
-        currentTask.details = details;
-        tasks[tasks.length - 1] = currentTask;
-        return { tasks };
-      });
+      setTaskState((prev) => ({ tasks: updateTask(prev.tasks, data.taskId, addDetail) }));
     } else if (data.type === 'gcri_result') {
-      updateMessages((prev) => [...prev, { role: 'gcri_progress', gcriType: 'result', summary: 'Final Output', detail: { finalOutput: data.final_output || '' } }]);
+      updateMessages((prev) => [...prev, { role: 'gcri_progress', gcriType: 'result', summary: 'Final Output', detail: { finalOutput: formatFinalOutput(data.final_output) } }]);
     } else if (data.type === 'chat_response') {
       setIsWaitingResponse(false);
       updateMessages((prev) => [
         ...prev,
         { role: 'assistant', content: data.content },
       ]);
+    } else if (data.type === 'gcri_memory_updated') {
+      setGcriMemoryVersion((prev) => prev + 1);
     } else if (data.type === 'system_message') {
       if (data.content?.toLowerCase().includes('error')) {
         addToast(data.content);
@@ -259,15 +237,28 @@ function App() {
     }
   }, [activeSessionId]);
 
+  const wsHandlerRef = useRef(handleWsMessage);
+  useEffect(() => {
+    wsHandlerRef.current = handleWsMessage;
+  }, [handleWsMessage]);
+
+  // One socket for the page; switching sessions changes its subscription.
+  // GCRI events carry the session that started the task, so this also limits
+  // task events to this session's tasks (and ones started outside a session).
   useEffect(() => {
     const ws = createWebSocket(
-      handleWsMessage,
+      (data) => wsHandlerRef.current(data),
       () => setIsConnected(true),
-      () => setIsConnected(false)
+      () => setIsConnected(false),
+      { subscription: { sessions: [activeSessionId] } }
     );
     wsRef.current = ws;
     return () => ws.disconnect();
-  }, [handleWsMessage]);
+  }, []);
+
+  useEffect(() => {
+    wsRef.current?.subscribe({ sessions: [activeSessionId] });
+  }, [activeSessionId]);
 
   useEffect(() => {
     localStorage.setItem(ACTIVE_SESSION_KEY, activeSessionId);
@@ -275,13 +266,15 @@ function App() {
 
   const handleConfirmTask = useCallback(async (scheme) => {
     try {
-      const payload = { ...scheme, max_iterations: config.maxIterations || 3 };
+      const payload = { ...scheme, max_iterations: config.maxIterations || 3, session_id: activeSessionId };
       const response = await fetch(`${API_BASE}/api/task/confirm`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(payload),
       });
       if (!response.ok) throw new Error(`Confirm API error: ${response.status}`);
+      const { task_id: taskId } = await response.json();
+      if (taskId) ownTaskIdsRef.current.add(taskId);
 
       updateMessages((prev) =>
         prev.map((msg) =>
@@ -301,53 +294,69 @@ function App() {
     updateMessages(updatedMessages);
     setIsWaitingResponse(true);
     try {
-      const history = updatedMessages
-        .filter((m) => m.role === 'user' || m.role === 'assistant')
-        .map((m) => ({ role: m.role, content: m.content }));
-      const response = await sendChatMessage(content, config, history, activeSessionId);
-      setIsWaitingResponse(false);
-
-      const newMessages = [];
-
-      if (response.reply) {
-        newMessages.push({ role: 'assistant', content: response.reply });
-      }
-
-      if (response.tool_calls?.length) {
-        for (const tc of response.tool_calls) {
-          if (tc.tool === 'propose_gcri_task') {
-            let scheme;
-            try {
-              scheme = typeof tc.result === 'string' ? JSON.parse(tc.result) : tc.result;
-            } catch {
-              scheme = tc.result;
-            }
-            if (scheme && scheme.type === 'gcri_proposal') {
-              newMessages.push({
-                role: 'assistant',
-                content: '',
-                proposal: scheme,
-                proposalConfirmed: false,
-              });
+      // The server keeps the transcript; local history is only sent once per
+      // page load to seed it, or to replace it after an edit.
+      const reset = baseMessages !== null;
+      const history = reset || !syncedSessionsRef.current.has(activeSessionId)
+        ? currentMessages
+          .filter((m) => m.role === 'user' || m.role === 'assistant')
+          .map((m) => ({ role: m.role, content: m.content }))
+        : [];
+      // Tokens grow a streaming assistant message in place; a tool call closes
+      // it, so text from the next round starts a new one below the tool note.
+      const handleEvent = (event) => {
+        if (event.type === 'token') {
+          setIsWaitingResponse(false);
+          updateMessages((prev) => {
+            const last = prev[prev.length - 1];
+            if (last?.streaming) {
+              return [...prev.slice(0, -1), { ...last, content: last.content + event.content }];
             }
+            return [...prev, { role: 'assistant', content: event.content, streaming: true }];
+          });
+        } else if (event.type === 'tool_call') {
+          if (event.tool === 'propose_gcri_task') {
+            updateMessages(settleStreaming);
+            return;
+          }
+          updateMessages((prev) => [
+            ...settleStreaming(prev),
+            { role: 'system', content: `🔧 Calling ${event.tool}…` },
+          ]);
+        } else if (event.type === 'tool_result' && event.tool === 'propose_gcri_task') {
+          let scheme;
+          try {
+            scheme = typeof event.result === 'string' ? JSON.parse(event.result) : event.result;
+          } catch {
+            scheme = event.result;
+          }
+          if (scheme && scheme.type === 'gcri_proposal') {
+            updateMessages((prev) => [
+              ...prev,
+              { role: 'assistant', content: '', proposal: scheme, proposalConfirmed: false },
+            ]);
           }
         }
+      };
 
-        const otherTools = response.tool_calls.filter((tc) => tc.tool !== 'propose_gcri_task');
-        if (otherTools.length) {
-          const toolNames = otherTools.map((tc) => tc.tool).join(', ');
-          newMessages.push({
-            role: 'system',
-            content: `🔧 Tools used: ${toolNames}`,
-          });
-        }
-      }
+      const response = await streamChatMessage(content, config, history, activeSessionId, handleEvent, reset);
+      syncedSessionsRef.current.add(activeSessionId);
+      setIsWaitingResponse(false);
 
-      if (newMessages.length) {
-        updateMessages((prev) => [...prev, ...newMessages]);
-      }
+      // The final reply is authoritative: it replaces the last streamed text,
+      // or stands alone when nothing was streamed (e.g. an error reply).
+      updateMessages((prev) => {
+        const last = prev[prev.length - 1];
+        const settled = settleStreaming(prev);
+        if (!response?.reply) return settled;
+        if (last?.streaming) {
+          return [...settled.slice(0, -1), { role: 'assistant', content: response.reply }];
+        }
+        return [...settled, { role: 'assistant', content: response.reply }];
+      });
     } catch {
       setIsWaitingResponse(false);
+      updateMessages(settleStreaming);
       addToast('Failed to reach the backend. Is the server running?');
     }
   }, [config, sessions, activeSessionId]);
@@ -400,7 +409,14 @@ function App() {
     }
   }, [sessions]);
 
+  const handleAbortTasks = useCallback(async () => {
+    const taskIds = [...ownTaskIdsRef.current];
+    await Promise.all(taskIds.map((taskId) => abortTask(taskId).catch(() => { /* ignore */ })));
+  }, []);
+
   const handleDeleteSession = useCallback((sessionId) => {
+    syncedSessionsRef.current.delete(sessionId);
+    deleteChatSession(sessionId).catch(() => {});
     setSessions((prev) => {
       const updated = { ...prev };
       delete updated[sessionId];
@@ -466,7 +482,7 @@ function App() {
         isConnected={isConnected}
         isWaitingResponse={isWaitingResponse}
       />
-      <ProgressSidebar taskState={taskState} isRunning={isRunning} />
+      <ProgressSidebar taskState={taskState} isRunning={isRunning} gcriMemoryVersion={gcriMemoryVersion} onAbort={handleAbortTasks} />
       <Toast messages={toasts} onDismiss={dismissToast} />
       {missingProviders && (
         <ApiKeyModal
@@ -6,19 +6,30 @@ import {
   fetchCometSessions,
   fetchCometSessionNodes,
   fetchGcriMemory,
-  abortTask,
 } from '../utils/api';
 
-export default function ProgressSidebar({ taskState, isRunning }) {
+const COMET_PAGE_SIZE = 200;
+const COMET_VIEWER_FIELDS = ['node_id', 'summary', 'trigger', 'session_id', 'recall_mode', 'topic_tags', 'created_at'];
+
+export default function ProgressSidebar({ taskState, isRunning, gcriMemoryVersion, onAbort }) {
   const [activeTab, setActiveTab] = useState('progress');
   const [memoryTab, setMemoryTab] = useState('comet');
   const [cometMemory, setCometMemory] = useState([]);
+  const [cometCursor, setCometCursor] = useState(null);
   const [gcriMemory, setGcriMemory] = useState([]);
   const [cometSessions, setCometSessions] = useState([]);
   const [selectedSession, setSelectedSession] = useState('all');
   const [memoryLoading, setMemoryLoading] = useState(false);
   const [memoryError, setMemoryError] = useState(null);
 
+  const fetchCometPage = useCallback((sessionFilter, after = null) => {
+    const params = { limit: COMET_PAGE_SIZE, fields: COMET_VIEWER_FIELDS, after };
+    if (sessionFilter && sessionFilter !== 'all') {
+      return fetchCometSessionNodes(sessionFilter, params);
+    }
+    return fetchCometMemory(params);
+  }, []);
+
   const loadMemory = useCallback(async (tab, sessionFilter) => {
     setMemoryLoading(true);
     setMemoryError(null);
@@ -27,13 +38,9 @@ export default function ProgressSidebar({ taskState, isRunning }) {
         const sessData = await fetchCometSessions();
         setCometSessions(sessData.sessions || []);
 
-        if (sessionFilter && sessionFilter !== 'all') {
-          const data = await fetchCometSessionNodes(sessionFilter);
-          setCometMemory(data.nodes || []);
-        } else {
-          const data = await fetchCometMemory();
-          setCometMemory(data.nodes || []);
-        }
+        const data = await fetchCometPage(sessionFilter);
+        setCometMemory(data.nodes || []);
+        setCometCursor(data.next_cursor || null);
       } else {
         const data = await fetchGcriMemory();
         const items = [];
@@ -63,7 +70,21 @@ export default function ProgressSidebar({ taskState, isRunning }) {
     } finally {
       setMemoryLoading(false);
     }
-  }, []);
+  }, [fetchCometPage]);
+
+  const loadMoreComet = useCallback(async () => {
+    if (!cometCursor) return;
+    setMemoryLoading(true);
+    try {
+      const data = await fetchCometPage(selectedSession, cometCursor);
+      setCometMemory((prev) => [...prev, ...(data.nodes || [])]);
+      setCometCursor(data.next_cursor || null);
+    } catch (error) {
+      setMemoryError(`Failed to load comet memory: ${error.message || 'server unavailable'}`);
+    } finally {
+      setMemoryLoading(false);
+    }
+  }, [cometCursor, selectedSession, fetchCometPage]);
 
   useEffect(() => {
     if (activeTab === 'memory') {
@@ -71,6 +92,14 @@ export default function ProgressSidebar({ taskState, isRunning }) {
     }
   }, [activeTab, memoryTab, selectedSession, loadMemory]);
 
+  useEffect(() => {
+    if (gcriMemoryVersion && activeTab === 'memory' && memoryTab === 'gcri') {
+      loadMemory('gcri', selectedSession);
+    }
+    // Only react to pushed GCRI memory changes, not to tab switches.
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [gcriMemoryVersion]);
+
   function handleSessionChange(event) {
     setSelectedSession(event.target.value);
   }
@@ -100,9 +129,7 @@ export default function ProgressSidebar({ taskState, isRunning }) {
           <div>
             {isRunning && (
               <button
-                onClick={async () => {
-                  try { await abortTask(); } catch (e) { /* ignore */ }
-                }}
+                onClick={onAbort}
                 style={{
                   width: '100%',
                   padding: '10px',
@@ -209,6 +236,25 @@ export default function ProgressSidebar({ taskState, isRunning }) {
               />
             )}
 
+            {memoryTab === 'comet' && cometCursor && !memoryLoading && (
+              <button
+                onClick={loadMoreComet}
+                style={{
+                  marginTop: 8,
+                  width: '100%',
+                  padding: '8px',
+                  background: 'var(--bg-tertiary)',
+                  border: '1px solid var(--surface-border)',
+                  borderRadius: 'var(--radius-sm)',
+                  color: 'var(--text-secondary)',
+                  fontSize: 12,
+                  cursor: 'pointer',
+                }}
+              >
+                Load more
+              </button>
+            )}
+
             <button
               onClick={() => loadMemory(memoryTab, selectedSession)}
               style={{
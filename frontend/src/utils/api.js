@@ -1,15 +1,53 @@
 const API_BASE = 'http://localhost:8000';
 
-export async function sendChatMessage(message, config, history = [], sessionId = null) {
+export async function sendChatMessage(message, config, history = [], sessionId = null, reset = false) {
   const response = await fetch(`${API_BASE}/api/chat`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ message, config, history, session_id: sessionId }),
+    body: JSON.stringify({ message, config, history, session_id: sessionId, reset }),
   });
   if (!response.ok) throw new Error(`Chat API error: ${response.status}`);
   return response.json();
 }
 
+export async function streamChatMessage(message, config, history = [], sessionId = null, onEvent = () => {}, reset = false) {
+  const response = await fetch(`${API_BASE}/api/chat/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ message, config, history, session_id: sessionId, reset }),
+  });
+  if (!response.ok) throw new Error(`Chat API error: ${response.status}`);
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result = null;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const dataLine = frame.split('\n').find((line) => line.startsWith('data: '));
+      if (dataLine) {
+        const event = JSON.parse(dataLine.slice(6));
+        if (event.type === 'done') result = event;
+        onEvent(event);
+      }
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+  return result;
+}
+
+export async function deleteChatSession(sessionId) {
+  const response = await fetch(`${API_BASE}/api/chat/sessions/${sessionId}`, { method: 'DELETE' });
+  if (!response.ok) throw new Error(`Chat session API error: ${response.status}`);
+  return response.json();
+}
+
 export async function runTask(task, config) {
   const response = await fetch(`${API_BASE}/api/task/run`, {
     method: 'POST',
@@ -20,14 +58,24 @@ export async function runTask(task, config) {
   return response.json();
 }
 
-export async function abortTask() {
-  const response = await fetch(`${API_BASE}/api/task/abort`, { method: 'POST' });
+export async function abortTask(taskId) {
+  const response = await fetch(`${API_BASE}/api/task/${encodeURIComponent(taskId)}/abort`, { method: 'POST' });
   if (!response.ok) throw new Error(`Abort API error: ${response.status}`);
   return response.json();
 }
 
-export async function fetchCometMemory() {
-  const response = await fetch(`${API_BASE}/api/memory/comet`);
+function toQueryString(params = {}) {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value === undefined || value === null || value === '') return;
+    query.set(key, Array.isArray(value) ? value.join(',') : value);
+  });
+  const text = query.toString();
+  return text ? `?${text}` : '';
+}
+
+export async function fetchCometMemory(params = {}) {
+  const response = await fetch(`${API_BASE}/api/memory/comet${toQueryString(params)}`);
   if (!response.ok) throw new Error(`CoMeT memory API error: ${response.status}`);
   return response.json();
 }
@@ -50,8 +98,8 @@ export async function fetchCometSessions() {
   return response.json();
 }
 
-export async function fetchCometSessionNodes(sessionId) {
-  const response = await fetch(`${API_BASE}/api/memory/comet/sessions/${sessionId}`);
+export async function fetchCometSessionNodes(sessionId, params = {}) {
+  const response = await fetch(`${API_BASE}/api/memory/comet/sessions/${sessionId}${toQueryString(params)}`);
   if (!response.ok) throw new Error(`CoMeT session nodes API error: ${response.status}`);
   return response.json();
 }
@@ -1,28 +1,72 @@
 const WS_URL = 'ws://localhost:8000/ws';
 
-export function createWebSocket(onMessage, onOpen, onClose) {
+// Large frames arrive as zlib-deflated binary JSON when compression is negotiated.
+async function decodeFrame(payload) {
+  if (typeof payload === 'string') return JSON.parse(payload);
+  const stream = new Blob([payload]).stream().pipeThrough(new DecompressionStream('deflate'));
+  return JSON.parse(await new Response(stream).text());
+}
+
+export function createWebSocket(
+  onMessage,
+  onOpen,
+  onClose,
+  { compress = typeof DecompressionStream !== 'undefined', subscription: initialSubscription = null } = {},
+) {
   let ws = null;
+  let decodeChain = Promise.resolve();
   let reconnectTimer = null;
   let intentionalClose = false;
+  let lastSeq = null;
+  let subscription = initialSubscription;
+
+  function trackSeq(data) {
+    if (typeof data.seq === 'number' && (lastSeq === null || data.seq > lastSeq)) {
+      lastSeq = data.seq;
+    }
+  }
+
+  function dispatch(data) {
+    if (data.type === 'batch') {
+      (data.events || []).forEach(dispatch);
+      return;
+    }
+    trackSeq(data);
+    if (!onMessage) return;
+    if ((data.type === 'history' && data.resumed) || data.type === 'snapshot') {
+      // Replay what was missed while disconnected as individual events.
+      (data.data || []).forEach((event) => onMessage(event));
+    } else {
+      onMessage(data);
+    }
+  }
 
   function connect() {
     if (ws && (ws.readyState === WebSocket.OPEN || ws.readyState === WebSocket.CONNECTING)) {
       return;
     }
 
-    ws = new WebSocket(WS_URL);
+    const params = new URLSearchParams();
+    if (lastSeq !== null) params.set('last_seq', lastSeq);
+    if (compress) params.set('compress', 'deflate');
+    // Subscribing in the URL filters the history replayed on connect as well.
+    Object.entries(subscription || {}).forEach(([field, values]) => {
+      if (values?.length) params.set(field, values.join(','));
+    });
+    const query = params.toString();
+    ws = new WebSocket(query ? `${WS_URL}?${query}` : WS_URL);
+    ws.binaryType = 'arraybuffer';
 
     ws.onopen = () => {
       if (onOpen) onOpen();
     };
 
     ws.onmessage = (event) => {
-      try {
-        const data = JSON.parse(event.data);
-        if (onMessage) onMessage(data);
-      } catch {
-        console.warn('Non-JSON WS message:', event.data);
-      }
+      // Decoding binary frames is async; chain it so events keep their order.
+      decodeChain = decodeChain
+        .then(() => decodeFrame(event.data))
+        .then(dispatch)
+        .catch(() => console.warn('Undecodable WS message:', event.data));
     };
 
     ws.onclose = () => {
@@ -48,6 +92,11 @@ export function createWebSocket(onMessage, onOpen, onClose) {
     }
   }
 
+  function subscribe({ tasks = null, sessions = null, events = null } = {}) {
+    subscription = { tasks, sessions, events };
+    send({ type: 'subscribe', ...subscription });
+  }
+
   function disconnect() {
     intentionalClose = true;
     clearTimeout(reconnectTimer);
@@ -56,5 +105,5 @@ export function createWebSocket(onMessage, onOpen, onClose) {
 
   connect();
 
-  return { send, disconnect, getSocket: () => ws };
+  return { send, subscribe, disconnect, getSocket: () => ws };
 }